@@ -0,0 +1,79 @@
+"""Benchmark parallel page extraction.
+
+Tiles each PDF to several page counts (standing in for long theses and
+books) and times PDFProcessor.process with different numbers of page
+workers, reporting the speedup over extracting every page in one process.
+Speedups are bounded by the cores available; on a single core the parallel
+runs only show the pool's overhead.
+
+Usage:
+    uv run python benchmarks/extraction.py paper.pdf [--pages 50,100,200,400] [--workers 1,2,4]
+"""
+
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+from typing import List
+import click
+import pymupdf
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from hedorah.pdf_processor import PDFProcessor  # noqa: E402
+
+
+def tile_pdf(pdf: Path, pages: int, output: Path) -> Path:
+    """Write a copy of ``pdf`` repeated up to ``pages`` pages."""
+    with pymupdf.open(pdf) as source, pymupdf.open() as tiled:
+        while len(tiled) < pages:
+            tiled.insert_pdf(source, to_page=min(len(source), pages - len(tiled)) - 1)
+        tiled.save(output)
+    return output
+
+
+def best_time(processor: PDFProcessor, pdf: Path, output_dir: Path, runs: int) -> float:
+    """Fastest of ``runs`` extractions, in seconds."""
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        with processor.process(pdf, output_dir) as content:
+            content.materialize()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+@click.command()
+@click.argument('pdf', type=click.Path(exists=True, path_type=Path))
+@click.option('--pages', default='50,100,200,400', show_default=True,
+              help='Comma-separated page counts to tile the PDF to')
+@click.option('--workers', 'worker_counts', default=None,
+              help='Comma-separated worker counts (default: 1,2,4 and the CPU count)')
+@click.option('--runs', default=3, show_default=True, help='Timed runs (best is reported)')
+def main(pdf: Path, pages: str, worker_counts: str, runs: int):
+    """Benchmark page-parallel extraction of PDF."""
+    cpus = os.cpu_count() or 1
+    if worker_counts:
+        counts = [int(count) for count in worker_counts.split(',')]
+    else:
+        counts = sorted({1, 2, 4, cpus})
+    page_counts: List[int] = [int(count) for count in pages.split(',')]
+
+    click.echo(f"CPU cores: {cpus}\n")
+    click.echo(f"{'pages':>6} {'workers':>8} {'time':>9} {'pages/s':>9} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        for page_count in page_counts:
+            tiled = tile_pdf(pdf, page_count, tmp_dir / f"tiled_{page_count}.pdf")
+            serial = None
+            for count in counts:
+                processor = PDFProcessor(page_workers=count, parallel_min_pages=1)
+                elapsed = best_time(processor, tiled, tmp_dir / 'figures', runs)
+                serial = serial or elapsed
+                click.echo(f"{page_count:>6} {count:>8} {elapsed:>8.2f}s "
+                           f"{page_count / elapsed:>9.1f} {serial / elapsed:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark figure candidate collection.
+
+Compares PDFProcessor's figure selection (image sizes from each page's
+image list, repeated images considered once, captions matched to images by
+layout, image data extracted only for the selected figures) against the
+previous approach of extracting every image on every page and looking for
+"Figure <index on page>" in the page text. Reports time, images extracted
+and images given a caption. Figure-heavy papers (many plots, repeated
+logos or panels) show the largest difference.
+
+Usage:
+    uv run python benchmarks/figures.py paper.pdf [more.pdf ...] [--runs 3]
+"""
+
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+import click
+import pymupdf
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from hedorah.pdf_processor import PDFProcessor  # noqa: E402
+
+
+def previous_candidates(processor: PDFProcessor, doc: pymupdf.Document) -> Tuple[List[Dict[str, Any]], int]:
+    """The per-image extraction this benchmark compares against.
+
+    Returns:
+        Tuple of (candidates with image bytes, images extracted)
+    """
+    candidates = []
+    extracted = 0
+    for page_num, page in enumerate(doc, start=1):
+        page_text = page.get_text()
+        for img_index, img in enumerate(page.get_images()):
+            base_image = doc.extract_image(img[0])
+            extracted += 1
+            width, height = base_image.get("width", 0), base_image.get("height", 0)
+            if width < processor.MIN_IMAGE_WIDTH or height < processor.MIN_IMAGE_HEIGHT:
+                continue
+            pattern = (rf'(?:Figure|Fig\.?)\s*{img_index + 1}[:\s]+(.*?)'
+                       rf'(?:\n\n|\n(?:Figure|Fig\.?)\s*\d+)')
+            match = re.search(pattern, page_text, re.IGNORECASE | re.DOTALL)
+            caption = match.group(1).strip() if match else ""
+            candidates.append({"image_bytes": base_image["image"], "caption": caption,
+                               "page": page_num,
+                               "priority": width * height + (500000 if caption else 0)})
+    candidates.sort(key=lambda x: x["priority"], reverse=True)
+    return candidates, extracted
+
+
+def current_candidates(processor: PDFProcessor, doc: pymupdf.Document) -> Tuple[List[Dict[str, Any]], int]:
+    """Candidates as PDFProcessor collects them, plus winner extraction.
+
+    Returns:
+        Tuple of (candidates, images extracted)
+    """
+    seen_xrefs = set()
+    candidates = []
+    for page_num, page in enumerate(doc, start=1):
+        page.get_text()
+        candidates += processor._figure_candidates(page, page_num, seen_xrefs)
+    selected = processor._select_figures(candidates)
+    for candidate in selected:
+        doc.extract_image(candidate["xref"])
+    return candidates, len(selected)
+
+
+def best_time(func, runs: int) -> float:
+    """Fastest of ``runs`` calls, in seconds."""
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+@click.command()
+@click.argument('pdfs', nargs=-1, required=True, type=click.Path(exists=True, path_type=Path))
+@click.option('--max-figures', default=2, show_default=True, help='Figures kept per paper')
+@click.option('--runs', default=3, show_default=True, help='Timed runs (best is reported)')
+def main(pdfs: List[Path], max_figures: int, runs: int):
+    """Benchmark figure selection on PDFS."""
+    processor = PDFProcessor(max_figures=max_figures)
+
+    click.echo(f"{'paper':<40} {'images':>7} {'version':<9} {'time':>8} {'speedup':>8} "
+               f"{'extracted':>10} {'candidates':>11} {'captioned':>10}")
+    for pdf in pdfs:
+        with pymupdf.open(pdf) as doc:
+            images = sum(len(page.get_images()) for page in doc)
+            previous_s = best_time(lambda: previous_candidates(processor, doc), runs)
+            current_s = best_time(lambda: current_candidates(processor, doc), runs)
+            rows = [('previous', previous_s, *previous_candidates(processor, doc)),
+                    ('current', current_s, *current_candidates(processor, doc))]
+
+        for version, elapsed, candidates, extracted in rows:
+            captioned = sum(1 for candidate in candidates if candidate["caption"])
+            click.echo(f"{pdf.name[:40]:<40} {images:>7} {version:<9} {elapsed * 1000:>6.0f}ms "
+                       f"{previous_s / elapsed:>7.1f}x {extracted:>10} {len(candidates):>11} "
+                       f"{captioned:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Micro-benchmark for section detection.
+
+Compares PDFProcessor._extract_sections (one pass of a combined,
+precompiled pattern) against the previous approach of one re.finditer scan
+per heading pattern followed by a sort. Each PDF's text is tiled
+``--repeat`` times to stand in for long theses (use a real 100+ page PDF
+for the most meaningful numbers).
+
+Usage:
+    uv run python benchmarks/sections.py thesis.pdf [--repeat 10] [--runs 20]
+"""
+
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+import click
+import pymupdf
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from hedorah.pdf_processor import PDFProcessor  # noqa: E402
+
+PREVIOUS_PATTERNS = [
+    r'\n\s*(\d+\.?\s+)?Abstract\s*\n',
+    r'\n\s*(\d+\.?\s+)?Introduction\s*\n',
+    r'\n\s*(\d+\.?\s+)?Related Work\s*\n',
+    r'\n\s*(\d+\.?\s+)?Background\s*\n',
+    r'\n\s*(\d+\.?\s+)?Methodology\s*\n',
+    r'\n\s*(\d+\.?\s+)?Methods\s*\n',
+    r'\n\s*(\d+\.?\s+)?Experiments?\s*\n',
+    r'\n\s*(\d+\.?\s+)?Results\s*\n',
+    r'\n\s*(\d+\.?\s+)?Discussion\s*\n',
+    r'\n\s*(\d+\.?\s+)?Conclusion\s*\n',
+    r'\n\s*(\d+\.?\s+)?References\s*\n',
+]
+
+
+def previous_extract_sections(text: str) -> Dict[str, str]:
+    """The multi-scan implementation this benchmark compares against."""
+    sections = {}
+    section_matches = []
+    for pattern in PREVIOUS_PATTERNS:
+        for match in re.finditer(pattern, text, re.IGNORECASE):
+            section_name = re.sub(r'^\d+\.?\s*', '', match.group(0).strip())
+            section_matches.append((match.start(), section_name))
+    section_matches.sort(key=lambda x: x[0])
+    for i, (start, name) in enumerate(section_matches):
+        end = section_matches[i + 1][0] if i < len(section_matches) - 1 else len(text)
+        sections[name] = text[start:end].strip()
+    return sections
+
+
+def best_time(func, runs: int) -> float:
+    """Fastest of ``runs`` calls, in milliseconds."""
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return min(times) * 1000
+
+
+@click.command()
+@click.argument('pdfs', nargs=-1, required=True, type=click.Path(exists=True, path_type=Path))
+@click.option('--repeat', default=10, show_default=True, help='Times to tile each text')
+@click.option('--runs', default=20, show_default=True, help='Timed runs (best is reported)')
+def main(pdfs: List[Path], repeat: int, runs: int):
+    """Benchmark section detection on PDFS."""
+    processor = PDFProcessor()
+
+    click.echo(f"{'paper':<40} {'pages':>6} {'chars':>10} {'previous':>10} {'single-pass':>12} "
+               f"{'speedup':>8} {'sections':>9} {'kept':>5}")
+    for pdf in pdfs:
+        with pymupdf.open(pdf) as doc:
+            page_text, page_offsets = processor._join_pages([page.get_text() for page in doc])
+        text = "\n".join([page_text] * repeat)
+        page_starts = [copy * (len(page_text) + 1) + offset
+                       for copy in range(repeat) for offset in page_offsets]
+        pages = len(page_starts)
+
+        previous_ms = best_time(lambda: previous_extract_sections(text), runs)
+        current_ms = best_time(lambda: processor._extract_sections(text, page_starts), runs)
+        found = len(processor._extract_sections(text, page_starts)[0])
+        kept = len(previous_extract_sections(text))
+
+        click.echo(f"{pdf.name[:40]:<40} {pages:>6} {len(text):>10} {previous_ms:>8.2f}ms "
+                   f"{current_ms:>10.2f}ms {previous_ms / current_ms:>7.1f}x {found:>9} {kept:>5}")
+
+    click.echo("\nsections: sections returned now; kept: sections the previous version "
+               "returned (duplicate headings overwrote each other)")
+
+
+if __name__ == '__main__':
+    main()
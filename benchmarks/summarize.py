@@ -0,0 +1,94 @@
+"""Compare single-shot and map-reduce paper summarization.
+
+Runs both summary modes against the Ollama model in config.yaml (responses
+are not cached) and reports, per paper and mode:
+
+- latency: wall-clock seconds for the whole summary
+- calls: Ollama requests made
+- coverage: share of the paper's body text (lines of 30+ characters,
+  references excluded) that appeared in at least one prompt
+- output: number of claims, techniques, terms and limitations extracted
+
+Usage:
+    uv run python benchmarks/summarize.py paper.pdf [more.pdf ...] -c config.yaml
+"""
+
+import re
+import sys
+import time
+import logging
+from pathlib import Path
+from typing import List
+import click
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from hedorah.config import Config  # noqa: E402
+from hedorah.llm import OllamaClient  # noqa: E402
+from hedorah.pdf_processor import PDFProcessor, PDFContent  # noqa: E402
+
+
+class RecordingOllamaClient(OllamaClient):
+    """OllamaClient that keeps every prompt it sends."""
+
+    def __init__(self, config: Config):
+        super().__init__(config, cache=None)
+        self.prompts: List[str] = []
+
+    def generate(self, prompt: str, system: str = None, expect_json: bool = False) -> str:
+        self.prompts.append(prompt)
+        return super().generate(prompt, system=system, expect_json=expect_json)
+
+
+def body_lines(content: PDFContent) -> List[str]:
+    """Lines of the paper body long enough to be meaningful, without references."""
+    text = re.split(r'\n\s*(?:\d+\.?\s+)?References\s*\n', content.full_text, flags=re.IGNORECASE)[0]
+    return [line.strip() for line in text.split('\n') if len(line.strip()) >= 30]
+
+
+def coverage(lines: List[str], prompts: List[str]) -> float:
+    """Share of body characters that appeared in some prompt."""
+    seen = '\n'.join(prompts)
+    total = sum(len(line) for line in lines)
+    covered = sum(len(line) for line in lines if line in seen)
+    return covered / total if total else 0.0
+
+
+@click.command()
+@click.argument('pdfs', nargs=-1, required=True, type=click.Path(exists=True, path_type=Path))
+@click.option('--config', '-c', default='config.yaml', help='Path to configuration file')
+def main(pdfs: List[Path], config: str):
+    """Benchmark summary modes on PDFS."""
+    logging.basicConfig(level=logging.WARNING)
+    cfg = Config(config)
+    processor = PDFProcessor(extract_figures=False, extract_equations=False,
+                             extract_citations=False)
+
+    click.echo(f"{'paper':<40} {'mode':<11} {'latency':>8} {'calls':>6} {'coverage':>9} "
+               f"{'claims':>7} {'techniques':>11} {'terms':>6} {'limits':>7}")
+    for pdf in pdfs:
+        content = processor.process(pdf).materialize()
+        content.close()  # Extract up front so latency is the summary alone
+        lines = body_lines(content)
+
+        for mode in ('single', 'map_reduce'):
+            client = RecordingOllamaClient(cfg)
+            client.summary_mode = mode
+
+            started = time.perf_counter()
+            summary = client.summarize_paper(content)
+            elapsed = time.perf_counter() - started
+
+            methodology = summary.get('methodology') or {}
+            click.echo(
+                f"{pdf.name[:40]:<40} {mode:<11} {elapsed:>7.1f}s {len(client.prompts):>6} "
+                f"{coverage(lines, client.prompts):>8.0%} "
+                f"{len(summary.get('core_claims') or []):>7} "
+                f"{len(methodology.get('key_techniques') or []):>11} "
+                f"{len(summary.get('key_terminology') or {}):>6} "
+                f"{len(summary.get('limitations') or []):>7}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,455 @@
+"""Asyncio reasoning clients that stay within provider rate limits."""
+
+import random
+import asyncio
+import logging
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Mapping
+import anthropic
+import openai
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from .config import Config
+from .pdf_processor import PDFContent
+from .cache import ResponseCache
+from .ratelimit import RateLimiter, estimate_tokens
+from .llm import (
+    ReasoningClient, TokenUsage, ANALYSIS_MAX_TOKENS, EXPERIMENTS_MAX_TOKENS,
+    build_analysis_prompt, parse_analysis, build_experiments_prompt, parse_experiments,
+    anthropic_cached_params, join_context, gemini_prompt, analysis_input_budget
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Completion:
+    """A provider response with its token usage."""
+    text: str
+    input_tokens: Optional[int] = None  # Uncached input tokens
+    output_tokens: Optional[int] = None
+    cached_tokens: int = 0   # Read from the provider's prompt cache
+    written_tokens: int = 0  # Written to the prompt cache
+
+
+def _retry_after_header(headers: Mapping[str, str]) -> Optional[float]:
+    """Read a retry delay from response headers.
+
+    Args:
+        headers: HTTP response headers
+
+    Returns:
+        Seconds to wait, or None if the server did not say
+    """
+    for name, scale in (('retry-after-ms', 0.001), ('retry-after', 1.0)):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return float(value) * scale
+        except ValueError:
+            # HTTP-date form; fall back to backoff
+            return None
+    return None
+
+
+class AsyncReasoningClient(ABC):
+    """Base class for asyncio reasoning clients.
+
+    Every request passes through a token-bucket RateLimiter configured by
+    ``llm.reasoning.rate_limits``: prompt tokens are estimated before
+    sending, the reservation is corrected from the reported usage, and a
+    429 pauses all requests for the server's ``retry-after``. Many
+    requests can be in flight at once without tripping the limits.
+    """
+
+    # Provider name, part of the response cache key (matches the sync clients)
+    provider: str = ''
+
+    def __init__(self, config: Config, cache: Optional[ResponseCache] = None):
+        """Initialize async client.
+
+        Args:
+            config: Hedorah configuration
+            cache: Response cache for repeated requests (optional)
+        """
+        self.config = config
+        self.cache = cache
+        self.model = config.reasoning_model
+        self.limiter = RateLimiter.from_config(config.get('llm.reasoning.rate_limits'))
+        self.max_retries = config.get('llm.reasoning.max_retries', 5)
+        self.usage = TokenUsage()
+        self.input_budget = analysis_input_budget(config)
+
+    async def generate(self, prompt: str, system: str = None, max_tokens: int = 4000,
+                       context: str = None) -> str:
+        """Generate text, serving repeated requests from the cache.
+
+        Args:
+            prompt: User prompt
+            system: System prompt (optional)
+            max_tokens: Maximum tokens to generate
+            context: Stable, cacheable user-turn prefix (optional)
+
+        Returns:
+            Generated text
+        """
+        if self.cache is None:
+            return await self.complete(prompt, system, max_tokens, context)
+
+        cache_key = self.cache.make_key(
+            provider=self.provider,
+            model=self.model,
+            prompt=prompt,
+            system=system,
+            context=context,
+            max_tokens=max_tokens
+        )
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        text = await self.complete(prompt, system, max_tokens, context)
+        self.cache.put(cache_key, text)
+        return text
+
+    async def complete(self, prompt: str, system: str = None, max_tokens: int = 4000,
+                       context: str = None) -> str:
+        """Generate text within the rate limits, retrying throttled and transient errors.
+
+        Args:
+            prompt: User prompt
+            system: System prompt (optional)
+            max_tokens: Maximum tokens to generate
+            context: Stable, cacheable user-turn prefix (optional)
+
+        Returns:
+            Generated text
+        """
+        estimated_input = (estimate_tokens(system) + estimate_tokens(context)
+                           + estimate_tokens(prompt))
+
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire(estimated_input, max_tokens)
+            try:
+                completion = await self._generate(prompt, system, max_tokens, context)
+            except Exception as e:
+                # Rejected requests do not count against token limits
+                self.limiter.settle(estimated_input, max_tokens, 0, 0)
+                if attempt == self.max_retries:
+                    raise
+
+                retry_after = self._rate_limit_delay(e)
+                if retry_after is not None:
+                    self.limiter.pause(retry_after or self._backoff(attempt))
+                elif self._is_transient(e):
+                    delay = self._backoff(attempt)
+                    logger.warning(f"{self.provider} request failed ({e}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                else:
+                    raise
+                continue
+
+            # Cache reads do not count towards input token limits
+            actual_input = None
+            if completion.input_tokens is not None:
+                actual_input = completion.input_tokens + completion.written_tokens
+                self.usage.record(self.provider, completion.input_tokens,
+                                  cached=completion.cached_tokens,
+                                  written=completion.written_tokens,
+                                  output=completion.output_tokens or 0)
+            self.limiter.settle(estimated_input, max_tokens, actual_input, completion.output_tokens)
+            return completion.text
+
+    async def analyze_paper(self, content: PDFContent, summary: Dict[str, Any],
+                            user_notes: List[Dict[str, str]] = None,
+                            agenda: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Perform deep analysis of a research paper.
+
+        Args:
+            content: Extracted PDF content
+            summary: Summary from local model
+            user_notes: Optional list of user notes from vault to incorporate
+            agenda: Optional research agenda to guide analysis
+
+        Returns:
+            Deep analysis with insights and connections
+        """
+        prompt = build_analysis_prompt(content, summary, user_notes, agenda, self.input_budget)
+        response = await self.generate(prompt.prompt, system=prompt.system,
+                                       max_tokens=ANALYSIS_MAX_TOKENS, context=prompt.context)
+        return parse_analysis(response)
+
+    async def generate_experiments(self, content: PDFContent, analysis: Dict[str, Any],
+                                   agenda: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Generate experiment proposals based on the paper.
+
+        Args:
+            content: Extracted PDF content
+            analysis: Deep analysis results
+            agenda: Optional research agenda to guide experiment design
+
+        Returns:
+            List of experiment proposals
+        """
+        prompt = build_experiments_prompt(content, analysis, agenda)
+        response = await self.generate(prompt.prompt, system=prompt.system,
+                                       max_tokens=EXPERIMENTS_MAX_TOKENS, context=prompt.context)
+        return parse_experiments(response)
+
+    async def close(self) -> None:
+        """Close the SDK client's connections."""
+        pass
+
+    @abstractmethod
+    async def _generate(self, prompt: str, system: str = None, max_tokens: int = 4000,
+                        context: str = None) -> Completion:
+        """Make one provider request (no caching, limiting or retries)."""
+        pass
+
+    @abstractmethod
+    def _rate_limit_delay(self, error: Exception) -> Optional[float]:
+        """Get the retry delay for a rate-limit error.
+
+        Returns:
+            None if ``error`` is not a rate-limit error, otherwise the
+            server's retry-after in seconds (0 if it did not say)
+        """
+        pass
+
+    @abstractmethod
+    def _is_transient(self, error: Exception) -> bool:
+        """Whether ``error`` is a connection or server error worth retrying."""
+        pass
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        """Exponential backoff with jitter."""
+        return min(60.0, 2.0 ** attempt) * random.uniform(0.5, 1.0)
+
+
+class AsyncClaudeClient(AsyncReasoningClient):
+    """Async client for Claude API (Anthropic)."""
+
+    provider = 'anthropic'
+
+    def __init__(self, config: Config, cache: Optional[ResponseCache] = None):
+        """Initialize async Claude client.
+
+        Args:
+            config: Hedorah configuration
+            cache: Response cache for repeated requests (optional)
+        """
+        super().__init__(config, cache)
+        api_key = config.get('llm.reasoning.api_key')
+        if not api_key or api_key.startswith('${'):
+            raise ValueError("Anthropic API key not configured")
+        # Retries are handled here so they go through the rate limiter
+        self.client = anthropic.AsyncAnthropic(api_key=api_key, max_retries=0)
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    async def _generate(self, prompt: str, system: str = None, max_tokens: int = 4000,
+                        context: str = None) -> Completion:
+        response = await self.client.messages.create(
+            model=self.model,
+            max_tokens=max_tokens,
+            **anthropic_cached_params(prompt, system, context)
+        )
+        usage = response.usage
+        return Completion(response.content[0].text, usage.input_tokens, usage.output_tokens,
+                          cached_tokens=usage.cache_read_input_tokens or 0,
+                          written_tokens=usage.cache_creation_input_tokens or 0)
+
+    def _rate_limit_delay(self, error: Exception) -> Optional[float]:
+        if isinstance(error, anthropic.RateLimitError):
+            return _retry_after_header(error.response.headers) or 0.0
+        return None
+
+    def _is_transient(self, error: Exception) -> bool:
+        return isinstance(error, (anthropic.APIConnectionError, anthropic.InternalServerError))
+
+
+class AsyncOpenAIClient(AsyncReasoningClient):
+    """Async client for OpenAI API (GPT-4, o1, etc.)."""
+
+    provider = 'openai'
+
+    def __init__(self, config: Config, cache: Optional[ResponseCache] = None):
+        """Initialize async OpenAI client.
+
+        Args:
+            config: Hedorah configuration
+            cache: Response cache for repeated requests (optional)
+        """
+        super().__init__(config, cache)
+        api_key = config.get('llm.reasoning.api_key')
+        if not api_key or api_key.startswith('${'):
+            raise ValueError("OpenAI API key not configured")
+        # Retries are handled here so they go through the rate limiter
+        self.client = openai.AsyncOpenAI(api_key=api_key, max_retries=0)
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    async def _generate(self, prompt: str, system: str = None, max_tokens: int = 4000,
+                        context: str = None) -> Completion:
+        messages = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": join_context(prompt, context)})
+
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens
+        )
+        usage = response.usage
+        if not usage:
+            return Completion(response.choices[0].message.content)
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached = (details.cached_tokens or 0) if details else 0
+        return Completion(response.choices[0].message.content, usage.prompt_tokens - cached,
+                          usage.completion_tokens, cached_tokens=cached)
+
+    def _rate_limit_delay(self, error: Exception) -> Optional[float]:
+        if isinstance(error, openai.RateLimitError):
+            return _retry_after_header(error.response.headers) or 0.0
+        return None
+
+    def _is_transient(self, error: Exception) -> bool:
+        return isinstance(error, (openai.APIConnectionError, openai.InternalServerError))
+
+
+class AsyncGeminiClient(AsyncReasoningClient):
+    """Async client for Google Gemini API."""
+
+    provider = 'gemini'
+
+    def __init__(self, config: Config, cache: Optional[ResponseCache] = None):
+        """Initialize async Gemini client.
+
+        Args:
+            config: Hedorah configuration
+            cache: Response cache for repeated requests (optional)
+        """
+        super().__init__(config, cache)
+        api_key = config.get('llm.reasoning.api_key')
+        if not api_key or api_key.startswith('${'):
+            raise ValueError("Google API key not configured")
+        genai.configure(api_key=api_key)
+        self.client = genai.GenerativeModel(config.reasoning_model)
+
+    async def _generate(self, prompt: str, system: str = None, max_tokens: int = 4000,
+                        context: str = None) -> Completion:
+        full_prompt = gemini_prompt(prompt, system, context)
+
+        response = await self.client.generate_content_async(
+            full_prompt,
+            generation_config=genai.types.GenerationConfig(
+                max_output_tokens=max_tokens
+            )
+        )
+        usage = getattr(response, 'usage_metadata', None)
+        if not usage:
+            return Completion(response.text)
+        cached = getattr(usage, 'cached_content_token_count', 0) or 0
+        return Completion(response.text, usage.prompt_token_count - cached,
+                          usage.candidates_token_count, cached_tokens=cached)
+
+    def _rate_limit_delay(self, error: Exception) -> Optional[float]:
+        # Gemini does not report a retry delay, so back off
+        if isinstance(error, google_exceptions.ResourceExhausted):
+            return 0.0
+        return None
+
+    def _is_transient(self, error: Exception) -> bool:
+        return isinstance(error, (google_exceptions.ServiceUnavailable,
+                                  google_exceptions.InternalServerError))
+
+
+def create_async_reasoning_client(config: Config,
+                                  cache: Optional[ResponseCache] = None) -> AsyncReasoningClient:
+    """Factory function to create the appropriate async reasoning client.
+
+    Args:
+        config: Hedorah configuration
+        cache: Response cache for repeated requests (optional)
+
+    Returns:
+        AsyncReasoningClient instance
+
+    Raises:
+        ValueError: If provider is not supported
+    """
+    provider = config.get('llm.reasoning.provider', 'anthropic').lower()
+
+    if provider == 'anthropic':
+        return AsyncClaudeClient(config, cache)
+    elif provider == 'openai':
+        return AsyncOpenAIClient(config, cache)
+    elif provider == 'gemini' or provider == 'google':
+        return AsyncGeminiClient(config, cache)
+    else:
+        raise ValueError(f"Unsupported reasoning provider: {provider}")
+
+
+class RateLimitedReasoningClient(ReasoningClient):
+    """Synchronous ReasoningClient backed by an async client on its own event loop.
+
+    Calls from any number of threads (e.g. the batch processor's reasoning
+    pool) are run concurrently on one background event loop and share a
+    single rate limiter, so raising ``batch.reasoning_workers`` uses the
+    provider quota fully without tripping 429s.
+    """
+
+    def __init__(self, config: Config, cache: Optional[ResponseCache] = None):
+        """Initialize rate-limited client.
+
+        Args:
+            config: Hedorah configuration
+            cache: Response cache for repeated requests (optional)
+        """
+        # The sync base class handles caching
+        super().__init__(config, cache)
+        self.async_client = create_async_reasoning_client(config)
+        self.provider = self.async_client.provider
+        self.model = self.async_client.model
+        self.usage = self.async_client.usage
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever,
+                                        name="hedorah-reasoning-loop", daemon=True)
+        self._thread.start()
+
+    def _generate(self, prompt: str, system: str = None, max_tokens: int = 4000,
+                  context: str = None) -> str:
+        """Generate text on the event loop, waiting for the result.
+
+        Args:
+            prompt: User prompt
+            system: System prompt (optional)
+            max_tokens: Maximum tokens to generate
+            context: Stable, cacheable user-turn prefix (optional)
+
+        Returns:
+            Generated text
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self.async_client.complete(prompt, system, max_tokens, context), self._loop
+        )
+        return future.result()
+
+    def close(self) -> None:
+        """Close the async client's connections and stop the event loop thread."""
+        if self._loop.is_closed():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self.async_client.close(), self._loop).result()
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
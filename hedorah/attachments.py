@@ -0,0 +1,178 @@
+"""Content-addressed store for extracted figures and other note attachments."""
+
+import os
+import re
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List
+from .cache import atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+# Stored files are named by the first NAME_HEX_CHARS hex digits of their
+# SHA-256; only files named like this are ever garbage collected
+NAME_HEX_CHARS = 24
+STORED_NAME_RE = re.compile(rf'^[0-9a-f]{{{NAME_HEX_CHARS}}}\.[A-Za-z0-9]+$')
+
+
+def store_attachment(directory: Path, data: bytes, ext: str) -> Path:
+    """Store a file under the hash of its contents.
+
+    The file is written (atomically) only if no file with that content is
+    stored yet, so identical images extracted from different papers share
+    one file and papers never overwrite each other's attachments. Safe to
+    call from several processes at once.
+
+    Args:
+        directory: Attachments folder
+        data: File contents
+        ext: File extension, without the dot
+
+    Returns:
+        Path of the stored file
+    """
+    name = f"{hashlib.sha256(data).hexdigest()[:NAME_HEX_CHARS]}.{ext}"
+    path = directory / name
+    try:
+        # Already stored; refreshing the mtime keeps gc from collecting it
+        # before the paper that is reusing it gets its notes written
+        os.utime(path)
+    except FileNotFoundError:
+        atomic_write_bytes(path, data, mode=0o644)
+    return path
+
+
+class AttachmentIndex:
+    """Reference counts for stored attachments.
+
+    Each note that embeds stored attachments is recorded as their owner
+    (by its path relative to the vault). An attachment with no owners left,
+    because its notes were deleted or regenerated with other figures, is an
+    orphan and is removed by ``gc()``.
+    """
+
+    def __init__(self, db_path: Path, attachments_dir: Path, vault_path: Path):
+        """Initialize attachment index.
+
+        Args:
+            db_path: Path to the index database file
+            attachments_dir: Folder holding stored attachments
+            vault_path: Vault root (owner paths are relative to it)
+        """
+        self.attachments_dir = attachments_dir
+        self.vault_path = vault_path
+        self._lock = threading.Lock()
+
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS refs ("
+            "owner TEXT NOT NULL, name TEXT NOT NULL, PRIMARY KEY (owner, name))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS refs_name ON refs (name)")
+        self._conn.commit()
+
+    def set_refs(self, owner: Path, paths: Iterable[Path]) -> None:
+        """Record the stored attachments a note embeds, replacing earlier ones.
+
+        Args:
+            owner: Note embedding the attachments
+            paths: Attachment paths (files not in the store are ignored)
+        """
+        names = sorted({path.name for path in paths if STORED_NAME_RE.match(path.name)})
+        owner_key = self._owner_key(owner)
+        with self._lock:
+            self._conn.execute("DELETE FROM refs WHERE owner = ?", (owner_key,))
+            self._conn.executemany("INSERT INTO refs (owner, name) VALUES (?, ?)",
+                                   [(owner_key, name) for name in names])
+            self._conn.commit()
+
+    def ref_counts(self) -> Dict[str, int]:
+        """Get the number of notes referencing each stored attachment.
+
+        Returns:
+            Dictionary mapping attachment file names to reference counts
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT name, COUNT(*) FROM refs GROUP BY name").fetchall()
+        return dict(rows)
+
+    def gc(self, grace_seconds: float = 86400, dry_run: bool = False,
+           live: Iterable[str] = ()) -> List[Path]:
+        """Remove orphaned attachments.
+
+        References from notes that no longer exist are dropped first.
+        Attachments in ``live`` are never removed: pass those of papers
+        still being processed (pending checkpoints, deferred batch jobs),
+        which have stored their figures but not yet written the notes that
+        reference them. Other unreferenced attachments modified within
+        ``grace_seconds`` are kept too, covering papers being extracted
+        right now.
+
+        Args:
+            grace_seconds: Minimum age of an orphan before it is removed
+            dry_run: Only report what would be removed
+            live: File names of attachments in use outside any note
+
+        Returns:
+            Paths of the removed (or, on a dry run, removable) attachments
+        """
+        with self._lock:
+            owners = [row[0] for row in self._conn.execute("SELECT DISTINCT owner FROM refs")]
+        missing = [owner for owner in owners if not (self.vault_path / owner).exists()]
+        if missing and not dry_run:
+            with self._lock:
+                self._conn.executemany("DELETE FROM refs WHERE owner = ?",
+                                       [(owner,) for owner in missing])
+                self._conn.commit()
+            logger.info(f"Dropped attachment references from {len(missing)} deleted notes")
+
+        with self._lock:
+            query = "SELECT DISTINCT name FROM refs"
+            params: tuple = ()
+            if missing and dry_run:
+                query += f" WHERE owner NOT IN ({','.join('?' * len(missing))})"
+                params = tuple(missing)
+            referenced = {row[0] for row in self._conn.execute(query, params)}
+        referenced.update(live)
+
+        if not self.attachments_dir.exists():
+            return []
+
+        cutoff = time.time() - grace_seconds
+        orphans = []
+        with os.scandir(self.attachments_dir) as entries:
+            for entry in entries:
+                if (not entry.is_file() or not STORED_NAME_RE.match(entry.name)
+                        or entry.name in referenced):
+                    continue
+                if entry.stat().st_mtime > cutoff:
+                    continue
+                path = Path(entry.path)
+                if not dry_run:
+                    try:
+                        path.unlink()
+                    except FileNotFoundError:
+                        continue
+                orphans.append(path)
+
+        if orphans and not dry_run:
+            logger.info(f"Removed {len(orphans)} orphaned attachments")
+        return orphans
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _owner_key(self, owner: Path) -> str:
+        """Get a note's path relative to the vault, as stored."""
+        try:
+            return owner.resolve().relative_to(self.vault_path.resolve()).as_posix()
+        except ValueError:
+            return owner.resolve().as_posix()
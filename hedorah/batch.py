@@ -0,0 +1,360 @@
+"""Concurrent batch processing for Hedorah.
+
+Papers move through three stages like an assembly line, each with its own
+worker pool:
+
+1. extract   - PDF extraction (CPU-bound, process pool)
+2. local     - figure descriptions and summary with the local model (thread pool)
+3. reasoning - deep analysis, experiments and note creation (thread pool)
+
+While one paper is being analyzed by the reasoning model, the next can be
+summarized by Ollama and the one after that extracted on another core.
+"""
+
+import os
+import time
+import logging
+import threading
+from pathlib import Path
+from dataclasses import dataclass, field
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, TYPE_CHECKING
+from .pdf_processor import PDFProcessor, PDFContent
+from .checkpoint import PaperCheckpoint
+
+if TYPE_CHECKING:
+    from .pipeline import HedorahPipeline
+
+logger = logging.getLogger(__name__)
+
+
+def _extract_worker(processor: PDFProcessor, pdf_path: Path, output_dir: Path,
+                    digest: str) -> Tuple[PDFContent, float]:
+    """Extract a PDF in a worker process.
+
+    Args:
+        processor: PDF processor (pickled into the worker)
+        pdf_path: Path to the PDF file
+        output_dir: Directory to save extracted figures
+        digest: Content hash of the PDF (extraction cache key)
+
+    Returns:
+        Tuple of (extracted content, seconds spent extracting)
+    """
+    # Papers already run in parallel here; splitting their pages across
+    # more processes would only oversubscribe the cores
+    processor.page_workers = 1
+    started = time.monotonic()
+    # Content is pickled back to the parent, so extract every field here
+    with processor.process(pdf_path, output_dir, digest) as content:
+        content.materialize()
+    return content, time.monotonic() - started
+
+
+@dataclass
+class _Job:
+    """A paper moving through the assembly line."""
+    pdf_path: Path
+    digest: str
+    checkpoint: Optional[PaperCheckpoint] = None
+    timings: Dict[str, float] = field(default_factory=dict)  # Seconds per stage
+
+
+@dataclass
+class StageStats:
+    """Counters for one stage of the batch assembly line."""
+    name: str
+    workers: int
+    pending: int = 0  # Submitted but not yet finished
+    completed: int = 0
+    failed: int = 0
+
+    @property
+    def active(self) -> int:
+        """Number of papers currently being worked on."""
+        return min(self.pending, self.workers)
+
+    @property
+    def queued(self) -> int:
+        """Number of papers waiting for a free worker."""
+        return max(0, self.pending - self.workers)
+
+
+@dataclass
+class BatchStats:
+    """Aggregate progress for a batch run."""
+    total: int
+    stages: Dict[str, StageStats]
+    completed: int = 0
+    failed: int = 0
+    skipped: int = 0  # Already processed according to the ledger
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        """Elapsed wall-clock time in seconds."""
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+
+    @property
+    def papers_per_minute(self) -> float:
+        """Aggregate throughput of finished papers (successful or failed)."""
+        minutes = self.elapsed / 60
+        if minutes <= 0:
+            return 0.0
+        return (self.completed + self.failed) / minutes
+
+    def format(self) -> str:
+        """Format a one-line progress report.
+
+        Returns:
+            Human-readable progress string
+        """
+        stage_parts = [
+            f"{s.name}: {s.queued} queued/{s.active} active"
+            for s in self.stages.values()
+        ]
+        return (f"{self.completed + self.failed}/{self.total} papers "
+                f"({self.failed} failed, {self.skipped} skipped), "
+                f"{self.papers_per_minute:.2f} papers/min | "
+                + ", ".join(stage_parts))
+
+
+class BatchProcessor:
+    """Processes many papers concurrently with per-stage worker pools."""
+
+    def __init__(self, pipeline: "HedorahPipeline",
+                 extract_workers: Optional[int] = None,
+                 local_workers: int = 2,
+                 reasoning_workers: int = 2,
+                 report_interval: float = 30.0):
+        """Initialize batch processor.
+
+        Args:
+            pipeline: Hedorah pipeline whose stages are run
+            extract_workers: PDF extraction processes (default: one per CPU core)
+            local_workers: Concurrent local-model (Ollama) calls
+            reasoning_workers: Concurrent reasoning-API calls
+            report_interval: Seconds between progress reports
+        """
+        self.pipeline = pipeline
+        self.extract_workers = extract_workers or os.cpu_count() or 1
+        self.local_workers = max(1, local_workers)
+        self.reasoning_workers = max(1, reasoning_workers)
+        self.report_interval = report_interval
+
+        self.skip_experiments = False
+        self.stats: Optional[BatchStats] = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._results: Dict[str, Dict[str, Any]] = {}
+
+    def run(self, pdf_files: List[Path], skip_experiments: bool = False,
+            force: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Process a list of PDFs through the assembly line.
+
+        Papers the ledger records as done are skipped unless ``force`` is set.
+
+        Args:
+            pdf_files: PDF files to process
+            skip_experiments: Skip experiment generation
+            force: Reprocess papers that were already processed
+
+        Returns:
+            Dictionary mapping PDF names to their created notes (or an error)
+        """
+        ledger = self.pipeline.ledger
+        jobs = []
+        skipped = 0
+        for pdf_path in pdf_files:
+            digest = ledger.digest(pdf_path)
+            if not force and ledger.is_done(digest):
+                logger.info(f"Skipping {pdf_path.name}: already processed (use --force to redo)")
+                skipped += 1
+                continue
+            jobs.append(_Job(pdf_path, digest))
+
+        self.stats = BatchStats(
+            total=len(jobs),
+            skipped=skipped,
+            stages={
+                'extract': StageStats('extract', self.extract_workers),
+                'local': StageStats('local', self.local_workers),
+                'reasoning': StageStats('reasoning', self.reasoning_workers),
+            }
+        )
+        self._results = {}
+        self._done.clear()
+        self.skip_experiments = skip_experiments
+
+        if not jobs:
+            self.stats.finished_at = time.monotonic()
+            return {}
+
+        logger.info(f"Starting batch of {len(jobs)} papers with "
+                    f"{self.extract_workers} extract, {self.local_workers} local and "
+                    f"{self.reasoning_workers} reasoning workers")
+
+        attachments_dir = self.pipeline.config.get_vault_folder('attachments')
+        self._extract_pool = ProcessPoolExecutor(max_workers=self.extract_workers)
+        self._local_pool = ThreadPoolExecutor(max_workers=self.local_workers,
+                                              thread_name_prefix='hedorah-local')
+        self._reasoning_pool = ThreadPoolExecutor(max_workers=self.reasoning_workers,
+                                                  thread_name_prefix='hedorah-reasoning')
+
+        cancel = False
+        try:
+            for job in jobs:
+                pdf_path = job.pdf_path
+                try:
+                    ledger.mark_started(job.digest, pdf_path)
+                    if self.pipeline.checkpoints:
+                        job.checkpoint = self.pipeline.checkpoints.for_paper(
+                            pdf_path, skip_experiments, job.digest
+                        )
+                except Exception as e:
+                    self._stage_started('extract')
+                    self._fail(job, 'extract', e)
+                    continue
+
+                if job.checkpoint and job.checkpoint.has('content'):
+                    # Extracted (perhaps only partly) by an earlier, interrupted run
+                    try:
+                        with self.pipeline.pdf_processor.attach(
+                                job.checkpoint.load('content'), pdf_path,
+                                attachments_dir) as content:
+                            content.materialize()
+                    except Exception as e:
+                        self._stage_started('extract')
+                        self._fail(job, 'extract', e)
+                        continue
+                    self._submit(self._local_pool, 'local', self._run_local, job, content)
+                    continue
+
+                self._stage_started('extract')
+                future = self._extract_pool.submit(
+                    _extract_worker, self.pipeline.pdf_processor, pdf_path, attachments_dir,
+                    job.digest
+                )
+                future.add_done_callback(
+                    lambda f, job=job: self._on_extracted(job, f)
+                )
+
+            while not self._done.wait(self.report_interval):
+                logger.info(f"Batch progress: {self.stats.format()}")
+        except KeyboardInterrupt:
+            logger.warning("Batch interrupted, cancelling pending papers")
+            cancel = True
+            raise
+        finally:
+            self._shutdown(cancel)
+
+        self.stats.finished_at = time.monotonic()
+        logger.info(f"Batch complete: {self.stats.format()}")
+        if self.pipeline.response_cache:
+            logger.info(f"LLM response cache: {self.pipeline.response_cache.format_stats()}")
+        logger.info(f"Reasoning input tokens: {self.pipeline.reasoning_client.usage.format()}")
+        return self._results
+
+    def _shutdown(self, cancel: bool = False) -> None:
+        """Shut down all worker pools.
+
+        Args:
+            cancel: Cancel papers that have not started yet
+        """
+        for pool in (self._extract_pool, self._local_pool, self._reasoning_pool):
+            pool.shutdown(wait=not cancel, cancel_futures=cancel)
+
+    def _on_extracted(self, job: _Job, future: Future) -> None:
+        """Hand an extracted paper to the local-model stage."""
+        try:
+            content, job.timings['extract'] = future.result()
+            if job.checkpoint:
+                job.checkpoint.save('content', content)
+        except Exception as e:
+            self._fail(job, 'extract', e)
+            return
+
+        self._stage_finished('extract')
+        self._submit(self._local_pool, 'local', self._run_local, job, content)
+
+    def _run_local(self, job: _Job, content: PDFContent) -> None:
+        """Run the local-model stage and hand off to the reasoning stage."""
+        started = time.monotonic()
+        try:
+            summary = self.pipeline.run_local_stage(content, job.checkpoint)
+            job.timings['local'] = time.monotonic() - started
+        except Exception as e:
+            self._fail(job, 'local', e)
+            return
+
+        self._stage_finished('local')
+        self._submit(self._reasoning_pool, 'reasoning', self._run_reasoning,
+                     job, content, summary)
+
+    def _run_reasoning(self, job: _Job, content: PDFContent,
+                       summary: Dict[str, Any]) -> None:
+        """Run the reasoning stage and write the paper's notes."""
+        started = time.monotonic()
+        try:
+            analysis, experiments = self.pipeline.run_reasoning_stage(
+                content, summary, self.skip_experiments, job.checkpoint
+            )
+            created_notes = self.pipeline._create_notes(content, summary, analysis, experiments)
+            job.timings['reasoning'] = time.monotonic() - started
+            if job.checkpoint:
+                job.checkpoint.complete()
+            self.pipeline.ledger.mark_done(job.digest, job.pdf_path, created_notes,
+                                           job.timings, self.pipeline.model_versions)
+        except Exception as e:
+            self._fail(job, 'reasoning', e)
+            return
+
+        self._stage_finished('reasoning')
+        logger.info(f"Successfully processed {job.pdf_path.name}")
+        with self._lock:
+            self._results[job.pdf_path.name] = created_notes
+            self.stats.completed += 1
+        self._check_done()
+
+    def _submit(self, pool: ThreadPoolExecutor, stage: str, fn, *args) -> None:
+        """Submit work to a stage's pool, recording it as pending."""
+        self._stage_started(stage)
+        try:
+            pool.submit(fn, *args)
+        except RuntimeError as e:
+            # Pool already shut down (e.g. after an interrupt)
+            self._fail(args[0], stage, e)
+
+    def _stage_started(self, stage: str) -> None:
+        with self._lock:
+            self.stats.stages[stage].pending += 1
+
+    def _stage_finished(self, stage: str, failed: bool = False) -> None:
+        with self._lock:
+            stage_stats = self.stats.stages[stage]
+            stage_stats.pending -= 1
+            if failed:
+                stage_stats.failed += 1
+            else:
+                stage_stats.completed += 1
+
+    def _fail(self, job: _Job, stage: str, error: Exception) -> None:
+        """Record a paper that failed in the given stage."""
+        logger.error(f"Error processing {job.pdf_path.name} ({stage} stage): {error}",
+                     exc_info=error)
+        self._stage_finished(stage, failed=True)
+        try:
+            self.pipeline.ledger.mark_failed(job.digest, job.pdf_path, str(error))
+        except Exception:
+            logger.warning(f"Could not record failure of {job.pdf_path.name} in ledger")
+        with self._lock:
+            self._results[job.pdf_path.name] = {"error": str(error)}
+            self.stats.failed += 1
+        self._check_done()
+
+    def _check_done(self) -> None:
+        with self._lock:
+            if self.stats.completed + self.stats.failed >= self.stats.total:
+                self._done.set()
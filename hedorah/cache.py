@@ -0,0 +1,413 @@
+"""On-disk caches for expensive pipeline work."""
+
+import os
+import json
+import pickle
+import hashlib
+import logging
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Any, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .config import Config
+    from .pdf_processor import PDFContent
+
+logger = logging.getLogger(__name__)
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Compute the SHA-256 digest of a file's contents.
+
+    Args:
+        path: File to hash
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def atomic_write_bytes(path: Path, data: bytes, mode: Optional[int] = None) -> None:
+    """Write a file atomically via a temp file in the same directory.
+
+    Readers never see a partially written file, even with concurrent writers.
+
+    Args:
+        path: Destination path
+        data: Bytes to write
+        mode: Permission bits for the file (default: the temp file's 0600)
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        if mode is not None:
+            os.chmod(tmp_path, mode)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class ExtractionCache:
+    """Content-addressed cache of extracted PDFContent.
+
+    Entries are keyed by the PDF's content hash plus the processor options,
+    so a renamed or moved PDF still hits and changing an option misses.
+    Least-recently-used entries are evicted once the cache exceeds its size
+    limit (access time is tracked through the entry file's mtime).
+    """
+
+    # Bump when PDFContent's layout changes to invalidate old entries
+    VERSION = 5
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 500 * 1024 * 1024):
+        """Initialize extraction cache.
+
+        Args:
+            cache_dir: Directory holding cache entries
+            max_bytes: Total size above which old entries are evicted
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def key(self, pdf_path: Path, options: Dict[str, Any], digest: Optional[str] = None) -> str:
+        """Build the cache key for a PDF and processor options.
+
+        Args:
+            pdf_path: Path to the PDF file
+            options: Processor options that affect the extracted content
+            digest: SHA-256 of the PDF if already known (hashed from the file otherwise)
+
+        Returns:
+            Hex cache key
+        """
+        payload = json.dumps({
+            'version': self.VERSION,
+            'pdf': digest or file_digest(pdf_path),
+            'options': options,
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional["PDFContent"]:
+        """Load a cached extraction.
+
+        Entries whose extracted figure files have since changed or
+        disappeared are treated as misses.
+
+        Args:
+            key: Cache key from ``key()``
+
+        Returns:
+            Cached content, or None on a miss
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'rb') as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable extraction cache entry {key[:12]}: {e}")
+            self._remove(entry_path)
+            return None
+
+        for image_path, digest in entry['figure_digests']:
+            if not image_path.exists() or file_digest(image_path) != digest:
+                logger.info(f"Extraction cache entry {key[:12]} has stale figures, re-extracting")
+                self._remove(entry_path)
+                return None
+
+        # Mark as recently used for LRU eviction
+        try:
+            os.utime(entry_path)
+        except FileNotFoundError:
+            pass
+
+        return entry['content']
+
+    def put(self, key: str, content: "PDFContent") -> None:
+        """Store an extraction and evict old entries if over the size limit.
+
+        Args:
+            key: Cache key from ``key()``
+            content: Extracted content
+        """
+        entry = {
+            'content': content,
+            'figure_digests': [
+                (fig.image_path, file_digest(fig.image_path))
+                # Entries may be partial; figures that were never read have no files
+                for fig in getattr(content, 'figures', None) or [] if fig.image_path.exists()
+            ],
+        }
+        try:
+            atomic_write_bytes(self._entry_path(key),
+                               pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL))
+        except OSError as e:
+            logger.warning(f"Could not write extraction cache entry: {e}")
+            return
+        self._evict()
+
+    def clear(self) -> None:
+        """Remove all cache entries."""
+        for entry_path in self.cache_dir.glob("*.pkl"):
+            self._remove(entry_path)
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def _evict(self) -> None:
+        """Evict least-recently-used entries until under the size limit."""
+        entries = []
+        for entry_path in self.cache_dir.glob("*.pkl"):
+            try:
+                stat = entry_path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(entry_path)
+            total -= size
+            logger.debug(f"Evicted extraction cache entry {entry_path.stem[:12]}")
+
+    def _remove(self, entry_path: Path) -> None:
+        try:
+            entry_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class ResponseCache(ABC):
+    """Base class for LLM response caches.
+
+    Keys are a hash of the full request (provider, model, prompts and
+    generation parameters), so any change to a prompt is a miss.
+    """
+
+    def __init__(self):
+        """Initialize hit/miss counters."""
+        self.hits = 0
+        self.misses = 0
+        self._counter_lock = threading.Lock()
+
+    @staticmethod
+    def make_key(**request: Any) -> str:
+        """Build a cache key from request fields.
+
+        Args:
+            **request: Everything that determines the response
+
+        Returns:
+            Hex cache key
+        """
+        payload = json.dumps(request, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a cached response, counting the hit or miss.
+
+        Args:
+            key: Cache key from ``make_key()``
+
+        Returns:
+            Cached response text, or None on a miss
+        """
+        response = self._get(key)
+        with self._counter_lock:
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return response
+
+    def put(self, key: str, response: str) -> None:
+        """Store a response.
+
+        Args:
+            key: Cache key from ``make_key()``
+            response: Response text
+        """
+        self._put(key, response)
+
+    def format_stats(self) -> str:
+        """Format hit/miss counters for display.
+
+        Returns:
+            Human-readable counter string
+        """
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return f"{self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate)"
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[str]:
+        """Backend lookup."""
+        pass
+
+    @abstractmethod
+    def _put(self, key: str, response: str) -> None:
+        """Backend store."""
+        pass
+
+
+class MemoryResponseCache(ResponseCache):
+    """In-process response cache, cleared when the process exits."""
+
+    def __init__(self, max_entries: int = 1000):
+        """Initialize memory cache.
+
+        Args:
+            max_entries: Entries kept before the oldest are dropped
+        """
+        super().__init__()
+        self.max_entries = max_entries
+        self._entries: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            response = self._entries.pop(key, None)
+            if response is not None:
+                # Re-insert to mark as most recently used
+                self._entries[key] = response
+            return response
+
+    def _put(self, key: str, response: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = response
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+
+
+class SQLiteResponseCache(ResponseCache):
+    """Persistent response cache in a SQLite database.
+
+    Entries older than the TTL are treated as misses and deleted; once the
+    cache holds more than ``max_entries``, the least recently used entries
+    are evicted.
+    """
+
+    def __init__(self, db_path: Path, ttl_seconds: Optional[float] = None,
+                 max_entries: int = 10000):
+        """Initialize SQLite cache.
+
+        Args:
+            db_path: Path to the database file
+            ttl_seconds: Maximum entry age (None for no expiry)
+            max_entries: Entries kept before LRU eviction
+        """
+        super().__init__()
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+        )
+        self._conn.commit()
+
+    def _get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            response, created = row
+            if self.ttl_seconds is not None and now - created > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return response
+
+    def _put(self, key: str, response: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created, accessed) "
+                "VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def create_response_cache(config: "Config") -> Optional[ResponseCache]:
+    """Factory function to create the configured LLM response cache.
+
+    Args:
+        config: Hedorah configuration
+
+    Returns:
+        ResponseCache instance, or None if disabled
+
+    Raises:
+        ValueError: If the backend is not supported
+    """
+    backend = config.get('cache.llm.backend', 'sqlite').lower()
+    max_entries = config.get('cache.llm.max_entries', 10000)
+
+    if backend == 'none':
+        return None
+    elif backend == 'sqlite':
+        ttl_days = config.get('cache.llm.ttl_days')
+        return SQLiteResponseCache(
+            config.cache_dir / 'llm_responses.db',
+            ttl_seconds=ttl_days * 86400 if ttl_days else None,
+            max_entries=max_entries
+        )
+    elif backend == 'memory':
+        return MemoryResponseCache(max_entries=max_entries)
+    else:
+        raise ValueError(f"Unsupported response cache backend: {backend}")
@@ -0,0 +1,197 @@
+"""Stage-level checkpoints so interrupted papers can be resumed."""
+
+import json
+import pickle
+import shutil
+import logging
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from .cache import file_digest, atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+
+class PaperCheckpoint:
+    """Stage outputs for one paper, stored in a per-paper work directory.
+
+    The directory holds a ``manifest.json`` describing the source PDF and one
+    file per completed stage. It is removed once the paper's notes have been
+    written, so any work directory left behind is a partially processed paper.
+    """
+
+    # Stages in pipeline order, with how each is serialized
+    STAGES = {
+        'content': 'pkl',       # PDFContent
+        'figures': 'json',      # Figure descriptions, applied onto content
+        'summary': 'json',
+        'analysis': 'json',
+        'experiments': 'json',
+    }
+
+    def __init__(self, work_dir: Path):
+        """Initialize paper checkpoint.
+
+        Args:
+            work_dir: Per-paper work directory
+        """
+        self.work_dir = work_dir
+        self._manifest: Optional[Dict[str, Any]] = None
+
+    @property
+    def manifest(self) -> Dict[str, Any]:
+        """Get the paper's manifest (source PDF, options, timestamps)."""
+        if self._manifest is None:
+            manifest_path = self.work_dir / 'manifest.json'
+            if manifest_path.exists():
+                self._manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+            else:
+                self._manifest = {}
+        return self._manifest
+
+    @property
+    def pdf_path(self) -> Path:
+        """Get the path of the PDF this checkpoint belongs to."""
+        return Path(self.manifest['pdf_path'])
+
+    @property
+    def skip_experiments(self) -> bool:
+        """Whether the interrupted run skipped experiment generation."""
+        return self.manifest.get('skip_experiments', False)
+
+    def start(self, pdf_path: Path, pdf_digest: str, skip_experiments: bool) -> None:
+        """Create or refresh the manifest for a run.
+
+        Args:
+            pdf_path: Path to the PDF file
+            pdf_digest: Content hash of the PDF
+            skip_experiments: Whether this run skips experiment generation
+        """
+        manifest = dict(self.manifest)
+        manifest.update({
+            'pdf_path': str(pdf_path),
+            'pdf_digest': pdf_digest,
+            'skip_experiments': skip_experiments,
+            'updated': datetime.now().isoformat(),
+        })
+        manifest.setdefault('created', manifest['updated'])
+        self._manifest = manifest
+        atomic_write_bytes(self.work_dir / 'manifest.json',
+                           json.dumps(manifest, indent=2).encode('utf-8'))
+
+    def has(self, stage: str) -> bool:
+        """Check whether a stage has been checkpointed.
+
+        Args:
+            stage: Stage name (see STAGES)
+
+        Returns:
+            True if the stage's output is saved
+        """
+        return self._stage_path(stage).exists()
+
+    def load(self, stage: str) -> Any:
+        """Load a checkpointed stage output.
+
+        Args:
+            stage: Stage name (see STAGES)
+
+        Returns:
+            The saved stage output
+        """
+        path = self._stage_path(stage)
+        if self.STAGES[stage] == 'pkl':
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        return json.loads(path.read_text(encoding='utf-8'))
+
+    def save(self, stage: str, value: Any) -> None:
+        """Save a stage output.
+
+        Args:
+            stage: Stage name (see STAGES)
+            value: Stage output to save
+        """
+        if self.STAGES[stage] == 'pkl':
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        else:
+            data = json.dumps(value, indent=2).encode('utf-8')
+        atomic_write_bytes(self._stage_path(stage), data)
+
+    def completed_stages(self) -> List[str]:
+        """Get the names of checkpointed stages, in pipeline order.
+
+        Returns:
+            List of stage names
+        """
+        return [stage for stage in self.STAGES if self.has(stage)]
+
+    def attachments(self) -> List[Path]:
+        """Get the figure files the checkpointed content refers to.
+
+        Returns:
+            Paths of extracted figures (empty before the content stage)
+        """
+        if not self.has('content'):
+            return []
+        # Figures not extracted yet have no files to keep
+        content = self.load('content')
+        return [figure.image_path for figure in content.__dict__.get('figures', [])]
+
+    def complete(self) -> None:
+        """Remove the work directory once the paper is fully processed."""
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def _stage_path(self, stage: str) -> Path:
+        return self.work_dir / f"{stage}.{self.STAGES[stage]}"
+
+
+class CheckpointStore:
+    """Manages per-paper work directories."""
+
+    def __init__(self, root: Path):
+        """Initialize checkpoint store.
+
+        Args:
+            root: Directory holding per-paper work directories
+        """
+        self.root = root
+
+    def for_paper(self, pdf_path: Path, skip_experiments: bool = False,
+                  pdf_digest: Optional[str] = None) -> PaperCheckpoint:
+        """Get (or start) the checkpoint for a PDF.
+
+        Work directories are keyed by the PDF's content hash, so a renamed
+        PDF still resumes.
+
+        Args:
+            pdf_path: Path to the PDF file
+            skip_experiments: Whether this run skips experiment generation
+            pdf_digest: Content hash of the PDF, if already known
+
+        Returns:
+            PaperCheckpoint for the paper
+        """
+        pdf_digest = pdf_digest or file_digest(pdf_path)
+        checkpoint = PaperCheckpoint(self.root / pdf_digest[:32])
+
+        if checkpoint.completed_stages():
+            logger.info(f"Resuming {pdf_path.name} after stages: "
+                        f"{', '.join(checkpoint.completed_stages())}")
+        checkpoint.start(pdf_path, pdf_digest, skip_experiments)
+        return checkpoint
+
+    def pending(self) -> List[PaperCheckpoint]:
+        """Get checkpoints of all partially processed papers.
+
+        Returns:
+            List of PaperCheckpoint, oldest first
+        """
+        if not self.root.exists():
+            return []
+
+        checkpoints = [
+            PaperCheckpoint(work_dir) for work_dir in self.root.iterdir()
+            if (work_dir / 'manifest.json').exists()
+        ]
+        return sorted(checkpoints, key=lambda c: c.manifest.get('created', ''))
@@ -2,10 +2,16 @@
 
 import click
 import sys
+import time
 from pathlib import Path
 from .config import get_config
 from .pipeline import HedorahPipeline
-from .watcher import VaultWatcher
+from .watcher import VaultWatcher, read_watch_status
+from .ledger import PaperLedger
+from .deferred import DeferredJobStore
+from .vault import VaultReader
+from .attachments import AttachmentIndex
+from .checkpoint import CheckpointStore, PaperCheckpoint
 
 
 @click.group()
@@ -25,7 +31,12 @@ def main():
               help='Path to configuration file')
 @click.option('--skip-experiments', '-s', is_flag=True,
               help='Skip experiment generation (faster)')
-def process(pdf_path: Path, config: str, skip_experiments: bool):
+@click.option('--no-cache', is_flag=True,
+              help='Ignore cached results from previous runs')
+@click.option('--force', '-f', is_flag=True,
+              help='Reprocess papers that were already processed')
+def process(pdf_path: Path, config: str, skip_experiments: bool, no_cache: bool,
+            force: bool):
     """Process a single PDF file.
 
     PDF_PATH: Path to the PDF file to process
@@ -37,18 +48,21 @@ def process(pdf_path: Path, config: str, skip_experiments: bool):
         click.echo(f"Vault: {cfg.vault_path}")
 
         # Create pipeline
-        pipeline = HedorahPipeline(cfg)
-
-        # Process the paper
-        with click.progressbar(length=5, label='Processing paper') as bar:
-            created_notes = pipeline.process_paper(pdf_path, skip_experiments)
-            bar.update(5)
-
-        # Show results
-        click.echo("\n✅ Processing complete!")
-        click.echo(f"Created {len(created_notes)} notes:\n")
-        for note_type, note_path in created_notes.items():
-            click.echo(f"  • {note_type}: {note_path.name}")
+        with HedorahPipeline(cfg, use_cache=not no_cache) as pipeline:
+            if not force and pipeline.is_processed(pdf_path):
+                click.echo("\n⏭️  Already processed (use --force to redo)")
+                return
+
+            # Process the paper
+            with click.progressbar(length=5, label='Processing paper') as bar:
+                created_notes = pipeline.process_paper(pdf_path, skip_experiments, force)
+                bar.update(5)
+
+            # Show results
+            click.echo("\n✅ Processing complete!")
+            click.echo(f"Created {len(created_notes)} notes:\n")
+            for note_type, note_path in created_notes.items():
+                click.echo(f"  • {note_type}: {note_path.name}")
 
     except FileNotFoundError as e:
         click.echo(f"❌ Error: {e}", err=True)
@@ -67,9 +81,27 @@ def process(pdf_path: Path, config: str, skip_experiments: bool):
               help='Path to configuration file')
 @click.option('--skip-experiments', '-s', is_flag=True,
               help='Skip experiment generation (faster)')
-def batch(directory: Path, config: str, skip_experiments: bool):
+@click.option('--workers', '-w', type=click.IntRange(min=1), default=None,
+              help='Concurrent papers per LLM stage (default: batch.workers)')
+@click.option('--no-cache', is_flag=True,
+              help='Ignore cached results from previous runs')
+@click.option('--force', '-f', is_flag=True,
+              help='Reprocess papers that were already processed')
+@click.option('--deferred', is_flag=True,
+              help='Submit reasoning calls as a provider batch job (slower, cheaper)')
+@click.option('--no-wait', is_flag=True,
+              help='With --deferred: submit and exit instead of polling for results')
+def batch(directory: Path, config: str, skip_experiments: bool, workers: int,
+          no_cache: bool, force: bool, deferred: bool, no_wait: bool):
     """Process all PDFs in a directory.
 
+    Papers are processed concurrently: PDF extraction, local-model and
+    reasoning-API calls each have their own worker pool.
+
+    With --deferred, papers are extracted and summarized locally and their
+    reasoning prompts are submitted as one provider batch job. Re-run the
+    same command to pick up results of jobs submitted earlier.
+
     DIRECTORY: Path to directory containing PDF files
     """
     try:
@@ -78,21 +110,94 @@ def batch(directory: Path, config: str, skip_experiments: bool):
         click.echo(f"Processing all PDFs in: {directory}")
         click.echo(f"Vault: {cfg.vault_path}\n")
 
-        # Create pipeline
-        pipeline = HedorahPipeline(cfg)
+        # Create pipeline and batch processor
+        with HedorahPipeline(cfg, use_cache=not no_cache) as pipeline:
+            pdf_files = sorted(directory.glob("*.pdf"))
+
+            if deferred:
+                runner = pipeline.create_deferred_batch()
+                click.echo(f"Found {len(pdf_files)} PDFs "
+                           f"(reasoning via {runner.backend.name} batch jobs)")
+                results = runner.run(pdf_files, skip_experiments, force, wait=not no_wait)
+
+                pending = runner.store.load()
+                click.echo(f"\n✅ Created notes for {len(results)} papers")
+                if pending:
+                    click.echo(f"⏳ {len(pending)} batch jobs still running; "
+                               f"re-run this command to collect their results")
+                click.echo("")
+                for pdf_name, notes in results.items():
+                    if "error" in notes:
+                        click.echo(f"  ❌ {pdf_name}: {notes['error']}")
+                    else:
+                        click.echo(f"  ✅ {pdf_name}: {len(notes)} notes created")
+                return
+
+            processor = pipeline.create_batch_processor(workers)
+
+            # Process directory
+            click.echo(f"Found {len(pdf_files)} PDFs "
+                       f"({processor.extract_workers} extract, {processor.local_workers} local, "
+                       f"{processor.reasoning_workers} reasoning workers)")
+            results = processor.run(pdf_files, skip_experiments, force)
+
+            # Show results
+            click.echo(f"\n✅ Batch processing complete!")
+            click.echo(f"Processed {len(results)} papers in {processor.stats.elapsed / 60:.1f} min "
+                       f"({processor.stats.papers_per_minute:.2f} papers/min)")
+            if processor.stats.skipped:
+                click.echo(f"Skipped {processor.stats.skipped} already processed papers "
+                           f"(use --force to redo)")
+            click.echo("")
+
+            for pdf_name, notes in results.items():
+                if "error" in notes:
+                    click.echo(f"  ❌ {pdf_name}: {notes['error']}")
+                else:
+                    click.echo(f"  ✅ {pdf_name}: {len(notes)} notes created")
 
-        # Process directory
-        results = pipeline.process_directory(directory, skip_experiments)
+    except FileNotFoundError as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        click.echo("Please copy config.example.yaml to config.yaml and configure it.", err=True)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        click.echo("\n\n👋 Batch interrupted")
+        sys.exit(1)
+    except Exception as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        sys.exit(1)
 
-        # Show results
-        click.echo(f"\n✅ Batch processing complete!")
-        click.echo(f"Processed {len(results)} papers\n")
 
-        for pdf_name, notes in results.items():
-            if "error" in notes:
-                click.echo(f"  ❌ {pdf_name}: {notes['error']}")
-            else:
-                click.echo(f"  ✅ {pdf_name}: {len(notes)} notes created")
+@main.command()
+@click.option('--config', '-c', default='config.yaml',
+              help='Path to configuration file')
+@click.option('--no-cache', is_flag=True,
+              help='Ignore cached results from previous runs')
+def resume(config: str, no_cache: bool):
+    """Finish every partially processed paper in the vault.
+
+    Papers whose processing failed or was interrupted resume from their
+    last completed stage (extraction, summary, analysis or experiments).
+    """
+    try:
+        # Load configuration
+        cfg = get_config(config)
+        click.echo(f"Vault: {cfg.vault_path}\n")
+
+        # Create pipeline
+        with HedorahPipeline(cfg, use_cache=not no_cache) as pipeline:
+            # Resume interrupted papers
+            results = pipeline.resume_all()
+            if not results:
+                click.echo("Nothing to resume: no partially processed papers found")
+                return
+
+            click.echo(f"\n✅ Resumed {len(results)} papers\n")
+            for pdf_name, notes in results.items():
+                if "error" in notes:
+                    click.echo(f"  ❌ {pdf_name}: {notes['error']}")
+                else:
+                    click.echo(f"  ✅ {pdf_name}: {len(notes)} notes created")
 
     except FileNotFoundError as e:
         click.echo(f"❌ Error: {e}", err=True)
@@ -108,7 +213,11 @@ def batch(directory: Path, config: str, skip_experiments: bool):
               help='Path to configuration file')
 @click.option('--skip-experiments', '-s', is_flag=True,
               help='Skip experiment generation (faster)')
-def watch(config: str, skip_experiments: bool):
+@click.option('--no-cache', is_flag=True,
+              help='Ignore cached results from previous runs')
+@click.option('--force', '-f', is_flag=True,
+              help='Reprocess papers that were already processed')
+def watch(config: str, skip_experiments: bool, no_cache: bool, force: bool):
     """Watch inbox folder for new PDFs and process them automatically.
 
     Monitors the vault inbox folder and automatically processes any new
@@ -128,7 +237,7 @@ def watch(config: str, skip_experiments: bool):
         click.echo("\nPress Ctrl+C to stop\n")
 
         # Create and start watcher
-        watcher = VaultWatcher(cfg, skip_experiments)
+        watcher = VaultWatcher(cfg, skip_experiments, use_cache=not no_cache, force=force)
         watcher.start()
 
     except FileNotFoundError as e:
@@ -143,6 +252,135 @@ def watch(config: str, skip_experiments: bool):
         sys.exit(1)
 
 
+@main.command()
+@click.option('--config', '-c', default='config.yaml',
+              help='Path to configuration file')
+def status(config: str):
+    """Show watcher queue status and processed-paper counts."""
+    try:
+        cfg = get_config(config)
+
+        watch_status = read_watch_status(cfg)
+        if watch_status:
+            click.echo(f"Watcher: running on {watch_status['inbox']} "
+                       f"({watch_status['workers']} workers, updated {watch_status['updated'][11:19]})")
+            click.echo(f"  Queued: {watch_status['queued']}/{watch_status['capacity']}")
+            click.echo(f"  In flight: {watch_status['in_flight']}")
+            for name in watch_status['in_flight_files']:
+                click.echo(f"    • {name}")
+            click.echo(f"  Completed: {watch_status['completed']}")
+            click.echo(f"  Failed: {watch_status['failed']}")
+        else:
+            click.echo("Watcher: not running")
+
+        counts = PaperLedger(cfg.state_dir / 'ledger.db').counts()
+        click.echo(f"\nLedger: {counts.get('done', 0)} done, "
+                   f"{counts.get('processing', 0)} processing, {counts.get('failed', 0)} failed")
+
+        jobs = DeferredJobStore(cfg.state_dir / 'deferred.json').load()
+        if jobs:
+            click.echo(f"\nDeferred batch jobs: {len(jobs)} pending")
+            for job in jobs:
+                click.echo(f"  • {job['backend']} {job['id']}: {len(job['requests'])} requests, "
+                           f"submitted {job['submitted'][:16].replace('T', ' ')}")
+
+    except FileNotFoundError as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        click.echo("\nRun 'hedorah init' to create configuration files.", err=True)
+        sys.exit(1)
+    except Exception as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        sys.exit(1)
+
+
+@main.command()
+@click.option('--config', '-c', default='config.yaml',
+              help='Path to configuration file')
+@click.option('--dry-run', '-n', is_flag=True,
+              help='List orphaned attachments without removing them')
+def gc(config: str, dry_run: bool):
+    """Remove extracted figures no note uses any more."""
+    try:
+        cfg = get_config(config)
+        index = AttachmentIndex(cfg.state_dir / 'attachments.db',
+                                cfg.get_vault_folder('attachments'), cfg.vault_path)
+        grace_hours = cfg.get('attachments.gc_grace_hours', 24)
+
+        # Figures of papers still in progress have no notes referencing them yet
+        work_dirs = {checkpoint.work_dir
+                     for checkpoint in CheckpointStore(cfg.state_dir / 'work').pending()}
+        work_dirs |= DeferredJobStore(cfg.state_dir / 'deferred.json').work_dirs()
+        live = {path.name for work_dir in work_dirs
+                for path in PaperCheckpoint(work_dir).attachments()}
+
+        orphans = index.gc(grace_seconds=grace_hours * 3600, dry_run=dry_run, live=live)
+        index.close()
+
+        if not orphans:
+            click.echo("✅ No orphaned attachments")
+            return
+
+        size_mb = sum(path.stat().st_size for path in orphans if path.exists()) / (1024 * 1024)
+        if dry_run:
+            click.echo(f"🔍 {len(orphans)} orphaned attachments ({size_mb:.1f} MB) would be removed:")
+        else:
+            click.echo(f"🧹 Removed {len(orphans)} orphaned attachments:")
+        for path in orphans:
+            click.echo(f"  • {path.name}")
+
+    except FileNotFoundError as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        click.echo("\nRun 'hedorah init' to create configuration files.", err=True)
+        sys.exit(1)
+    except Exception as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        sys.exit(1)
+
+
+@main.command()
+@click.argument('query')
+@click.option('--config', '-c', default='config.yaml',
+              help='Path to configuration file')
+@click.option('--limit', '-n', type=click.IntRange(min=1), default=10,
+              help='Maximum number of results')
+def search(query: str, config: str, limit: int):
+    """Search the vault's notes.
+
+    QUERY may contain "quoted phrases", prefix* terms and title:, tags: or
+    body: field filters.
+    """
+    try:
+        cfg = get_config(config)
+        reader = VaultReader(cfg.vault_path, cfg.state_dir / 'vault.db')
+
+        changed = reader.index.refresh(cfg.vault_path, recursive=True)
+        if changed:
+            click.echo(f"🔄 Indexed {changed} changed notes")
+
+        started = time.perf_counter()
+        results = reader.index.search(query, folder=cfg.vault_path, limit=limit)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if not results:
+            click.echo(f"No notes match {query!r}")
+            return
+
+        click.echo(f"🔍 {len(results)} results ({elapsed_ms:.1f} ms)\n")
+        for result in results:
+            path = Path(result['path']).relative_to(cfg.vault_path.resolve())
+            click.echo(f"  {result['title']}  ({path}, score {result['score']:.1f})")
+            if result['snippet']:
+                click.echo(f"    {' '.join(result['snippet'].split())}")
+
+    except FileNotFoundError as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        click.echo("\nRun 'hedorah init' to create configuration files.", err=True)
+        sys.exit(1)
+    except Exception as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        sys.exit(1)
+
+
 @main.command()
 def init():
     """Initialize a new Hedorah configuration.
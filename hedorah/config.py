@@ -104,6 +104,26 @@ class Config:
         folder_name = self.vault_folders.get(folder_type, folder_type)
         return self.vault_path / folder_name
 
+    @property
+    def state_dir(self) -> Path:
+        """Get directory for Hedorah's own state (caches, indexes, ledgers).
+
+        Defaults to a hidden ``.hedorah`` folder inside the vault, which
+        Obsidian ignores.
+        """
+        path = self.get('state.dir')
+        if path:
+            return Path(path)
+        return self.vault_path / '.hedorah'
+
+    @property
+    def cache_dir(self) -> Path:
+        """Get cache directory."""
+        path = self.get('cache.dir')
+        if path:
+            return Path(path)
+        return self.state_dir / 'cache'
+
     @property
     def anthropic_api_key(self) -> str:
         """Get Anthropic API key."""
@@ -0,0 +1,149 @@
+"""Token-budgeted packing of prompt context."""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from .ratelimit import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Context windows by model name prefix (first match wins, so more specific
+# prefixes come first)
+MODEL_CONTEXT_WINDOWS: Tuple[Tuple[str, int], ...] = (
+    ('claude', 200000),
+    ('gpt-4o', 128000),
+    ('gpt-4-turbo', 128000),
+    ('gpt-4.1', 1000000),
+    ('gpt-4', 8192),
+    ('gpt-5', 400000),
+    ('o1', 128000),
+    ('o3', 200000),
+    ('o4', 200000),
+    ('gemini-1.5', 1000000),
+    ('gemini-2', 1000000),
+    ('gemini', 32000),
+)
+DEFAULT_CONTEXT_WINDOW = 32000
+
+
+def input_budget(model: str, max_output_tokens: int, limit: Optional[int] = None) -> int:
+    """Get the input token budget for a model.
+
+    Args:
+        model: Model name
+        max_output_tokens: Tokens reserved for the response
+        limit: Configured cap on input tokens (optional)
+
+    Returns:
+        Input tokens available: the model's context window less the output
+        reservation, capped at ``limit``
+    """
+    window = next((size for prefix, size in MODEL_CONTEXT_WINDOWS if model.startswith(prefix)),
+                  DEFAULT_CONTEXT_WINDOW)
+    budget = window - max_output_tokens
+    return min(budget, limit) if limit else budget
+
+
+@dataclass
+class ContextPiece:
+    """A candidate piece of prompt context.
+
+    Pieces with a lower ``priority`` are packed first; ties keep the order
+    the pieces were given in.
+    """
+    name: str
+    text: str
+    priority: int
+    truncate: bool = True  # Whether the piece may be cut short to fit
+    min_tokens: int = 50   # Shortest truncation worth keeping
+
+
+@dataclass
+class PackedContext:
+    """The pieces that fit in a budget, and what was cut to get there."""
+    texts: Dict[str, str]
+    tokens: int
+    budget: int
+    truncated: List[Tuple[str, int, int]] = field(default_factory=list)  # (name, tokens, kept)
+    dropped: List[Tuple[str, int]] = field(default_factory=list)  # (name, tokens)
+
+    def get(self, name: str) -> str:
+        """Get a piece's packed text ('' if it was dropped)."""
+        return self.texts.get(name, '')
+
+    def format(self) -> str:
+        """Format the packing report for logging."""
+        report = f"{self.tokens}/{self.budget} tokens"
+        if self.truncated:
+            report += "; truncated " + ", ".join(
+                f"{name} ({tokens}->{kept})" for name, tokens, kept in self.truncated)
+        if self.dropped:
+            report += "; dropped " + ", ".join(
+                f"{name} ({tokens})" for name, tokens in self.dropped)
+        return report
+
+
+class ContextPacker:
+    """Fills a token budget with the highest-priority context pieces.
+
+    Pieces are taken in priority order. A piece that does not fit is cut
+    short if it allows truncation and at least ``min_tokens`` of it would
+    fit, and is dropped otherwise; later, smaller pieces may still fit.
+    Token counts use a fast local estimate rather than a provider tokenizer.
+    """
+
+    def __init__(self, budget: int, count_tokens: Callable[[str], int] = estimate_tokens):
+        """Initialize context packer.
+
+        Args:
+            budget: Tokens available for the pieces
+            count_tokens: Token estimator
+        """
+        self.budget = max(0, budget)
+        self.count_tokens = count_tokens
+
+    def pack(self, pieces: List[ContextPiece]) -> PackedContext:
+        """Pack pieces into the budget.
+
+        Args:
+            pieces: Candidate pieces
+
+        Returns:
+            PackedContext with the text kept for each included piece
+        """
+        packed = PackedContext(texts={}, tokens=0, budget=self.budget)
+
+        for piece in sorted(pieces, key=lambda p: p.priority):
+            if not piece.text:
+                continue
+            tokens = self.count_tokens(piece.text)
+            remaining = self.budget - packed.tokens
+
+            if tokens <= remaining:
+                packed.texts[piece.name] = piece.text
+                packed.tokens += tokens
+            elif piece.truncate and remaining >= piece.min_tokens:
+                text = self._truncate(piece.text, remaining)
+                kept = self.count_tokens(text)
+                packed.texts[piece.name] = text
+                packed.tokens += kept
+                packed.truncated.append((piece.name, tokens, kept))
+            else:
+                packed.dropped.append((piece.name, tokens))
+
+        return packed
+
+    def _truncate(self, text: str, tokens: int) -> str:
+        """Cut text at a word boundary to at most ``tokens`` tokens."""
+        # Start from a proportional cut, then shrink until the estimate fits
+        end = len(text) * tokens // max(1, self.count_tokens(text))
+        while end > 0:
+            cut = text[:end]
+            space = cut.rfind(' ')
+            if space > end // 2:
+                cut = cut[:space]
+            cut = cut.rstrip() + '...'
+            if self.count_tokens(cut) <= tokens:
+                return cut
+            end -= max(1, end // 20)
+        return ''
@@ -0,0 +1,697 @@
+"""Deferred batch mode: reasoning calls submitted as provider batch jobs.
+
+For large imports, ``hedorah batch --deferred`` extracts and summarizes
+every paper locally, then sends all analysis prompts to the provider's
+batch API (Anthropic Message Batches or the OpenAI Batch API) as a single
+job. Batch jobs are cheaper and are not subject to the interactive rate
+limits, at the cost of results arriving minutes to hours later.
+
+Job ids are persisted in ``deferred.json`` in the state directory and each
+paper's stage outputs live in its checkpoint, so polling can be
+interrupted and picked up again by re-running the command. When a job's
+results land, analyses are checkpointed, experiment prompts for those
+papers go out as a follow-up job, and notes are created for every paper
+whose reasoning is complete.
+"""
+
+import json
+import uuid
+import logging
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from datetime import datetime
+from dataclasses import dataclass, asdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional, Set, TYPE_CHECKING
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+from anthropic import Anthropic
+from openai import OpenAI
+from .config import Config
+from .cache import atomic_write_bytes
+from .checkpoint import PaperCheckpoint
+from .llm import (
+    ReasoningClient, ANALYSIS_MAX_TOKENS, EXPERIMENTS_MAX_TOKENS,
+    build_analysis_prompt, parse_analysis, build_experiments_prompt, parse_experiments,
+    anthropic_cached_params, join_context
+)
+
+if TYPE_CHECKING:
+    from .pipeline import HedorahPipeline
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchRequest:
+    """One reasoning request within a batch job."""
+    custom_id: str
+    system: str
+    prompt: str
+    max_tokens: int
+    context: Optional[str] = None  # Stable, cacheable user-turn prefix
+
+
+class BatchBackend(ABC):
+    """Submits batch jobs to a provider and fetches their results."""
+
+    name: str = ''
+
+    @abstractmethod
+    def submit(self, requests: List[BatchRequest]) -> str:
+        """Submit requests as one batch job.
+
+        Args:
+            requests: Requests to submit
+
+        Returns:
+            Provider job id
+        """
+        pass
+
+    @abstractmethod
+    def is_finished(self, job_id: str) -> bool:
+        """Check whether a job has stopped processing.
+
+        Args:
+            job_id: Provider job id
+
+        Returns:
+            True once results (or failures) are available
+        """
+        pass
+
+    @abstractmethod
+    def results(self, job_id: str) -> Dict[str, Optional[str]]:
+        """Fetch a finished job's results.
+
+        Args:
+            job_id: Provider job id
+
+        Returns:
+            Dictionary mapping custom ids to response text (None if the
+            request failed, was cancelled or expired)
+        """
+        pass
+
+
+class AnthropicBatchBackend(BatchBackend):
+    """Anthropic Message Batches API."""
+
+    name = 'anthropic'
+
+    def __init__(self, config: Config):
+        """Initialize Anthropic batch backend.
+
+        Args:
+            config: Hedorah configuration
+        """
+        api_key = config.get('llm.reasoning.api_key')
+        if not api_key or api_key.startswith('${'):
+            raise ValueError("Anthropic API key not configured")
+        self.client = Anthropic(api_key=api_key, base_url=config.get('deferred.base_url'))
+        self.model = config.reasoning_model
+
+    def submit(self, requests: List[BatchRequest]) -> str:
+        batch = self.client.messages.batches.create(requests=[
+            {
+                "custom_id": request.custom_id,
+                "params": {
+                    "model": self.model,
+                    "max_tokens": request.max_tokens,
+                    **anthropic_cached_params(request.prompt, request.system, request.context),
+                },
+            }
+            for request in requests
+        ])
+        return batch.id
+
+    def is_finished(self, job_id: str) -> bool:
+        return self.client.messages.batches.retrieve(job_id).processing_status == 'ended'
+
+    def results(self, job_id: str) -> Dict[str, Optional[str]]:
+        results = {}
+        for entry in self.client.messages.batches.results(job_id):
+            if entry.result.type == 'succeeded':
+                results[entry.custom_id] = entry.result.message.content[0].text
+            else:
+                logger.warning(f"Batch request {entry.custom_id} {entry.result.type}")
+                results[entry.custom_id] = None
+        return results
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """OpenAI Batch API over chat completions."""
+
+    name = 'openai'
+
+    # Batch statuses after which no more results will arrive
+    FINISHED = {'completed', 'failed', 'expired', 'cancelled'}
+
+    def __init__(self, config: Config):
+        """Initialize OpenAI batch backend.
+
+        Args:
+            config: Hedorah configuration
+        """
+        api_key = config.get('llm.reasoning.api_key')
+        if not api_key or api_key.startswith('${'):
+            raise ValueError("OpenAI API key not configured")
+        self.client = OpenAI(api_key=api_key, base_url=config.get('deferred.base_url'))
+        self.model = config.reasoning_model
+
+    def submit(self, requests: List[BatchRequest]) -> str:
+        lines = [
+            json.dumps({
+                "custom_id": request.custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model,
+                    "max_tokens": request.max_tokens,
+                    "messages": [
+                        {"role": "system", "content": request.system},
+                        {"role": "user",
+                         "content": join_context(request.prompt, request.context)},
+                    ],
+                },
+            })
+            for request in requests
+        ]
+        input_file = self.client.files.create(
+            file=("hedorah-batch.jsonl", "\n".join(lines).encode('utf-8')),
+            purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        return batch.id
+
+    def is_finished(self, job_id: str) -> bool:
+        return self.client.batches.retrieve(job_id).status in self.FINISHED
+
+    def results(self, job_id: str) -> Dict[str, Optional[str]]:
+        batch = self.client.batches.retrieve(job_id)
+        if batch.status != 'completed':
+            logger.warning(f"Batch job {job_id} {batch.status}")
+        if not batch.output_file_id:
+            return {}
+
+        results = {}
+        for line in self.client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            response = entry.get('response') or {}
+            if response.get('status_code') == 200:
+                results[entry['custom_id']] = response['body']['choices'][0]['message']['content']
+            else:
+                logger.warning(f"Batch request {entry['custom_id']} failed: {entry.get('error')}")
+                results[entry['custom_id']] = None
+        return results
+
+
+class LocalBatchBackend(BatchBackend):
+    """Runs "batch" jobs immediately through the regular reasoning client.
+
+    Used for providers without a batch API (Gemini) and when
+    ``deferred.backend`` is 'local'. Results are stored in a file so they go
+    through the same submit/poll flow as a real batch job.
+    """
+
+    name = 'local'
+
+    def __init__(self, reasoning_client: ReasoningClient, results_dir: Path, workers: int = 2):
+        """Initialize local batch backend.
+
+        Args:
+            reasoning_client: Client used to run the requests
+            results_dir: Directory holding job results
+            workers: Concurrent requests
+        """
+        self.reasoning_client = reasoning_client
+        self.results_dir = results_dir
+        self.workers = workers
+
+    def submit(self, requests: List[BatchRequest]) -> str:
+        def run(request: BatchRequest) -> Optional[str]:
+            try:
+                return self.reasoning_client.generate(request.prompt, system=request.system,
+                                                      max_tokens=request.max_tokens,
+                                                      context=request.context)
+            except Exception as e:
+                logger.error(f"Batch request {request.custom_id} failed: {e}")
+                return None
+
+        job_id = f"local-{uuid.uuid4().hex[:12]}"
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            texts = list(pool.map(run, requests))
+
+        results = {request.custom_id: text for request, text in zip(requests, texts)}
+        atomic_write_bytes(self._results_path(job_id), json.dumps(results).encode('utf-8'))
+        return job_id
+
+    def is_finished(self, job_id: str) -> bool:
+        return True
+
+    def results(self, job_id: str) -> Dict[str, Optional[str]]:
+        path = self._results_path(job_id)
+        results = json.loads(path.read_text(encoding='utf-8'))
+        path.unlink()
+        return results
+
+    def _results_path(self, job_id: str) -> Path:
+        return self.results_dir / f"{job_id}.json"
+
+
+def create_batch_backend(config: Config, reasoning_client: ReasoningClient) -> BatchBackend:
+    """Factory function to create the batch backend for the reasoning provider.
+
+    Args:
+        config: Hedorah configuration
+        reasoning_client: Reasoning client used by the local fallback
+
+    Returns:
+        BatchBackend instance
+
+    Raises:
+        ValueError: If the backend is not supported
+    """
+    backend = config.get('deferred.backend', 'auto').lower()
+    if backend == 'auto':
+        backend = config.get('llm.reasoning.provider', 'anthropic').lower()
+
+    if backend == 'anthropic':
+        return AnthropicBatchBackend(config)
+    elif backend == 'openai':
+        return OpenAIBatchBackend(config)
+    elif backend in ('local', 'gemini', 'google'):
+        return LocalBatchBackend(reasoning_client, config.state_dir / 'deferred',
+                                 workers=config.get('batch.reasoning_workers', 2))
+    else:
+        raise ValueError(f"Unsupported batch backend: {backend}")
+
+
+def _lock_file(lock_file) -> None:
+    """Take an exclusive lock on an open file, waiting for other holders."""
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+    else:
+        lock_file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK gives up after about ten seconds
+                continue
+
+
+def _unlock_file(lock_file) -> None:
+    """Release a lock taken by ``_lock_file``."""
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    else:
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class DeferredJobStore:
+    """Persists submitted batch jobs and the papers waiting on them.
+
+    A job is recorded as ``submitting`` (with its custom ids but no job id)
+    before it is sent, so a crash mid-submission leaves a record of a job
+    that may have been paid for instead of silently resubmitting its
+    papers. Changes go through ``update()``, which holds a file lock so
+    concurrent runs do not overwrite each other's jobs.
+    """
+
+    def __init__(self, path: Path):
+        """Initialize job store.
+
+        Args:
+            path: Path to the JSON state file
+        """
+        self.path = path
+        self.lock_path = path.with_name(f"{path.name}.lock")
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Load pending jobs.
+
+        Returns:
+            List of job records, oldest first
+        """
+        if not self.path.exists():
+            return []
+        return json.loads(self.path.read_text(encoding='utf-8'))['jobs']
+
+    @contextmanager
+    def update(self) -> Iterator[List[Dict[str, Any]]]:
+        """Load the pending jobs for changing in place, saving them on exit.
+
+        Other runs wait for the store until the block exits.
+
+        Yields:
+            List of job records, oldest first
+        """
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, 'a+b') as lock_file:
+            _lock_file(lock_file)
+            try:
+                jobs = self.load()
+                yield jobs
+                self.save(jobs)
+            finally:
+                _unlock_file(lock_file)
+
+    def save(self, jobs: List[Dict[str, Any]]) -> None:
+        """Replace the pending jobs (use ``update()`` to change them).
+
+        Args:
+            jobs: Job records
+        """
+        if not jobs:
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+            return
+        atomic_write_bytes(self.path, json.dumps({'jobs': jobs}, indent=2).encode('utf-8'))
+
+    def pending_digests(self) -> Set[str]:
+        """Get the content hashes of papers waiting on a batch job.
+
+        Returns:
+            Set of PDF digests
+        """
+        return {entry['digest'] for job in self.load() for entry in job['requests']}
+
+    def work_dirs(self) -> Set[Path]:
+        """Get the checkpoint directories of papers waiting on a batch job.
+
+        Returns:
+            Set of work directories
+        """
+        return {Path(entry['work_dir']) for job in self.load() for entry in job['requests']}
+
+
+@dataclass
+class _DeferredPaper:
+    """A paper whose reasoning stages run through batch jobs."""
+    digest: str
+    pdf_path: str
+    work_dir: str
+    skip_experiments: bool
+
+    @property
+    def checkpoint(self) -> PaperCheckpoint:
+        return PaperCheckpoint(Path(self.work_dir))
+
+
+class DeferredBatch:
+    """Runs the reasoning stages of many papers as provider batch jobs."""
+
+    def __init__(self, pipeline: "HedorahPipeline", backend: BatchBackend,
+                 poll_interval: float = 60.0):
+        """Initialize deferred batch runner.
+
+        Args:
+            pipeline: Hedorah pipeline (extraction, local model, notes)
+            backend: Batch backend for reasoning requests
+            poll_interval: Seconds between job status checks
+
+        Raises:
+            ValueError: If checkpoints are disabled (they hold the stage outputs)
+        """
+        if pipeline.checkpoints is None:
+            raise ValueError("Deferred batch mode requires checkpoints.enabled")
+
+        self.pipeline = pipeline
+        self.backend = backend
+        self.poll_interval = poll_interval
+        self.store = DeferredJobStore(pipeline.config.state_dir / 'deferred.json')
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def run(self, pdf_files: List[Path], skip_experiments: bool = False,
+            force: bool = False, wait: bool = True) -> Dict[str, Dict[str, Any]]:
+        """Submit new papers and collect results of all pending jobs.
+
+        Args:
+            pdf_files: PDFs to process
+            skip_experiments: Skip experiment generation
+            force: Reprocess papers the ledger says are done
+            wait: Poll until every job has finished (otherwise check once)
+
+        Returns:
+            Dictionary mapping PDF names to their created notes (or error)
+        """
+        self.submit(pdf_files, skip_experiments, force)
+        return self.collect(wait)
+
+    def submit(self, pdf_files: List[Path], skip_experiments: bool = False,
+               force: bool = False) -> Optional[str]:
+        """Run the local stages for new papers and submit their reasoning requests.
+
+        Args:
+            pdf_files: PDFs to process
+            skip_experiments: Skip experiment generation
+            force: Reprocess papers the ledger says are done
+
+        Returns:
+            Job id, or None if nothing needed submitting
+        """
+        ledger = self.pipeline.ledger
+        pending = self.store.pending_digests()
+        requests: List[BatchRequest] = []
+        papers: Dict[str, _DeferredPaper] = {}
+
+        for pdf_path in pdf_files:
+            digest = None
+            try:
+                digest = ledger.digest(pdf_path)
+                if digest in pending:
+                    logger.info(f"{pdf_path.name} is already waiting on a batch job")
+                    continue
+                if not force and ledger.is_done(digest):
+                    logger.info(f"Skipping {pdf_path.name}: already processed")
+                    continue
+
+                checkpoint = self.pipeline.checkpoints.for_paper(pdf_path, skip_experiments, digest)
+                ledger.mark_started(digest, pdf_path)
+                with self.pipeline._open_content(pdf_path, checkpoint, digest) as content:
+                    self.pipeline.run_local_stage(content, checkpoint)
+                    # Later stages run from the checkpoint once the job's
+                    # results land, possibly in another process
+                    checkpoint.save('content', content.materialize())
+
+                paper = _DeferredPaper(digest, str(pdf_path), str(checkpoint.work_dir),
+                                       skip_experiments)
+                request = self._advance(paper)
+                if request:
+                    requests.append(request)
+                    papers[request.custom_id] = paper
+            except Exception as e:
+                self._fail(pdf_path, digest, e)
+
+        return self._submit(requests, papers)
+
+    def collect(self, wait: bool = True) -> Dict[str, Dict[str, Any]]:
+        """Poll pending jobs, apply their results and submit follow-up requests.
+
+        Args:
+            wait: Poll until every job has finished (otherwise check once)
+
+        Returns:
+            Dictionary mapping PDF names to their created notes (or error)
+        """
+        while True:
+            jobs = self.store.load()
+            if not jobs:
+                break
+
+            for job in jobs:
+                if job['id'] is None:
+                    # Another run is submitting it, or crashed while doing so
+                    logger.warning(
+                        f"Batch job submitted {job['submitted']} has no job id yet; if no run is "
+                        f"submitting it, check the provider for a job with custom ids "
+                        f"{', '.join(entry['custom_id'] for entry in job['requests'])} and remove "
+                        f"it from {self.store.path}")
+                    continue
+                if job['backend'] != self.backend.name:
+                    logger.warning(f"Skipping {job['backend']} job {job['id']}: "
+                                   f"current backend is {self.backend.name}")
+                    continue
+                if self.backend.is_finished(job['id']):
+                    self._apply_job(job)
+
+            remaining = [job for job in self.store.load()
+                         if job['backend'] == self.backend.name and job['id'] is not None]
+            if not remaining or not wait:
+                break
+
+            logger.info(f"Waiting on {len(remaining)} batch jobs "
+                        f"({sum(len(job['requests']) for job in remaining)} requests)")
+            time.sleep(self.poll_interval)
+
+        return self.results
+
+    def _advance(self, paper: _DeferredPaper) -> Optional[BatchRequest]:
+        """Get a paper's next reasoning request, finishing it if none remain.
+
+        Requests already in the response cache are applied immediately.
+
+        Returns:
+            BatchRequest to submit, or None if the paper is finished
+        """
+        cache = self.pipeline.response_cache
+
+        while True:
+            request = self._next_request(paper)
+            if request is None:
+                self._finish(paper)
+                return None
+
+            if cache is not None:
+                cached = cache.get(self._cache_key(request))
+                if cached is not None:
+                    self._apply(paper, request.custom_id, self._cache_key(request), cached)
+                    continue
+            return request
+
+    def _next_request(self, paper: _DeferredPaper) -> Optional[BatchRequest]:
+        """Build the request for the paper's first missing reasoning stage."""
+        checkpoint = paper.checkpoint
+        agenda = self.pipeline.agenda
+
+        if not checkpoint.has('analysis'):
+            content = checkpoint.load('content')
+            summary = checkpoint.load('summary')
+            user_notes = self.pipeline._read_user_notes(content, summary)
+            prompt = build_analysis_prompt(content, summary, user_notes, agenda,
+                                           self.pipeline.reasoning_client.input_budget)
+            return BatchRequest(f"{paper.digest[:32]}-analysis", prompt.system, prompt.prompt,
+                                ANALYSIS_MAX_TOKENS, prompt.context)
+
+        if not checkpoint.has('experiments'):
+            if paper.skip_experiments:
+                checkpoint.save('experiments', [])
+                return None
+            prompt = build_experiments_prompt(
+                checkpoint.load('content'), checkpoint.load('analysis'), agenda)
+            return BatchRequest(f"{paper.digest[:32]}-experiments", prompt.system, prompt.prompt,
+                                EXPERIMENTS_MAX_TOKENS, prompt.context)
+
+        return None
+
+    def _cache_key(self, request: BatchRequest) -> str:
+        """Response cache key for a request, shared with interactive calls."""
+        return self.pipeline.reasoning_client.cache_key(request.prompt, request.system,
+                                                        request.max_tokens, request.context)
+
+    def _apply(self, paper: _DeferredPaper, custom_id: str, cache_key: str, text: str) -> None:
+        """Parse a response and checkpoint it as the stage's output."""
+        stage = custom_id.rsplit('-', 1)[1]
+        if stage == 'analysis':
+            paper.checkpoint.save('analysis', parse_analysis(text))
+        else:
+            paper.checkpoint.save('experiments', parse_experiments(text))
+
+        if self.pipeline.response_cache is not None:
+            self.pipeline.response_cache.put(cache_key, text)
+
+    def _apply_job(self, job: Dict[str, Any]) -> None:
+        """Apply a finished job's results and submit follow-up requests."""
+        logger.info(f"Batch job {job['id']} finished, applying results")
+        results = self.backend.results(job['id'])
+
+        follow_ups: List[BatchRequest] = []
+        papers: Dict[str, _DeferredPaper] = {}
+        for entry in job['requests']:
+            paper = _DeferredPaper(entry['digest'], entry['pdf_path'], entry['work_dir'],
+                                   entry['skip_experiments'])
+            try:
+                text = results.get(entry['custom_id'])
+                if text is None:
+                    raise RuntimeError(f"Batch request {entry['custom_id']} did not succeed")
+
+                self._apply(paper, entry['custom_id'], entry['cache_key'], text)
+                follow_up = self._advance(paper)
+                if follow_up:
+                    follow_ups.append(follow_up)
+                    papers[follow_up.custom_id] = paper
+            except Exception as e:
+                self._fail(Path(paper.pdf_path), paper.digest, e)
+
+        with self.store.update() as jobs:
+            jobs[:] = [j for j in jobs if j['id'] != job['id']]
+        self._submit(follow_ups, papers)
+
+    def _submit(self, requests: List[BatchRequest],
+                papers: Dict[str, _DeferredPaper]) -> Optional[str]:
+        """Submit requests as a job and persist it."""
+        if not requests:
+            return None
+
+        # Recorded first: a crash after the provider accepts the job must
+        # not lose track of it
+        submission = uuid.uuid4().hex
+        with self.store.update() as jobs:
+            jobs.append({
+                'id': None,
+                'status': 'submitting',
+                'submission': submission,
+                'backend': self.backend.name,
+                'submitted': datetime.now().isoformat(),
+                'requests': [
+                    {**asdict(papers[request.custom_id]), 'custom_id': request.custom_id,
+                     'cache_key': self._cache_key(request)}
+                    for request in requests
+                ],
+            })
+
+        try:
+            job_id = self.backend.submit(requests)
+        except Exception:
+            with self.store.update() as jobs:
+                jobs[:] = [job for job in jobs if job.get('submission') != submission]
+            raise
+        logger.info(f"Submitted {len(requests)} requests as {self.backend.name} batch job {job_id}")
+
+        with self.store.update() as jobs:
+            for job in jobs:
+                if job.get('submission') == submission:
+                    job.update(id=job_id, status='submitted')
+        return job_id
+
+    def _finish(self, paper: _DeferredPaper) -> None:
+        """Create a paper's notes from its checkpointed stages."""
+        checkpoint = paper.checkpoint
+        pdf_path = Path(paper.pdf_path)
+
+        content = checkpoint.load('content')
+        self.pipeline._describe_figures_checkpointed(content, checkpoint)
+        notes = self.pipeline._create_notes(
+            content, checkpoint.load('summary'), checkpoint.load('analysis'),
+            checkpoint.load('experiments')
+        )
+
+        checkpoint.complete()
+        self.pipeline.ledger.mark_done(paper.digest, pdf_path, notes, timings={},
+                                       models=self.pipeline.model_versions)
+        self.results[pdf_path.name] = notes
+        logger.info(f"Created {len(notes)} notes for {pdf_path.name}")
+
+    def _fail(self, pdf_path: Path, digest: Optional[str], error: Exception) -> None:
+        """Record a paper that could not be processed."""
+        logger.error(f"Error processing {pdf_path.name}: {error}", exc_info=True)
+        if digest:
+            self.pipeline.ledger.mark_failed(digest, pdf_path, str(error))
+        self.results[pdf_path.name] = {"error": str(error)}
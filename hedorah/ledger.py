@@ -0,0 +1,179 @@
+"""Persistent ledger of processed papers."""
+
+import json
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, Optional
+from .cache import file_digest
+
+logger = logging.getLogger(__name__)
+
+
+class PaperLedger:
+    """Records which papers have been processed, keyed by PDF content hash.
+
+    Each entry holds the paper's status ('processing', 'done' or 'failed'),
+    the notes it produced, step timings and the models used. A second table
+    remembers each file's size and mtime alongside its hash, so checking an
+    unchanged PDF is a single indexed lookup rather than a re-hash.
+    """
+
+    def __init__(self, db_path: Path):
+        """Initialize ledger.
+
+        Args:
+            db_path: Path to the ledger database file
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS papers ("
+            "digest TEXT PRIMARY KEY, status TEXT NOT NULL, pdf_path TEXT NOT NULL, "
+            "notes TEXT, timings TEXT, models TEXT, error TEXT, updated TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, "
+            "digest TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def digest(self, pdf_path: Path) -> str:
+        """Get a PDF's content hash, reusing the stored hash if the file is unchanged.
+
+        Args:
+            pdf_path: Path to the PDF file
+
+        Returns:
+            Hex digest of the file contents
+        """
+        path = str(pdf_path.resolve())
+        stat = pdf_path.stat()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, digest FROM files WHERE path = ?", (path,)
+            ).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return row[2]
+
+        digest = file_digest(pdf_path)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, digest)
+            )
+            self._conn.commit()
+        return digest
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Get the ledger entry for a paper.
+
+        Args:
+            digest: PDF content hash
+
+        Returns:
+            Entry dict, or None if the paper has never been seen
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, pdf_path, notes, timings, models, error, updated "
+                "FROM papers WHERE digest = ?", (digest,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        status, pdf_path, notes, timings, models, error, updated = row
+        return {
+            'digest': digest,
+            'status': status,
+            'pdf_path': pdf_path,
+            'notes': {k: Path(v) for k, v in json.loads(notes or '{}').items()},
+            'timings': json.loads(timings or '{}'),
+            'models': json.loads(models or '{}'),
+            'error': error,
+            'updated': updated,
+        }
+
+    def is_done(self, digest: str) -> bool:
+        """Check whether a paper was processed successfully.
+
+        Args:
+            digest: PDF content hash
+
+        Returns:
+            True if the paper's notes were created
+        """
+        entry = self.get(digest)
+        return entry is not None and entry['status'] == 'done'
+
+    def mark_started(self, digest: str, pdf_path: Path) -> None:
+        """Record that a paper is being processed.
+
+        Args:
+            digest: PDF content hash
+            pdf_path: Path to the PDF file
+        """
+        self._upsert(digest, 'processing', pdf_path)
+
+    def mark_done(self, digest: str, pdf_path: Path, notes: Dict[str, Path],
+                  timings: Dict[str, float], models: Dict[str, str]) -> None:
+        """Record a successfully processed paper.
+
+        Args:
+            digest: PDF content hash
+            pdf_path: Path to the PDF file
+            notes: Created notes by type
+            timings: Seconds spent per step or stage
+            models: Models used, by role
+        """
+        self._upsert(digest, 'done', pdf_path,
+                     notes=json.dumps({k: str(v) for k, v in notes.items()}),
+                     timings=json.dumps({k: round(v, 3) for k, v in timings.items()}),
+                     models=json.dumps(models))
+
+    def mark_failed(self, digest: str, pdf_path: Path, error: str) -> None:
+        """Record a paper whose processing failed.
+
+        Args:
+            digest: PDF content hash
+            pdf_path: Path to the PDF file
+            error: Error message
+        """
+        self._upsert(digest, 'failed', pdf_path, error=error)
+
+    def counts(self) -> Dict[str, int]:
+        """Count papers by status.
+
+        Returns:
+            Dictionary mapping status to number of papers
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM papers GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _upsert(self, digest: str, status: str, pdf_path: Path, notes: str = None,
+                timings: str = None, models: str = None, error: str = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO papers "
+                "(digest, status, pdf_path, notes, timings, models, error, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (digest, status, str(pdf_path), notes, timings, models, error,
+                 datetime.now().isoformat())
+            )
+            self._conn.commit()
@@ -1,110 +1,282 @@
 """LLM integration for local and SOTA models."""
 
+import re
 import json
-import requests
-from typing import Dict, Any, List, Optional
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+from dataclasses import dataclass
 from abc import ABC, abstractmethod
 from anthropic import Anthropic
 from openai import OpenAI
 import google.generativeai as genai
 from .config import Config
 from .pdf_processor import PDFContent
+from .cache import ResponseCache
+from .streaming import IncrementalJSONParser, MalformedOutputError, read_ndjson_stream
+from .transport import HTTPClient, CircuitBreaker
+from .context import ContextPiece, ContextPacker, PackedContext, input_budget
+from .ratelimit import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+SUMMARY_SYSTEM_PROMPT = """You are an expert research librarian specializing in AI interpretability and mechanistic interpretability.
+Your task is to summarize research papers in a structured format suitable for an Obsidian vault.
+Focus on clarity, accuracy, and extracting key information."""
+
+CHUNK_SYSTEM_PROMPT = """You are an expert research librarian taking notes on one part of a research paper.
+Record only what this part states. Be concise and specific."""
+
+SUMMARY_SCHEMA = """Provide a JSON response with the following structure:
+{
+    "core_claims": ["claim1", "claim2", ...],
+    "methodology": {
+        "approach": "description of the approach",
+        "key_techniques": ["technique1", "technique2", ...],
+        "datasets": ["dataset1", "dataset2", ...]
+    },
+    "key_terminology": {
+        "term1": "definition1",
+        "term2": "definition2"
+    },
+    "limitations": ["limitation1", "limitation2", ...],
+    "tags": ["tag1", "tag2", ...]
+}"""
+
+# Tokens of a local model's context window kept free for the summary itself
+SUMMARY_OUTPUT_TOKENS = 1024
+
+# Back matter left out of map-reduce summaries
+_BACK_MATTER_RE = re.compile(r'references|bibliography|acknowledg', re.IGNORECASE)
+
+
+def section_chunks(sections: Dict[str, str], full_text: str,
+                   max_tokens: int) -> List[Tuple[List[str], str]]:
+    """Split a paper into chunks that follow section boundaries.
+
+    Consecutive sections are grouped while they fit in ``max_tokens``;
+    a longer section is split at paragraph (or, failing that, word)
+    boundaries. Back matter such as references is skipped. Papers without
+    detected sections are chunked from the full text.
+
+    Args:
+        sections: Dictionary of section titles to content
+        full_text: Full text (used when no sections were detected)
+        max_tokens: Maximum estimated tokens per chunk
+
+    Returns:
+        List of (section titles, chunk text)
+    """
+    parts = [(title, text) for title, text in sections.items()
+             if not _BACK_MATTER_RE.search(title)]
+    if not parts:
+        parts = [('', full_text)]
+
+    chunks: List[Tuple[List[str], str]] = []
+    titles: List[str] = []
+    texts: List[str] = []
+    size = 0
+
+    def flush():
+        nonlocal titles, texts, size
+        if texts:
+            chunks.append((titles, "\n\n".join(texts)))
+        titles, texts, size = [], [], 0
+
+    for title, text in parts:
+        tokens = estimate_tokens(text)
+        if size + tokens > max_tokens:
+            flush()
+        if tokens <= max_tokens:
+            if title:
+                titles.append(title)
+            texts.append(text)
+            size += tokens
+            continue
+
+        # Split an oversized section into pieces that fit
+        for piece in _split_text(text, max_tokens):
+            chunks.append(([title] if title else [], piece))
+
+    flush()
+    return chunks
+
+
+def _split_text(text: str, max_tokens: int) -> List[str]:
+    """Split text at paragraph or word boundaries into pieces of at most ``max_tokens``."""
+    # Inverse of estimate_tokens' ~4 characters per token
+    max_chars = max_tokens * 4
+    pieces = []
+    while len(text) > max_chars:
+        cut = text.rfind('\n\n', 0, max_chars)
+        if cut < max_chars // 2:
+            cut = text.rfind(' ', 0, max_chars)
+        if cut < max_chars // 2:
+            cut = max_chars
+        pieces.append(text[:cut].strip())
+        text = text[cut:].strip()
+    if text:
+        pieces.append(text)
+    return pieces
 
 
 class OllamaClient:
     """Client for local Ollama models."""
 
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, cache: Optional[ResponseCache] = None):
         """Initialize Ollama client.
 
         Args:
             config: Hedorah configuration
+            cache: Response cache for repeated requests (optional)
         """
         self.config = config
         self.api_url = config.ollama_url
         self.model = config.local_model
+        self.cache = cache
+        self.stream = config.get('llm.local.stream', True)
+        self.num_ctx = config.get('llm.local.num_ctx')
+        # Without an explicit budget, fill the configured context window
+        self.input_budget = config.get(
+            'llm.local.input_budget',
+            self.num_ctx - SUMMARY_OUTPUT_TOKENS if self.num_ctx else 2000
+        )
+        self.summary_mode = config.get('llm.local.summary_mode', 'single')
+        self._map_pool = ThreadPoolExecutor(
+            max_workers=config.get('llm.local.summary_workers', 4),
+            thread_name_prefix="hedorah-summary-map"
+        )
+        self.http = HTTPClient(
+            self.api_url,
+            connect_timeout=config.get('llm.local.connect_timeout', 5),
+            read_timeout=config.get('llm.local.read_timeout', 300),
+            max_retries=config.get('llm.local.max_retries', 3),
+            backoff_seconds=config.get('llm.local.backoff_seconds', 1.0),
+            pool_size=config.get('llm.local.pool_size', 10),
+            breaker=CircuitBreaker(
+                failure_threshold=config.get('llm.local.circuit_failures', 5),
+                reset_seconds=config.get('llm.local.circuit_reset_seconds', 30)
+            )
+        )
 
-    def generate(self, prompt: str, system: str = None) -> str:
+    def generate(self, prompt: str, system: str = None, expect_json: bool = False) -> str:
         """Generate text using Ollama.
 
+        When streaming is enabled and JSON is expected, the output is
+        validated as it arrives: generation stops as soon as the JSON object
+        is complete, and is aborted as soon as it cannot become valid JSON.
+
         Args:
             prompt: User prompt
             system: System prompt (optional)
+            expect_json: Whether the response should be a JSON object
 
         Returns:
             Generated text
-        """
-        url = f"{self.api_url}/api/generate"
 
+        Raises:
+            MalformedOutputError: If streamed JSON output is malformed
+        """
         payload = {
             "model": self.model,
             "prompt": prompt,
-            "stream": False
+            "stream": self.stream
         }
 
         if system:
             payload["system"] = system
+        if self.num_ctx:
+            payload["options"] = {"num_ctx": self.num_ctx}
 
-        response = requests.post(url, json=payload)
-        response.raise_for_status()
+        cache_key = None
+        if self.cache:
+            # Streamed JSON is cut off once the object is complete, so the
+            # JSON setting shapes the response as much as the payload does
+            cache_key = self.cache.make_key(provider='ollama', expect_json=expect_json, **payload)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-        result = response.json()
-        return result.get("response", "")
+        started = time.monotonic()
+        response = self.http.post("/api/generate", json=payload, stream=self.stream)
 
-    def summarize_paper(self, content: PDFContent) -> Dict[str, Any]:
-        """Summarize a research paper using local model.
+        if self.stream:
+            parser = IncrementalJSONParser() if expect_json else None
+            text, stats = read_ndjson_stream(response, started, parser)
+            logger.info(f"Ollama {self.model}: {stats.format()}")
+        else:
+            result = response.json()
+            text = result.get("response", "")
+
+        if self.cache:
+            self.cache.put(cache_key, text)
+
+        return text
+
+    def embed(self, texts: List[str], model: str) -> List[List[float]]:
+        """Embed texts with an Ollama embedding model.
 
         Args:
-            content: Extracted PDF content
+            texts: Texts to embed
+            model: Embedding model name (e.g. nomic-embed-text)
 
         Returns:
-            Structured summary
+            One embedding vector per text
         """
-        system_prompt = """You are an expert research librarian specializing in AI interpretability and mechanistic interpretability.
-Your task is to summarize research papers in a structured format suitable for an Obsidian vault.
-Focus on clarity, accuracy, and extracting key information."""
+        response = self.http.post("/api/embed", json={"model": model, "input": texts})
+        return response.json()["embeddings"]
 
-        user_prompt = f"""Analyze this research paper and provide a structured summary:
-
-Title: {content.title}
-Authors: {', '.join(content.authors)}
+    def close(self) -> None:
+        """Stop the chunk summary workers and close pooled connections."""
+        self._map_pool.shutdown(wait=True)
+        self.http.close()
 
-Abstract:
-{content.abstract}
+    def summarize_paper(self, content: PDFContent) -> Dict[str, Any]:
+        """Summarize a research paper using local model.
 
-Full text (first 3000 chars):
-{content.full_text[:3000]}
+        In ``single`` mode the abstract and as much of the full text as fits
+        in ``llm.local.input_budget`` tokens are summarized in one call. In
+        ``map_reduce`` mode the whole paper is split into section-aligned
+        chunks that are summarized in parallel, and the chunk notes are
+        then combined into the summary. ``auto`` uses map-reduce only when
+        the paper does not fit in one prompt. ``single`` is the default.
 
-Provide a JSON response with the following structure:
-{{
-    "core_claims": ["claim1", "claim2", ...],
-    "methodology": {{
-        "approach": "description of the approach",
-        "key_techniques": ["technique1", "technique2", ...],
-        "datasets": ["dataset1", "dataset2", ...]
-    }},
-    "key_terminology": {{
-        "term1": "definition1",
-        "term2": "definition2"
-    }},
-    "limitations": ["limitation1", "limitation2", ...],
-    "tags": ["tag1", "tag2", ...]
-}}"""
+        Args:
+            content: Extracted PDF content
 
-        response = self.generate(user_prompt, system=system_prompt)
+        Returns:
+            Structured summary
+        """
+        pieces = [
+            ContextPiece('abstract', content.abstract or '', 0),
+            ContextPiece('full text', content.full_text, 1),
+        ]
+        template = self._summary_prompt(content, PackedContext(texts={}, tokens=0, budget=0))
+        overhead = estimate_tokens(SUMMARY_SYSTEM_PROMPT) + estimate_tokens(template)
+        packed = ContextPacker(self.input_budget - overhead).pack(pieces)
+
+        fits = not (packed.truncated or packed.dropped)
+        if self.summary_mode == 'map_reduce' or (self.summary_mode == 'auto' and not fits):
+            return self._summarize_map_reduce(content)
+
+        logger.info(f"Summary prompt for {content.title!r}: {packed.format()} "
+                    f"(+{overhead} template)")
+        return self._summary_call(self._summary_prompt(content, packed), content.title)
+
+    def _summary_call(self, user_prompt: str, title: str) -> Dict[str, Any]:
+        """Run a summary prompt and parse the summary schema from the response."""
+        try:
+            response = self.generate(user_prompt, system=SUMMARY_SYSTEM_PROMPT, expect_json=True)
+        except MalformedOutputError as e:
+            logger.warning(f"Summary for {title!r} was not valid JSON: {e}")
+            response = e.partial
 
         # Try to parse JSON from response
         try:
-            # Sometimes the model wraps JSON in markdown code blocks
-            if "```json" in response:
-                json_text = response.split("```json")[1].split("```")[0].strip()
-            elif "```" in response:
-                json_text = response.split("```")[1].split("```")[0].strip()
-            else:
-                json_text = response
-
-            summary = json.loads(json_text)
-            return summary
+            return extract_json(response)
         except json.JSONDecodeError:
             # Fallback: return raw response
             return {
@@ -116,6 +288,95 @@ Provide a JSON response with the following structure:
                 "raw_response": response
             }
 
+    def _summary_prompt(self, content: PDFContent, packed: PackedContext) -> str:
+        """Fill the summary prompt template with packed context."""
+        return f"""Analyze this research paper and provide a structured summary:
+
+Title: {content.title}
+Authors: {', '.join(content.authors)}
+
+Abstract:
+{packed.get('abstract')}
+
+Full text:
+{packed.get('full text')}
+
+{SUMMARY_SCHEMA}"""
+
+    def _summarize_map_reduce(self, content: PDFContent) -> Dict[str, Any]:
+        """Summarize chunks of the paper in parallel, then combine the chunk notes."""
+        overhead = (estimate_tokens(CHUNK_SYSTEM_PROMPT)
+                    + estimate_tokens(self._chunk_prompt(content, [], '')))
+        chunks = section_chunks(content.sections, content.full_text,
+                                max(200, self.input_budget - overhead))
+        logger.info(f"Summarizing {content.title!r} in {len(chunks)} chunks")
+
+        notes = list(self._map_pool.map(
+            lambda chunk: self._summarize_chunk(content, *chunk), chunks))
+
+        pieces = [ContextPiece('abstract', content.abstract or '', 0)]
+        pieces += [ContextPiece(f"chunk {i + 1}", text, 1) for i, text in enumerate(notes)]
+        template = self._reduce_prompt(content, PackedContext(texts={}, tokens=0, budget=0), 0)
+        overhead = estimate_tokens(SUMMARY_SYSTEM_PROMPT) + estimate_tokens(template)
+        packed = ContextPacker(self.input_budget - overhead).pack(pieces)
+        logger.info(f"Summary reduce prompt for {content.title!r}: {packed.format()} "
+                    f"(+{overhead} template)")
+
+        return self._summary_call(self._reduce_prompt(content, packed, len(notes)), content.title)
+
+    def _summarize_chunk(self, content: PDFContent, titles: List[str], text: str) -> str:
+        """Summarize one chunk into notes (JSON text, '' if unusable)."""
+        prompt = self._chunk_prompt(content, titles, text)
+        try:
+            response = self.generate(prompt, system=CHUNK_SYSTEM_PROMPT, expect_json=True)
+        except MalformedOutputError as e:
+            logger.warning(f"Chunk notes for {content.title!r} ({', '.join(titles)}) "
+                           f"were not valid JSON: {e}")
+            return ''
+
+        try:
+            notes = extract_json(response)
+        except json.JSONDecodeError:
+            return ''
+        label = ', '.join(titles) or 'text'
+        return f"[{label}]\n{json.dumps(notes, ensure_ascii=False)}"
+
+    def _chunk_prompt(self, content: PDFContent, titles: List[str], text: str) -> str:
+        """Build the map prompt for one chunk."""
+        return f"""Take notes on this part of a research paper.
+
+Paper: {content.title}
+Sections: {', '.join(titles) or 'unknown'}
+
+{text}
+
+Provide a JSON response with the following structure (use empty lists for anything this part does not cover):
+{{
+    "claims": ["claim1", ...],
+    "methods": ["approach or technique", ...],
+    "datasets": ["dataset1", ...],
+    "results": ["key result", ...],
+    "terminology": {{"term": "definition"}},
+    "limitations": ["limitation1", ...]
+}}"""
+
+    def _reduce_prompt(self, content: PDFContent, packed: PackedContext, n_chunks: int) -> str:
+        """Build the reduce prompt combining chunk notes into the summary schema."""
+        chunk_notes = "\n\n".join(
+            packed.get(f"chunk {i + 1}") for i in range(n_chunks) if packed.get(f"chunk {i + 1}"))
+        return f"""Combine these notes on each part of a research paper into a structured summary:
+
+Title: {content.title}
+Authors: {', '.join(content.authors)}
+
+Abstract:
+{packed.get('abstract')}
+
+Notes by section:
+{chunk_notes}
+
+{SUMMARY_SCHEMA}"""
+
     def generate_figure_descriptions(self, paper_title: str, abstract: str,
                                       figures: list, max_figures: int = 2) -> List[Dict[str, Any]]:
         """Generate descriptions for figures and select the most relevant ones.
@@ -164,54 +425,294 @@ Respond in JSON format:
     ]
 }}"""
 
-        response = self.generate(user_prompt, system=system_prompt)
+        try:
+            response = self.generate(user_prompt, system=system_prompt, expect_json=True)
+        except MalformedOutputError as e:
+            logger.warning(f"Figure selection was not valid JSON: {e}")
+            response = e.partial
 
         try:
-            if "```json" in response:
-                json_text = response.split("```json")[1].split("```")[0].strip()
-            elif "```" in response:
-                json_text = response.split("```")[1].split("```")[0].strip()
-            else:
-                json_text = response
-
-            result = json.loads(json_text)
-            return result.get("selected_figures", [])
+            return extract_json(response).get("selected_figures", [])
         except json.JSONDecodeError:
             # Fallback: return first max_figures with basic descriptions
             return [{"figure_number": i+1, "description": fig.caption or "No description", "importance": ""}
                     for i, fig in enumerate(figures[:max_figures])]
 
 
-class ReasoningClient(ABC):
-    """Abstract base class for reasoning LLM clients."""
+@dataclass
+class Prompt:
+    """A reasoning prompt with its stable, cacheable parts first."""
+    system: str
+    prompt: str                 # Paper-specific part
+    context: Optional[str] = None  # Stable user-turn prefix (e.g. the user's notes)
 
-    @abstractmethod
-    def generate(self, prompt: str, system: str = None, max_tokens: int = 4000) -> str:
-        """Generate text using the LLM."""
-        pass
 
-    def analyze_paper(self, content: PDFContent, summary: Dict[str, Any],
-                       user_notes: List[Dict[str, str]] = None,
-                       agenda: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Perform deep analysis of a research paper.
+class TokenUsage:
+    """Running totals of reasoning input tokens, split by prompt-cache status."""
+
+    def __init__(self):
+        """Initialize counters."""
+        self.calls = 0
+        self.input_tokens = 0   # Uncached input tokens
+        self.cached_tokens = 0  # Read from the provider's prompt cache
+        self.written_tokens = 0  # Written to the prompt cache (Anthropic)
+        self.output_tokens = 0
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, uncached: int, cached: int = 0, written: int = 0,
+               output: int = 0) -> None:
+        """Record one call's usage and log it.
 
         Args:
-            content: Extracted PDF content
-            summary: Summary from local model
-            user_notes: Optional list of user notes from vault to incorporate
-            agenda: Optional research agenda to guide analysis
+            provider: Provider name (for the log line)
+            uncached: Input tokens billed at the full rate
+            cached: Input tokens read from the prompt cache
+            written: Input tokens written to the prompt cache
+            output: Output tokens
+        """
+        with self._lock:
+            self.calls += 1
+            self.input_tokens += uncached
+            self.cached_tokens += cached
+            self.written_tokens += written
+            self.output_tokens += output
+        logger.info(f"{provider} input tokens: {cached} cached, {uncached} uncached"
+                    f"{f', {written} written to cache' if written else ''}; {output} output")
+
+    def format(self) -> str:
+        """Format totals for display.
 
         Returns:
-            Deep analysis with insights and connections
+            Human-readable usage string
         """
-        # Build agenda-aware system prompt
-        agenda_context = ""
-        if agenda:
-            agenda_context = f"""
+        total = self.input_tokens + self.cached_tokens + self.written_tokens
+        rate = self.cached_tokens / total * 100 if total else 0.0
+        return (f"{self.calls} calls, {self.cached_tokens} cached / "
+                f"{self.input_tokens + self.written_tokens} uncached input tokens "
+                f"({rate:.0f}% cached), {self.output_tokens} output tokens")
+
+
+def join_context(prompt: str, context: Optional[str]) -> str:
+    """Put a stable context before the prompt in a single user message.
+
+    Args:
+        prompt: Paper-specific prompt
+        context: Stable prefix (optional)
+
+    Returns:
+        Combined user message
+    """
+    return f"{context}\n\n{prompt}" if context else prompt
+
+
+def gemini_prompt(prompt: str, system: Optional[str], context: Optional[str]) -> str:
+    """Build the single prompt Gemini is sent.
+
+    Gemini combines system and user prompts, so the system prompt comes
+    first, then the stable context, then the paper-specific prompt.
+
+    Args:
+        prompt: Paper-specific prompt
+        system: System prompt (optional)
+        context: Stable prefix (optional)
+
+    Returns:
+        Combined prompt
+    """
+    full_prompt = join_context(prompt, context)
+    return f"{system}\n\n{full_prompt}" if system else full_prompt
+
+
+def anthropic_cached_params(prompt: str, system: Optional[str],
+                            context: Optional[str]) -> Dict[str, Any]:
+    """Build Anthropic ``system``/``messages`` with prompt-cache breakpoints.
+
+    The system prompt and the context each end a cacheable prefix, so the
+    system prompt is reused even when the context differs between calls.
+
+    Args:
+        prompt: Paper-specific prompt
+        system: System prompt (optional)
+        context: Stable user-turn prefix (optional)
+
+    Returns:
+        Keyword arguments for ``messages.create``
+    """
+    content = []
+    if context:
+        content.append({"type": "text", "text": context, "cache_control": {"type": "ephemeral"}})
+    content.append({"type": "text", "text": prompt})
+
+    params: Dict[str, Any] = {"messages": [{"role": "user", "content": content}]}
+    if system:
+        params["system"] = [
+            {"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}
+        ]
+    return params
+
+
+# Output budgets for the reasoning model's structured responses
+ANALYSIS_MAX_TOKENS = 8000
+EXPERIMENTS_MAX_TOKENS = 8000
+
+
+def extract_json(response: str) -> Any:
+    """Parse JSON from a model response, unwrapping Markdown code blocks.
+
+    Args:
+        response: Raw model output
+
+    Returns:
+        Parsed JSON value
+
+    Raises:
+        json.JSONDecodeError: If the response does not contain valid JSON
+    """
+    # Sometimes the model wraps JSON in markdown code blocks
+    if "```json" in response:
+        json_text = response.split("```json")[1].split("```")[0].strip()
+    elif "```" in response:
+        json_text = response.split("```")[1].split("```")[0].strip()
+    else:
+        json_text = response
+    return json.loads(json_text)
+
+
+# Leading characters of each section packed ahead of the rest of any section
+SECTION_HEAD_CHARS = 500
+
+
+def section_pieces(sections: Dict[str, str], head_priority: int,
+                   rest_priority: int) -> List[ContextPiece]:
+    """Split sections into context pieces.
+
+    Each section's opening is one piece and its remainder another, so a
+    tight budget still covers every section before any is given in full.
+
+    Args:
+        sections: Dictionary of section titles to content
+        head_priority: Priority of each section's opening
+        rest_priority: Priority of each section's remainder
+
+    Returns:
+        List of context pieces
+    """
+    pieces = []
+    for title, text in sections.items():
+        pieces.append(ContextPiece(f"section {title}", text[:SECTION_HEAD_CHARS], head_priority))
+        if len(text) > SECTION_HEAD_CHARS:
+            pieces.append(ContextPiece(f"section {title} (rest)", text[SECTION_HEAD_CHARS:],
+                                       rest_priority))
+    return pieces
+
+
+def format_sections(sections: Dict[str, str], packed: PackedContext) -> str:
+    """Format the packed parts of each section for a prompt.
+
+    Args:
+        sections: Dictionary of section titles to content
+        packed: Packed context holding pieces from ``section_pieces``
+
+    Returns:
+        Formatted string
+    """
+    formatted = []
+    for title, content in sections.items():
+        head = packed.get(f"section {title}")
+        if not head:
+            continue
+        rest = packed.get(f"section {title} (rest)")
+        if rest:
+            text = head + rest
+        elif len(content) > SECTION_HEAD_CHARS and not head.endswith('...'):
+            text = head + "..."
+        else:
+            text = head
+        formatted.append(f"## {title}\n{text}")
+
+    return "\n\n".join(formatted)
+
+
+def analysis_input_budget(config: Config) -> int:
+    """Get the input token budget for analysis prompts.
+
+    Args:
+        config: Hedorah configuration
+
+    Returns:
+        Tokens available for the prompt: the reasoning model's context
+        window less the output reservation, capped at
+        ``llm.reasoning.input_budget``
+    """
+    return input_budget(config.reasoning_model, ANALYSIS_MAX_TOKENS,
+                        config.get('llm.reasoning.input_budget', 16000))
+
+
+def build_analysis_prompt(content: PDFContent, summary: Dict[str, Any],
+                          user_notes: List[Dict[str, str]] = None,
+                          agenda: Dict[str, Any] = None,
+                          budget: Optional[int] = None) -> "Prompt":
+    """Build the deep-analysis prompt.
+
+    The system prompt (with the agenda) is the same for every paper and
+    comes first, then the user's notes, then the paper, so providers can
+    cache the shared prefix. The agenda, abstract, summary, notes and
+    sections are packed into ``budget`` tokens in that order of priority:
+    the opening of every section is kept before the rest of any section.
+
+    Args:
+        content: Extracted PDF content
+        summary: Summary from local model
+        user_notes: Optional list of user notes from vault to incorporate
+        agenda: Optional research agenda to guide analysis
+        budget: Input token budget for the whole prompt (None for no limit)
+
+    Returns:
+        Prompt with the user notes as its cacheable context
+    """
+    user_notes = user_notes or []
+    pieces = [
+        ContextPiece('agenda', agenda.get('content', '') if agenda else '', 0),
+        ContextPiece('abstract', content.abstract or '', 0),
+        ContextPiece('summary', json.dumps(summary, indent=2), 1, truncate=False),
+    ]
+    pieces += [ContextPiece(_note_piece_name(i, note), note['content'], 2)
+               for i, note in enumerate(user_notes)]
+    pieces += section_pieces(content.sections, head_priority=3, rest_priority=4)
+
+    def render(packed: PackedContext) -> "Prompt":
+        return _render_analysis_prompt(content, packed, user_notes, agenda)
+
+    if budget is None:
+        packed = ContextPacker(sum(estimate_tokens(piece.text) for piece in pieces)).pack(pieces)
+        return render(packed)
+
+    empty = render(PackedContext(texts={}, tokens=0, budget=0))
+    overhead = (estimate_tokens(empty.system) + estimate_tokens(empty.context)
+                + estimate_tokens(empty.prompt))
+    packed = ContextPacker(budget - overhead).pack(pieces)
+    logger.info(f"Analysis prompt for {content.title!r}: {packed.format()} "
+                f"(+{overhead} template)")
+    return render(packed)
+
+
+def _note_piece_name(index: int, note: Dict[str, str]) -> str:
+    """Name of a user note's context piece (unique even if titles repeat)."""
+    return f"note {index + 1} ({note['title']})"
+
+
+def _render_analysis_prompt(content: PDFContent, packed: PackedContext,
+                            user_notes: List[Dict[str, str]],
+                            agenda: Optional[Dict[str, Any]]) -> "Prompt":
+    """Fill the analysis prompt template with packed context."""
+    # Build agenda-aware system prompt
+    agenda_context = ""
+    if agenda:
+        agenda_context = f"""
 
 IMPORTANT: The user has a specific research agenda. Prioritize insights and connections that align with their goals. Here is their research agenda:
 
-{agenda.get('content', '')}
+{packed.get('agenda')}
 
 When analyzing this paper:
 - Highlight aspects most relevant to their stated focus areas
@@ -220,39 +721,38 @@ When analyzing this paper:
 - Note if the paper is outside their stated interests (but still summarize key findings)
 """
 
-        system_prompt = f"""You are an expert research analyst. Your task is to deeply analyze research papers, identify conceptual connections, research gaps, and generate actionable insights.
+    system_prompt = f"""You are an expert research analyst. Your task is to deeply analyze research papers, identify conceptual connections, research gaps, and generate actionable insights.
 
 If the user has provided personal notes/thoughts, treat them as important context. Look for connections between the paper and these notes. The user's intuitions and questions are valuable - try to validate, extend, or connect them to the paper's findings.{agenda_context}"""
 
-        # Build user notes section if provided
-        notes_section = ""
-        if user_notes:
-            notes_text = "\n\n".join([
-                f"**{note['title']}**\n{note['content']}"
-                for note in user_notes
-            ])
-            notes_section = f"""
-
-USER'S NOTES & THOUGHTS:
+    # Build user notes section if provided. It goes before the paper so the
+    # system prompt and notes form a prefix that providers can cache.
+    notes_section = ""
+    notes_text = "\n\n".join([
+        f"**{note['title']}**\n{packed.get(_note_piece_name(i, note))}"
+        for i, note in enumerate(user_notes)
+        if packed.get(_note_piece_name(i, note))
+    ])
+    if notes_text:
+        notes_section = f"""USER'S NOTES & THOUGHTS:
 The following are the user's personal notes and ideas. Look for connections between these thoughts and the paper. If any of these notes relate to the paper's content, explicitly mention the connection.
 
-{notes_text}
-"""
+{notes_text}"""
 
-        user_prompt = f"""Deeply analyze this research paper:
+    user_prompt = f"""Deeply analyze this research paper:
 
 Title: {content.title}
 Authors: {', '.join(content.authors)}
 
 Summary:
-{json.dumps(summary, indent=2)}
+{packed.get('summary')}
 
 Abstract:
-{content.abstract}
+{packed.get('abstract')}
 
 Key sections:
-{self._format_sections(content.sections)}
-{notes_section}
+{format_sections(content.sections, packed)}
+
 Provide a comprehensive analysis in JSON format:
 {{
     "key_insights": [
@@ -289,43 +789,46 @@ Provide a comprehensive analysis in JSON format:
     ]
 }}"""
 
-        response = self.generate(user_prompt, system=system_prompt, max_tokens=8000)
+    return Prompt(system_prompt, user_prompt, context=notes_section or None)
 
-        try:
-            if "```json" in response:
-                json_text = response.split("```json")[1].split("```")[0].strip()
-            elif "```" in response:
-                json_text = response.split("```")[1].split("```")[0].strip()
-            else:
-                json_text = response
-
-            analysis = json.loads(json_text)
-            return analysis
-        except json.JSONDecodeError:
-            return {
-                "key_insights": [],
-                "research_gaps": [],
-                "connections": [],
-                "questions": [],
-                "raw_response": response
-            }
 
-    def generate_experiments(self, content: PDFContent, analysis: Dict[str, Any],
-                              agenda: Dict[str, Any] = None) -> List[Dict[str, Any]]:
-        """Generate experiment proposals based on the paper.
+def parse_analysis(response: str) -> Dict[str, Any]:
+    """Parse the reasoning model's analysis response.
 
-        Args:
-            content: Extracted PDF content
-            analysis: Deep analysis results
-            agenda: Optional research agenda to guide experiment design
+    Args:
+        response: Raw model output
+
+    Returns:
+        Analysis dict (with ``raw_response`` if it was not valid JSON)
+    """
+    try:
+        return extract_json(response)
+    except json.JSONDecodeError:
+        return {
+            "key_insights": [],
+            "research_gaps": [],
+            "connections": [],
+            "questions": [],
+            "raw_response": response
+        }
 
-        Returns:
-            List of experiment proposals
-        """
-        # Build agenda-aware context
-        agenda_context = ""
-        if agenda:
-            agenda_context = f"""
+
+def build_experiments_prompt(content: PDFContent, analysis: Dict[str, Any],
+                             agenda: Dict[str, Any] = None) -> "Prompt":
+    """Build the experiment-design prompt.
+
+    Args:
+        content: Extracted PDF content
+        analysis: Deep analysis results
+        agenda: Optional research agenda to guide experiment design
+
+    Returns:
+        Prompt (the system prompt with the agenda is the cacheable prefix)
+    """
+    # Build agenda-aware context
+    agenda_context = ""
+    if agenda:
+        agenda_context = f"""
 
 IMPORTANT: The user has a specific research agenda. Design experiments that align with their goals and constraints. Here is their research agenda:
 
@@ -338,7 +841,7 @@ When designing experiments:
 - Connect experiments to their current hunches and hypotheses when relevant
 """
 
-        system_prompt = f"""You are an expert research experiment designer. Your task is to read research papers and design structured experiment specifications that could validate, extend, or challenge the paper's findings.
+    system_prompt = f"""You are an expert research experiment designer. Your task is to read research papers and design structured experiment specifications that could validate, extend, or challenge the paper's findings.
 
 You are NOT generating code. You are generating a detailed experiment specification document that another researcher or agent could use to implement the experiment.
 
@@ -351,7 +854,7 @@ Focus on:
 
 The experiment specification should be self-contained - someone reading it should understand exactly what to build and why, without needing to read the source paper.{agenda_context}"""
 
-        user_prompt = f"""Based on this paper analysis, generate experiment proposals:
+    user_prompt = f"""Based on this paper analysis, generate experiment proposals:
 
 Paper: {content.title}
 Authors: {', '.join(content.authors)}
@@ -419,104 +922,218 @@ Generate 2-4 experiment proposals in JSON format. Each experiment should be a co
     ]
 }}"""
 
-        response = self.generate(user_prompt, system=system_prompt, max_tokens=8000)
+    return Prompt(system_prompt, user_prompt)
 
-        try:
-            if "```json" in response:
-                json_text = response.split("```json")[1].split("```")[0].strip()
-            elif "```" in response:
-                json_text = response.split("```")[1].split("```")[0].strip()
-            else:
-                json_text = response
-
-            result = json.loads(json_text)
-            return result.get("experiments", [])
-        except json.JSONDecodeError:
-            return []
 
-    def _format_sections(self, sections: Dict[str, str]) -> str:
-        """Format sections for prompt.
+def parse_experiments(response: str) -> List[Dict[str, Any]]:
+    """Parse the reasoning model's experiment proposals.
+
+    Args:
+        response: Raw model output
+
+    Returns:
+        List of experiment proposals (empty if not valid JSON)
+    """
+    try:
+        return extract_json(response).get("experiments", [])
+    except json.JSONDecodeError:
+        return []
+
+
+class ReasoningClient(ABC):
+    """Abstract base class for reasoning LLM clients."""
+
+    # Provider name, part of the response cache key
+    provider: str = ''
+
+    def __init__(self, config: Config, cache: Optional[ResponseCache] = None):
+        """Initialize shared client state.
+
+        Args:
+            config: Hedorah configuration
+            cache: Response cache for repeated requests (optional)
+        """
+        self.config = config
+        self.cache = cache
+        self.usage = TokenUsage()
+        self.input_budget = analysis_input_budget(config)
+
+    def generate(self, prompt: str, system: str = None, max_tokens: int = 4000,
+                 context: str = None) -> str:
+        """Generate text using the LLM, serving repeated requests from the cache.
+
+        Args:
+            prompt: User prompt
+            system: System prompt (optional)
+            max_tokens: Maximum tokens to generate
+            context: Stable user-turn prefix sent before the prompt and marked
+                as cacheable where the provider supports it (optional)
+
+        Returns:
+            Generated text
+        """
+        if self.cache is None:
+            return self._generate(prompt, system, max_tokens, context)
+
+        cache_key = self.cache_key(prompt, system, max_tokens, context)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        text = self._generate(prompt, system, max_tokens, context)
+        self.cache.put(cache_key, text)
+        return text
+
+    def cache_key(self, prompt: str, system: str = None, max_tokens: int = 4000,
+                  context: str = None) -> str:
+        """Build the response cache key for a request.
 
         Args:
-            sections: Dictionary of section titles to content
+            prompt: User prompt
+            system: System prompt (optional)
+            max_tokens: Maximum tokens to generate
+            context: Stable user-turn prefix (optional)
 
         Returns:
-            Formatted string
+            Hex cache key
         """
-        formatted = []
-        for title, content in sections.items():
-            # Truncate long sections
-            truncated = content[:500] + "..." if len(content) > 500 else content
-            formatted.append(f"## {title}\n{truncated}")
+        return ResponseCache.make_key(
+            provider=self.provider,
+            model=self.config.reasoning_model,
+            prompt=prompt,
+            system=system,
+            context=context,
+            max_tokens=max_tokens
+        )
 
-        return "\n\n".join(formatted)
+    @abstractmethod
+    def _generate(self, prompt: str, system: str = None, max_tokens: int = 4000,
+                  context: str = None) -> str:
+        """Generate text using the LLM (provider-specific, uncached)."""
+        pass
+
+    def close(self) -> None:
+        """Release resources held by the client."""
+        pass
+
+    def analyze_paper(self, content: PDFContent, summary: Dict[str, Any],
+                       user_notes: List[Dict[str, str]] = None,
+                       agenda: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Perform deep analysis of a research paper.
+
+        Args:
+            content: Extracted PDF content
+            summary: Summary from local model
+            user_notes: Optional list of user notes from vault to incorporate
+            agenda: Optional research agenda to guide analysis
+
+        Returns:
+            Deep analysis with insights and connections
+        """
+        prompt = build_analysis_prompt(content, summary, user_notes, agenda, self.input_budget)
+        response = self.generate(prompt.prompt, system=prompt.system,
+                                 max_tokens=ANALYSIS_MAX_TOKENS, context=prompt.context)
+        return parse_analysis(response)
+
+    def generate_experiments(self, content: PDFContent, analysis: Dict[str, Any],
+                              agenda: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Generate experiment proposals based on the paper.
+
+        Args:
+            content: Extracted PDF content
+            analysis: Deep analysis results
+            agenda: Optional research agenda to guide experiment design
+
+        Returns:
+            List of experiment proposals
+        """
+        prompt = build_experiments_prompt(content, analysis, agenda)
+        response = self.generate(prompt.prompt, system=prompt.system,
+                                 max_tokens=EXPERIMENTS_MAX_TOKENS, context=prompt.context)
+        return parse_experiments(response)
 
 
 class ClaudeClient(ReasoningClient):
     """Client for Claude API (Anthropic)."""
 
-    def __init__(self, config: Config):
+    provider = 'anthropic'
+
+    def __init__(self, config: Config, cache: Optional[ResponseCache] = None):
         """Initialize Claude client.
 
         Args:
             config: Hedorah configuration
+            cache: Response cache for repeated requests (optional)
         """
-        self.config = config
+        super().__init__(config, cache)
         api_key = config.get('llm.reasoning.api_key')
         if not api_key or api_key.startswith('${'):
             raise ValueError("Anthropic API key not configured")
         self.client = Anthropic(api_key=api_key)
         self.model = config.reasoning_model
 
-    def generate(self, prompt: str, system: str = None, max_tokens: int = 4000) -> str:
+    def _generate(self, prompt: str, system: str = None, max_tokens: int = 4000,
+                  context: str = None) -> str:
         """Generate text using Claude.
 
+        The system prompt and context are marked with ``cache_control`` so
+        repeated prefixes are read from Anthropic's prompt cache.
+
         Args:
             prompt: User prompt
             system: System prompt (optional)
             max_tokens: Maximum tokens to generate
+            context: Stable user-turn prefix (optional)
 
         Returns:
             Generated text
         """
-        messages = [{"role": "user", "content": prompt}]
-
         kwargs = {
             "model": self.model,
             "max_tokens": max_tokens,
-            "messages": messages
+            **anthropic_cached_params(prompt, system, context)
         }
 
-        if system:
-            kwargs["system"] = system
-
         response = self.client.messages.create(**kwargs)
+        usage = response.usage
+        self.usage.record(self.provider, usage.input_tokens,
+                          cached=usage.cache_read_input_tokens or 0,
+                          written=usage.cache_creation_input_tokens or 0,
+                          output=usage.output_tokens)
         return response.content[0].text
 
 
 class OpenAIClient(ReasoningClient):
     """Client for OpenAI API (GPT-4, o1, etc.)."""
 
-    def __init__(self, config: Config):
+    provider = 'openai'
+
+    def __init__(self, config: Config, cache: Optional[ResponseCache] = None):
         """Initialize OpenAI client.
 
         Args:
             config: Hedorah configuration
+            cache: Response cache for repeated requests (optional)
         """
-        self.config = config
+        super().__init__(config, cache)
         api_key = config.get('llm.reasoning.api_key')
         if not api_key or api_key.startswith('${'):
             raise ValueError("OpenAI API key not configured")
         self.client = OpenAI(api_key=api_key)
         self.model = config.reasoning_model
 
-    def generate(self, prompt: str, system: str = None, max_tokens: int = 4000) -> str:
+    def _generate(self, prompt: str, system: str = None, max_tokens: int = 4000,
+                  context: str = None) -> str:
         """Generate text using OpenAI.
 
+        OpenAI caches long prompt prefixes automatically, so the stable
+        system prompt and context only need to come first.
+
         Args:
             prompt: User prompt
             system: System prompt (optional)
             max_tokens: Maximum tokens to generate
+            context: Stable user-turn prefix (optional)
 
         Returns:
             Generated text
@@ -526,7 +1143,7 @@ class OpenAIClient(ReasoningClient):
         if system:
             messages.append({"role": "system", "content": system})
 
-        messages.append({"role": "user", "content": prompt})
+        messages.append({"role": "user", "content": join_context(prompt, context)})
 
         response = self.client.chat.completions.create(
             model=self.model,
@@ -534,40 +1151,51 @@ class OpenAIClient(ReasoningClient):
             max_tokens=max_tokens
         )
 
+        usage = response.usage
+        if usage:
+            details = getattr(usage, 'prompt_tokens_details', None)
+            cached = (details.cached_tokens or 0) if details else 0
+            self.usage.record(self.provider, usage.prompt_tokens - cached, cached=cached,
+                              output=usage.completion_tokens)
         return response.choices[0].message.content
 
 
 class GeminiClient(ReasoningClient):
     """Client for Google Gemini API."""
 
-    def __init__(self, config: Config):
+    provider = 'gemini'
+
+    def __init__(self, config: Config, cache: Optional[ResponseCache] = None):
         """Initialize Gemini client.
 
         Args:
             config: Hedorah configuration
+            cache: Response cache for repeated requests (optional)
         """
-        self.config = config
+        super().__init__(config, cache)
         api_key = config.get('llm.reasoning.api_key')
         if not api_key or api_key.startswith('${'):
             raise ValueError("Google API key not configured")
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel(config.reasoning_model)
 
-    def generate(self, prompt: str, system: str = None, max_tokens: int = 4000) -> str:
+    def _generate(self, prompt: str, system: str = None, max_tokens: int = 4000,
+                  context: str = None) -> str:
         """Generate text using Gemini.
 
+        Gemini caches repeated prefixes implicitly, so the stable system
+        prompt and context come first.
+
         Args:
             prompt: User prompt
             system: System prompt (optional)
             max_tokens: Maximum tokens to generate
+            context: Stable user-turn prefix (optional)
 
         Returns:
             Generated text
         """
-        # Gemini combines system and user prompts
-        full_prompt = prompt
-        if system:
-            full_prompt = f"{system}\n\n{prompt}"
+        full_prompt = gemini_prompt(prompt, system, context)
 
         response = self.model.generate_content(
             full_prompt,
@@ -576,28 +1204,39 @@ class GeminiClient(ReasoningClient):
             )
         )
 
+        usage = getattr(response, 'usage_metadata', None)
+        if usage:
+            cached = getattr(usage, 'cached_content_token_count', 0) or 0
+            self.usage.record(self.provider, usage.prompt_token_count - cached, cached=cached,
+                              output=usage.candidates_token_count)
         return response.text
 
 
-def create_reasoning_client(config: Config) -> ReasoningClient:
+def create_reasoning_client(config: Config, cache: Optional[ResponseCache] = None) -> ReasoningClient:
     """Factory function to create the appropriate reasoning client.
 
     Args:
         config: Hedorah configuration
+        cache: Response cache for repeated requests (optional)
 
     Returns:
-        ReasoningClient instance
+        ReasoningClient instance (rate-limited if ``llm.reasoning.rate_limits`` is set)
 
     Raises:
         ValueError: If provider is not supported
     """
+    if config.get('llm.reasoning.rate_limits'):
+        # Imported here: async_llm builds on this module
+        from .async_llm import RateLimitedReasoningClient
+        return RateLimitedReasoningClient(config, cache)
+
     provider = config.get('llm.reasoning.provider', 'anthropic').lower()
 
     if provider == 'anthropic':
-        return ClaudeClient(config)
+        return ClaudeClient(config, cache)
     elif provider == 'openai':
-        return OpenAIClient(config)
+        return OpenAIClient(config, cache)
     elif provider == 'gemini' or provider == 'google':
-        return GeminiClient(config)
+        return GeminiClient(config, cache)
     else:
         raise ValueError(f"Unsupported reasoning provider: {provider}")
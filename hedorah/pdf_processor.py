@@ -1,10 +1,43 @@
 """PDF processing module for extracting text, figures, equations, and citations."""
 
+import os
 import re
+import bisect
+import heapq
+import logging
+import threading
 import pymupdf
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Iterable, Tuple, Optional
 from dataclasses import dataclass, field
+from .cache import ExtractionCache
+from .attachments import store_attachment
+
+logger = logging.getLogger(__name__)
+
+# Common academic paper section headings, on a line of their own and
+# optionally numbered. One alternation finds them all in a single scan; the
+# trailing newline is only looked at, so back-to-back headings both match.
+SECTION_HEADINGS = (
+    'Abstract', 'Introduction', 'Related Work', 'Background', 'Methodology',
+    'Methods', 'Experiments?', 'Results', 'Discussion', 'Conclusion', 'References',
+)
+SECTION_HEADING_RE = re.compile(
+    r'\n\s*(?:\d+\.?\s+)?(' + '|'.join(SECTION_HEADINGS) + r')[^\S\n]*(?=\n)',
+    re.IGNORECASE
+)
+
+# A figure caption: a text block starting with its label ("Figure 3:",
+# "Fig. 2.", "Figure S1"); references to figures inside paragraphs do not
+# start a block
+FIGURE_CAPTION_RE = re.compile(r'\s*(?:Figure|Fig\.?)\s*[A-Z]{0,2}\d+[a-z]?\s*[:.|]?\s*(.*)',
+                               re.IGNORECASE | re.DOTALL)
+
+# Furthest (in points) a caption may sit from its image; captions above an
+# image count as this much further away than captions below it
+MAX_CAPTION_GAP = 72
+CAPTION_ABOVE_PENALTY = 1.5
 
 
 @dataclass
@@ -37,17 +70,233 @@ class Equation:
 
 @dataclass
 class PDFContent:
-    """Structured content extracted from a PDF."""
+    """Structured content extracted from a PDF.
+
+    Content returned by ``PDFProcessor.process`` keeps the PDF open and
+    extracts each field the first time it is read. Close it (or use it as a
+    context manager) to release the PDF and store what was extracted in the
+    extraction cache. Pickling keeps only the fields extracted so far;
+    ``PDFProcessor.attach`` lets unpickled content extract the rest.
+    """
     title: str
     authors: List[str]
     abstract: str
     full_text: str
-    sections: Dict[str, str]  # section_title -> content
+    sections: Dict[str, str]  # section_title -> content, in document order
+    section_pages: Dict[str, Tuple[int, int]] = field(default_factory=dict)  # -> (first, last page)
     figures: List[Figure] = field(default_factory=list)
     equations: List[Equation] = field(default_factory=list)
     citations: List[Citation] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
 
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not set yet, i.e. unmaterialized fields
+        source = self.__dict__.get('_source')
+        if source is None or name not in _LazyExtraction.LOADERS:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        return source.load(self, name)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = dict(self.__dict__)
+        state.pop('_source', None)
+        return state
+
+    def __enter__(self) -> "PDFContent":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def materialize(self) -> "PDFContent":
+        """Extract every field not read yet.
+
+        Returns:
+            This content, for chaining
+        """
+        source = self.__dict__.get('_source')
+        if source is not None:
+            for name in _LazyExtraction.LOADERS:
+                getattr(self, name)
+        return self
+
+    def close(self) -> None:
+        """Cache the fields extracted so far and release the PDF.
+
+        Fields not read yet can no longer be extracted afterwards.
+        """
+        source = self.__dict__.get('_source')
+        if source is not None:
+            source.close(self)
+
+
+class _LazyExtraction:
+    """Open PDF backing a lazy PDFContent.
+
+    Fields are extracted in groups that share work (sections with their
+    page ranges, title with authors and abstract); text extracted for one
+    group is reused by the others.
+    """
+
+    # Field -> method extracting it (and the other fields of its group).
+    # _page_starts maps text offsets to pages for the fields derived from
+    # the text; it is kept on the content so cached text can be reused.
+    LOADERS = {
+        '_page_starts': '_load_text',
+        'title': '_load_metadata',
+        'authors': '_load_metadata',
+        'abstract': '_load_metadata',
+        'full_text': '_load_text',
+        'sections': '_load_sections',
+        'section_pages': '_load_sections',
+        'figures': '_load_figures',
+        'equations': '_load_equations',
+        'citations': '_load_citations',
+        'metadata': '_load_document_metadata',
+    }
+
+    def __init__(self, processor: "PDFProcessor", pdf_path: Path, output_dir: Optional[Path],
+                 cache_key: Optional[str] = None):
+        """Open a PDF for lazy extraction.
+
+        Args:
+            processor: Processor whose options and extraction steps are used
+            pdf_path: Path to the PDF file
+            output_dir: Directory to save extracted figures (optional)
+            cache_key: Extraction cache key to store the extracted fields
+                under when closed (optional)
+        """
+        self.processor = processor
+        self.pdf_path = pdf_path
+        self.output_dir = output_dir
+        self.cache_key = cache_key
+        self.doc: Optional[pymupdf.Document] = pymupdf.open(pdf_path)
+        self._pages: Optional[List[Tuple[str, List[Dict[str, Any]]]]] = None
+        self._with_figures = False
+        self._full_text = ''
+        self._page_starts: List[int] = []
+        self._extracted = False  # Whether anything new was extracted
+        # Steps of one paper run in threads; PyMuPDF documents are not thread-safe
+        self._lock = threading.RLock()
+
+    def load(self, content: PDFContent, name: str) -> Any:
+        """Extract a field (and the rest of its group) onto ``content``.
+
+        Args:
+            content: Content to set the extracted fields on
+            name: Field to extract
+
+        Returns:
+            The field's value
+
+        Raises:
+            ValueError: If the PDF was closed before the field was read
+        """
+        with self._lock:
+            if name not in content.__dict__:
+                if self.doc is None:
+                    raise ValueError(f"Cannot extract {name!r} from {self.pdf_path.name}: "
+                                     f"PDF content is closed")
+                for field_name, value in getattr(self, self.LOADERS[name])(content).items():
+                    content.__dict__.setdefault(field_name, value)
+                self._extracted = True
+            return content.__dict__[name]
+
+    def close(self, content: PDFContent) -> None:
+        """Cache the extracted fields and close the PDF.
+
+        Whatever has been extracted is cached, even if some fields were
+        never read; a later cache hit extracts those from the PDF then.
+
+        Args:
+            content: Content this PDF backs
+        """
+        with self._lock:
+            if self._extracted and self.cache_key and self.processor.cache:
+                snapshot = PDFContent.__new__(PDFContent)
+                snapshot.__dict__.update(
+                    (name, value) for name, value in content.__dict__.items() if name != '_source')
+                self.processor.cache.put(self.cache_key, snapshot)
+                self._extracted = False
+            if self.doc is not None:
+                self.doc.close()
+                self.doc = None
+                self._pages = None
+
+    def _text(self, with_figures: bool = False) -> str:
+        """Extract the page texts (and figure candidates), once.
+
+        Args:
+            with_figures: Whether figure candidates are needed too
+
+        Returns:
+            Full text of the document
+        """
+        if self._pages is None or (with_figures and not self._with_figures):
+            self._pages = self.processor._extract_pages(self.doc, self.pdf_path, with_figures)
+            self._with_figures = with_figures
+            self._full_text, self._page_starts = self.processor._join_pages(
+                [text for text, _ in self._pages])
+        return self._full_text
+
+    def _load_text(self, content: PDFContent) -> Dict[str, Any]:
+        return {'full_text': self._text(), '_page_starts': self._page_starts}
+
+    def _load_sections(self, content: PDFContent) -> Dict[str, Any]:
+        sections, section_pages = self.processor._extract_sections(
+            content.full_text, content._page_starts)
+        return {'sections': sections, 'section_pages': section_pages}
+
+    def _load_metadata(self, content: PDFContent) -> Dict[str, Any]:
+        title, authors, abstract = self.processor._extract_metadata(
+            self.doc, content.full_text, content._page_starts)
+        return {'title': title, 'authors': authors, 'abstract': abstract}
+
+    def _load_document_metadata(self, content: PDFContent) -> Dict[str, Any]:
+        return {'metadata': {'page_count': len(self.doc), 'pdf_metadata': self.doc.metadata}}
+
+    def _load_figures(self, content: PDFContent) -> Dict[str, Any]:
+        if not (self.processor.extract_figures and self.output_dir is not None):
+            return {'figures': []}
+        full_text = self._text(with_figures=True)
+        content.__dict__.setdefault('full_text', full_text)
+        content.__dict__.setdefault('_page_starts', self._page_starts)
+        candidates = (candidate for _, page_candidates in self._pages
+                      for candidate in page_candidates)
+        return {'figures': self.processor._save_figures(self.doc, candidates, self.output_dir)}
+
+    def _load_equations(self, content: PDFContent) -> Dict[str, Any]:
+        if not self.processor.extract_equations:
+            return {'equations': []}
+        return {'equations': self.processor._extract_equations(content.full_text, content._page_starts)}
+
+    def _load_citations(self, content: PDFContent) -> Dict[str, Any]:
+        if not self.processor.extract_citations:
+            return {'citations': []}
+        return {'citations': self.processor._extract_citations(content.full_text, content._page_starts)}
+
+
+def _extract_page_range(processor: "PDFProcessor", pdf_path: Path, start: int, stop: int,
+                        with_figures: bool) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """Extract a range of pages in a worker process.
+
+    Each worker opens the document itself; PyMuPDF documents cannot be
+    shared between processes.
+
+    Args:
+        processor: PDF processor (pickled into the worker)
+        pdf_path: Path to the PDF file
+        start: First page index
+        stop: Page index after the last page
+        with_figures: Whether to collect figure candidates
+
+    Returns:
+        List of (page text, figure candidates), one per page in order
+    """
+    seen_xrefs = set()
+    with pymupdf.open(pdf_path) as doc:
+        return [processor._extract_page(doc, page_num, with_figures, seen_xrefs)
+                for page_num in range(start, stop)]
+
 
 class PDFProcessor:
     """Processes PDF files to extract structured content."""
@@ -59,7 +308,10 @@ class PDFProcessor:
     def __init__(self, extract_figures: bool = True,
                  extract_equations: bool = True,
                  extract_citations: bool = True,
-                 max_figures: int = 2):
+                 max_figures: int = 2,
+                 cache: Optional[ExtractionCache] = None,
+                 page_workers: Optional[int] = None,
+                 parallel_min_pages: int = 50):
         """Initialize PDF processor.
 
         Args:
@@ -67,127 +319,207 @@ class PDFProcessor:
             extract_equations: Whether to extract equations
             extract_citations: Whether to extract citations
             max_figures: Maximum number of figures to extract (default 2)
+            cache: Extraction cache to reuse results for unchanged PDFs (optional)
+            page_workers: Processes that extract pages of one PDF in parallel
+                (default: one per CPU core; 1 disables)
+            parallel_min_pages: Smallest PDF worth extracting in parallel
         """
         self.extract_figures = extract_figures
         self.extract_equations = extract_equations
         self.extract_citations = extract_citations
         self.max_figures = max_figures
+        self.cache = cache
+        self.page_workers = page_workers or os.cpu_count() or 1
+        self.parallel_min_pages = parallel_min_pages
 
-    def process(self, pdf_path: Path, output_dir: Path = None) -> PDFContent:
-        """Process a PDF file and extract all content.
+    def cache_options(self, output_dir: Path = None) -> Dict[str, Any]:
+        """Get the options that affect extracted content, for cache keys.
+
+        Args:
+            output_dir: Directory figures are saved to
+
+        Returns:
+            Dictionary of option names to values
+        """
+        return {
+            'extract_figures': self.extract_figures and output_dir is not None,
+            'extract_equations': self.extract_equations,
+            'extract_citations': self.extract_citations,
+            'max_figures': self.max_figures,
+            'min_image_size': (self.MIN_IMAGE_WIDTH, self.MIN_IMAGE_HEIGHT),
+            'output_dir': str(output_dir) if output_dir else None,
+        }
+
+    def process(self, pdf_path: Path, output_dir: Path = None,
+                digest: Optional[str] = None) -> PDFContent:
+        """Process a PDF file.
+
+        The returned content keeps the PDF open and extracts each field when
+        it is first read. The fields extracted by the time it is closed are
+        cached; a later cache hit extracts any missing fields from the PDF.
 
         Args:
             pdf_path: Path to the PDF file
             output_dir: Directory to save extracted figures (optional)
+            digest: SHA-256 of the PDF if already known, saving the cache
+                from hashing it again (optional)
 
         Returns:
-            Structured PDF content
+            Structured PDF content (close it when done)
         """
-        doc = pymupdf.open(pdf_path)
-
-        # Extract text and structure
-        full_text = self._extract_text(doc)
-        sections = self._extract_sections(full_text)
-
-        # Extract metadata
-        title, authors, abstract = self._extract_metadata(doc, full_text)
-
-        # Create content object
-        content = PDFContent(
-            title=title,
-            authors=authors,
-            abstract=abstract,
-            full_text=full_text,
-            sections=sections,
-            metadata={
-                'page_count': len(doc),
-                'pdf_metadata': doc.metadata,
-            }
-        )
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.key(pdf_path, self.cache_options(output_dir), digest)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                # Fields nobody read last time are extracted on demand
+                return self._attach(cached, pdf_path, output_dir, cache_key)
+
+        content = PDFContent.__new__(PDFContent)
+        content._source = _LazyExtraction(self, pdf_path, output_dir, cache_key)
+        return content
 
-        # Extract figures if enabled
-        if self.extract_figures and output_dir:
-            content.figures = self._extract_figures(doc, output_dir)
+    def attach(self, content: PDFContent, pdf_path: Path, output_dir: Path = None) -> PDFContent:
+        """Let partially extracted content (e.g. from a checkpoint) extract the rest.
 
-        # Extract equations if enabled
-        if self.extract_equations:
-            content.equations = self._extract_equations(full_text, doc)
+        The PDF is opened only if some field was never extracted.
 
-        # Extract citations if enabled
-        if self.extract_citations:
-            content.citations = self._extract_citations(full_text, doc)
+        Args:
+            content: Unpickled content
+            pdf_path: Path to the PDF file the content came from
+            output_dir: Directory to save extracted figures (optional)
+
+        Returns:
+            The content (close it when done)
+        """
+        return self._attach(content, pdf_path, output_dir, None)
 
-        doc.close()
+    def _attach(self, content: PDFContent, pdf_path: Path, output_dir: Optional[Path],
+                cache_key: Optional[str]) -> PDFContent:
+        """Back content missing some fields by the open PDF."""
+        if any(name not in content.__dict__ for name in _LazyExtraction.LOADERS):
+            content._source = _LazyExtraction(self, pdf_path, output_dir, cache_key)
         return content
 
-    def _extract_text(self, doc: pymupdf.Document) -> str:
-        """Extract all text from the document.
+    def _extract_pages(self, doc: pymupdf.Document, pdf_path: Path,
+                       with_figures: bool) -> List[Tuple[str, List[Dict[str, Any]]]]:
+        """Extract every page's text and figure candidates.
+
+        Long documents are split into page ranges extracted by a pool of
+        processes, each opening the PDF itself; results are merged back
+        in page order.
 
         Args:
             doc: PyMuPDF document
+            pdf_path: Path to the PDF file (opened by worker processes)
+            with_figures: Whether to collect figure candidates
 
         Returns:
-            Full text content
+            List of (page text, figure candidates), one per page in order
         """
-        text_parts = []
-        for page in doc:
-            text_parts.append(page.get_text())
-        return "\n".join(text_parts)
+        page_count = len(doc)
+        workers = min(self.page_workers, page_count)
+        if workers <= 1 or page_count < self.parallel_min_pages:
+            seen_xrefs = set()
+            return [self._extract_page(doc, page_num, with_figures, seen_xrefs)
+                    for page_num in range(page_count)]
+
+        # A few ranges per worker evens out pages that are slower than others
+        step = -(-page_count // (workers * 4))
+        ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_extract_page_range, self, pdf_path, start, stop, with_figures)
+                       for start, stop in ranges]
+            return [page for future in futures for page in future.result()]
+
+    def _extract_page(self, doc: pymupdf.Document, page_num: int, with_figures: bool,
+                      seen_xrefs: Optional[set] = None) -> Tuple[str, List[Dict[str, Any]]]:
+        """Extract one page's text and figure candidates.
 
-    def _extract_sections(self, text: str) -> Dict[str, str]:
-        """Extract sections from the text.
+        Args:
+            doc: PyMuPDF document
+            page_num: Page index (0-based)
+            with_figures: Whether to collect figure candidates
+            seen_xrefs: Images already considered on earlier pages; updated
+                with this page's images (optional)
+
+        Returns:
+            Tuple of (page text, figure candidates)
+        """
+        page = doc[page_num]
+        text = page.get_text()
+        candidates = []
+        if with_figures:
+            candidates = self._figure_candidates(page, page_num + 1,
+                                                 seen_xrefs if seen_xrefs is not None else set())
+        return text, candidates
+
+    @staticmethod
+    def _join_pages(page_texts: List[str]) -> Tuple[str, List[int]]:
+        """Join page texts into the full text.
 
         Args:
-            text: Full text content
+            page_texts: Text of each page, in order
 
         Returns:
-            Dictionary mapping section titles to content
+            Tuple of (full text content, offset in the text where each page
+            starts)
         """
-        sections = {}
+        page_starts = []
+        offset = 0
+        for text in page_texts:
+            page_starts.append(offset)
+            offset += len(text) + 1  # Pages are joined with a newline
+        return "\n".join(page_texts), page_starts
+
+    def _extract_sections(self, text: str, page_starts: List[int]
+                          ) -> Tuple[Dict[str, str], Dict[str, Tuple[int, int]]]:
+        """Extract sections from the text.
 
-        # Common academic paper sections
-        section_patterns = [
-            r'\n\s*(\d+\.?\s+)?Abstract\s*\n',
-            r'\n\s*(\d+\.?\s+)?Introduction\s*\n',
-            r'\n\s*(\d+\.?\s+)?Related Work\s*\n',
-            r'\n\s*(\d+\.?\s+)?Background\s*\n',
-            r'\n\s*(\d+\.?\s+)?Methodology\s*\n',
-            r'\n\s*(\d+\.?\s+)?Methods\s*\n',
-            r'\n\s*(\d+\.?\s+)?Experiments?\s*\n',
-            r'\n\s*(\d+\.?\s+)?Results\s*\n',
-            r'\n\s*(\d+\.?\s+)?Discussion\s*\n',
-            r'\n\s*(\d+\.?\s+)?Conclusion\s*\n',
-            r'\n\s*(\d+\.?\s+)?References\s*\n',
-        ]
-
-        # Find all section headers
-        section_matches = []
-        for pattern in section_patterns:
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                section_name = match.group(0).strip()
-                # Clean up section name
-                section_name = re.sub(r'^\d+\.?\s*', '', section_name)
-                section_matches.append((match.start(), section_name))
-
-        # Sort by position
-        section_matches.sort(key=lambda x: x[0])
-
-        # Extract section content
-        for i, (start, name) in enumerate(section_matches):
-            if i < len(section_matches) - 1:
-                end = section_matches[i + 1][0]
-                sections[name] = text[start:end].strip()
-            else:
-                sections[name] = text[start:].strip()
+        Headings are found in a single pass of one precompiled pattern.
+        A heading that repeats (e.g. a second "Results" in an appendix)
+        gets a numbered key such as "Results (2)" instead of replacing the
+        first.
 
-        return sections
+        Args:
+            text: Full text content
+            page_starts: Offset where each page starts in the text
 
-    def _extract_metadata(self, doc: pymupdf.Document, text: str) -> Tuple[str, List[str], str]:
+        Returns:
+            Tuple of (section titles to content, section titles to
+            (first page, last page)), both in document order
+        """
+        sections = {}
+        pages = {}
+
+        matches = list(SECTION_HEADING_RE.finditer(text))
+        for i, match in enumerate(matches):
+            start = match.start()
+            end = matches[i + 1].start() if i < len(matches) - 1 else len(text)
+
+            name = match.group(1)
+            key = name
+            n = 1
+            while key in sections:
+                n += 1
+                key = f"{name} ({n})"
+
+            sections[key] = text[start:end].strip()
+            # The match starts at the newline before the heading, which may
+            # be the end of the previous page
+            pages[key] = (self._find_page_number(page_starts, match.start(1)),
+                          self._find_page_number(page_starts, max(start, end - 1)))
+
+        return sections, pages
+
+    def _extract_metadata(self, doc: pymupdf.Document, text: str,
+                          page_starts: List[int]) -> Tuple[str, List[str], str]:
         """Extract title, authors, and abstract from the document.
 
         Args:
             doc: PyMuPDF document
             text: Full text content
+            page_starts: Offset where each page starts in the text
 
         Returns:
             Tuple of (title, authors, abstract)
@@ -197,7 +529,8 @@ class PDFProcessor:
 
         # If not in metadata, try to extract from first page
         if not title:
-            first_page_text = doc[0].get_text()
+            first_page_end = page_starts[1] - 1 if len(page_starts) > 1 else len(text)
+            first_page_text = text[:first_page_end]
             lines = first_page_text.split('\n')
             # Assume title is one of the first few non-empty lines
             for line in lines[:10]:
@@ -223,77 +556,176 @@ class PDFProcessor:
 
         return title, authors, abstract
 
-    def _extract_figures(self, doc: pymupdf.Document, output_dir: Path) -> List[Figure]:
-        """Extract figures and diagrams from the document.
+    def _figure_candidates(self, page: pymupdf.Page, page_num: int,
+                           seen_xrefs: set) -> List[Dict[str, Any]]:
+        """Collect a page's images that could be figures.
 
-        Filters out small images (icons, logos) and limits to max_figures.
-        Prioritizes images with captions and larger dimensions.
+        Filters out small images (icons, logos) and images already seen on
+        an earlier page, and scores the rest, preferring images with
+        captions and larger dimensions. Sizes come from the page's image
+        list, so no image data is read here.
+
+        Args:
+            page: Page to collect images from
+            page_num: Page number (1-indexed)
+            seen_xrefs: Images already considered; updated in place
+
+        Returns:
+            List of candidate dicts with xref, size, caption, page and
+            priority
+        """
+        candidates = []
+        captions = None  # Built on the first image that needs one
+
+        # Get images from the page: (xref, smask, width, height, ...)
+        for img in page.get_images(full=True):
+            xref, width, height = img[0], img[2], img[3]
+
+            # The same image repeated across pages (logos, shared panels)
+            # is only considered where it first appears
+            if xref in seen_xrefs:
+                continue
+            seen_xrefs.add(xref)
+
+            # Skip small images (icons, logos, decorations)
+            if width < self.MIN_IMAGE_WIDTH or height < self.MIN_IMAGE_HEIGHT:
+                continue
+
+            # Find the caption laid out closest to where the image is drawn
+            if captions is None:
+                captions = self._caption_index(page)
+            caption = self._find_figure_caption(captions, page.get_image_bbox(img))
+
+            # Calculate priority score (prefer larger images with captions)
+            area = width * height
+            has_caption = 1 if caption else 0
+            priority_score = area + (has_caption * 500000)  # Bonus for having caption
+
+            candidates.append({
+                "xref": xref,
+                "width": width,
+                "height": height,
+                "caption": caption,
+                "page": page_num,
+                "priority": priority_score
+            })
+
+        return candidates
+
+    @staticmethod
+    def _caption_index(page: pymupdf.Page) -> List[Tuple[pymupdf.Rect, str]]:
+        """Find the figure captions on a page.
+
+        Args:
+            page: Page to search
+
+        Returns:
+            List of (caption block rectangle, caption text without its label)
+        """
+        captions = []
+        for x0, y0, x1, y1, text, _, block_type in page.get_text("blocks"):
+            if block_type != 0:  # Image block
+                continue
+            match = FIGURE_CAPTION_RE.match(text)
+            if match:
+                # Rejoin words hyphenated across lines, then unwrap the rest
+                caption = re.sub(r'-\s*\n\s*', '-', match.group(1))
+                captions.append((pymupdf.Rect(x0, y0, x1, y1), ' '.join(caption.split())))
+        return captions
+
+    @staticmethod
+    def _find_figure_caption(captions: List[Tuple[pymupdf.Rect, str]],
+                             rect: pymupdf.Rect) -> str:
+        """Find the caption nearest to an image.
+
+        A caption must overlap the image horizontally and sit within
+        MAX_CAPTION_GAP points below it (or above it, counted as further).
+
+        Args:
+            captions: Captions on the page, from ``_caption_index``
+            rect: Where the image is drawn on the page
+
+        Returns:
+            Caption text if found, empty string otherwise
+        """
+        best_caption, best_gap = "", 0.0
+        if rect.is_infinite or rect.is_empty:  # Placement unknown
+            return best_caption
+        for caption_rect, caption in captions:
+            if min(rect.x1, caption_rect.x1) <= max(rect.x0, caption_rect.x0):
+                continue  # No horizontal overlap
+            if caption_rect.y0 >= rect.y1 - 1:
+                gap = caption_rect.y0 - rect.y1
+            elif caption_rect.y1 <= rect.y0 + 1:
+                gap = (rect.y0 - caption_rect.y1) * CAPTION_ABOVE_PENALTY
+            else:
+                continue  # Overlaps the image vertically
+            if gap <= MAX_CAPTION_GAP and (not best_caption or gap < best_gap):
+                best_caption, best_gap = caption, gap
+        return best_caption
+
+    def _select_figures(self, candidates: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Pick the highest-priority candidates in one pass.
+
+        Keeps a min-heap of at most max_figures candidates, so memory does
+        not grow with the number of images in the PDF. Ties go to the
+        earlier image, and an image repeated across pages extracted in
+        separate processes is only considered once.
+
+        Args:
+            candidates: Figure candidates in document order
+
+        Returns:
+            Selected candidates, highest priority first
+        """
+        if self.max_figures <= 0:
+            return []
+        heap: List[Tuple[int, int, Dict[str, Any]]] = []
+        seen_xrefs = set()
+        for order, candidate in enumerate(candidates):
+            if candidate["xref"] in seen_xrefs:
+                continue
+            seen_xrefs.add(candidate["xref"])
+            entry = (candidate["priority"], -order, candidate)
+            if len(heap) < self.max_figures:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+        return [candidate for *_, candidate in sorted(heap, key=lambda e: e[:2], reverse=True)]
+
+    def _save_figures(self, doc: pymupdf.Document, candidates: Iterable[Dict[str, Any]],
+                      output_dir: Path) -> List[Figure]:
+        """Save the highest-priority figure candidates.
+
+        Image data is only extracted (by xref) for the selected candidates.
 
         Args:
             doc: PyMuPDF document
+            candidates: Figure candidates from every page, in document order
             output_dir: Directory to save extracted images
 
         Returns:
             List of extracted figures (up to max_figures)
         """
-        candidates = []
         output_dir.mkdir(parents=True, exist_ok=True)
-
-        for page_num, page in enumerate(doc, start=1):
-            # Get images from the page
-            image_list = page.get_images()
-
-            for img_index, img in enumerate(image_list):
-                xref = img[0]
-
-                try:
-                    # Extract image
-                    base_image = doc.extract_image(xref)
-                    image_bytes = base_image["image"]
-                    image_ext = base_image["ext"]
-                    width = base_image.get("width", 0)
-                    height = base_image.get("height", 0)
-
-                    # Skip small images (icons, logos, decorations)
-                    if width < self.MIN_IMAGE_WIDTH or height < self.MIN_IMAGE_HEIGHT:
-                        continue
-
-                    # Try to find caption
-                    caption = self._find_figure_caption(page.get_text(), img_index + 1)
-
-                    # Calculate priority score (prefer larger images with captions)
-                    area = width * height
-                    has_caption = 1 if caption else 0
-                    priority_score = area + (has_caption * 500000)  # Bonus for having caption
-
-                    candidates.append({
-                        "image_bytes": image_bytes,
-                        "image_ext": image_ext,
-                        "width": width,
-                        "height": height,
-                        "caption": caption,
-                        "page": page_num,
-                        "priority": priority_score
-                    })
-                except Exception:
-                    # Skip images that can't be extracted
-                    continue
-
-        # Sort by priority (highest first) and take top max_figures
-        candidates.sort(key=lambda x: x["priority"], reverse=True)
-        selected = candidates[:self.max_figures]
+        selected = self._select_figures(candidates)
 
         # Save selected figures
         figures = []
-        for i, candidate in enumerate(selected, start=1):
-            image_filename = f"figure_{i}.{candidate['image_ext']}"
-            image_path = output_dir / image_filename
-
-            with open(image_path, "wb") as img_file:
-                img_file.write(candidate["image_bytes"])
+        for candidate in selected:
+            try:
+                base_image = doc.extract_image(candidate["xref"])
+            except Exception as e:
+                logger.warning(f"Skipping figure on page {candidate['page']}: {e}")
+                continue
+            if not base_image:
+                continue
+
+            # Named by content, so papers never overwrite each other's figures
+            image_path = store_attachment(output_dir, base_image["image"], base_image["ext"])
 
             figures.append(Figure(
-                number=i,
+                number=len(figures) + 1,
                 caption=candidate["caption"],
                 image_path=image_path,
                 page=candidate["page"],
@@ -303,30 +735,12 @@ class PDFProcessor:
 
         return figures
 
-    def _find_figure_caption(self, page_text: str, fig_num: int) -> str:
-        """Find caption for a figure.
-
-        Args:
-            page_text: Text from the page
-            fig_num: Figure number on the page
-
-        Returns:
-            Caption text if found, empty string otherwise
-        """
-        # Look for "Figure X:" or "Fig X:" patterns
-        caption_pattern = rf'(?:Figure|Fig\.?)\s*{fig_num}[:\s]+(.*?)(?:\n\n|\n(?:Figure|Fig\.?)\s*\d+)'
-        match = re.search(caption_pattern, page_text, re.IGNORECASE | re.DOTALL)
-
-        if match:
-            return match.group(1).strip()
-        return ""
-
-    def _extract_equations(self, text: str, doc: pymupdf.Document) -> List[Equation]:
+    def _extract_equations(self, text: str, page_starts: List[int]) -> List[Equation]:
         """Extract equations from the document.
 
         Args:
             text: Full text content
-            doc: PyMuPDF document
+            page_starts: Offset where each page starts in the text
 
         Returns:
             List of extracted equations
@@ -338,7 +752,7 @@ class PDFProcessor:
         for match in re.finditer(r'\$\$(.*?)\$\$', text, re.DOTALL):
             latex = match.group(1).strip()
             context = self._get_context(text, match.start(), match.end())
-            page = self._find_page_number(doc, match.start(), text)
+            page = self._find_page_number(page_starts, match.start())
 
             equations.append(Equation(
                 latex=latex,
@@ -352,7 +766,7 @@ class PDFProcessor:
             # Skip if it's just a dollar amount
             if not re.match(r'^\d+(?:\.\d+)?$', latex):
                 context = self._get_context(text, match.start(), match.end())
-                page = self._find_page_number(doc, match.start(), text)
+                page = self._find_page_number(page_starts, match.start())
 
                 equations.append(Equation(
                     latex=latex,
@@ -362,12 +776,12 @@ class PDFProcessor:
 
         return equations
 
-    def _extract_citations(self, text: str, doc: pymupdf.Document) -> List[Citation]:
+    def _extract_citations(self, text: str, page_starts: List[int]) -> List[Citation]:
         """Extract citations from the document.
 
         Args:
             text: Full text content
-            doc: PyMuPDF document
+            page_starts: Offset where each page starts in the text
 
         Returns:
             List of extracted citations
@@ -378,7 +792,7 @@ class PDFProcessor:
         for match in re.finditer(r'\[([A-Z][a-z]+(?:\s+et\s+al\.?)?,\s*\d{4})\]', text):
             citation_text = match.group(1)
             context = self._get_context(text, match.start(), match.end())
-            page = self._find_page_number(doc, match.start(), text)
+            page = self._find_page_number(page_starts, match.start())
 
             citations.append(Citation(
                 text=citation_text,
@@ -390,7 +804,7 @@ class PDFProcessor:
         for match in re.finditer(r'\[(\d+)\]', text):
             citation_text = match.group(1)
             context = self._get_context(text, match.start(), match.end())
-            page = self._find_page_number(doc, match.start(), text)
+            page = self._find_page_number(page_starts, match.start())
 
             citations.append(Citation(
                 text=f"[{citation_text}]",
@@ -416,18 +830,14 @@ class PDFProcessor:
         context_end = min(len(text), end + window)
         return text[context_start:context_end].strip()
 
-    def _find_page_number(self, doc: pymupdf.Document, position: int, full_text: str) -> int:
-        """Find which page a text position corresponds to.
+    def _find_page_number(self, page_starts: List[int], position: int) -> int:
+        """Find which page a text position falls on.
 
         Args:
-            doc: PyMuPDF document
+            page_starts: Offset where each page starts in the full text
             position: Character position in full text
-            full_text: Full text content
 
         Returns:
             Page number (1-indexed)
         """
-        # Simple approximation: divide position by average chars per page
-        avg_chars_per_page = len(full_text) / len(doc)
-        page = int(position / avg_chars_per_page) + 1
-        return min(page, len(doc))
+        return max(1, bisect.bisect_right(page_starts, position))
@@ -2,39 +2,72 @@
 
 import logging
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, Callable
 from .config import Config
 from .pdf_processor import PDFProcessor, PDFContent
 from .llm import OllamaClient, create_reasoning_client
 from .obsidian import ObsidianFormatter
 from .vault import VaultReader
+from .attachments import AttachmentIndex
+from .retrieval import NoteRetriever
+from .batch import BatchProcessor
+from .scheduler import StepScheduler
+from .cache import ExtractionCache, create_response_cache
+from .checkpoint import CheckpointStore, PaperCheckpoint
+from .ledger import PaperLedger
+from .deferred import DeferredBatch, DeferredJobStore, create_batch_backend
 
 logger = logging.getLogger(__name__)
 
 
 class HedorahPipeline:
-    """Main pipeline for processing research papers."""
+    """Main pipeline for processing research papers.
 
-    def __init__(self, config: Config):
+    Close it (or use it as a context manager) to stop the model clients.
+    """
+
+    def __init__(self, config: Config, use_cache: bool = True):
         """Initialize the pipeline.
 
         Args:
             config: Hedorah configuration
+            use_cache: Reuse cached results from previous runs (``--no-cache``
+                disables this for a single run)
         """
         self.config = config
+        self.use_cache = use_cache and config.get('cache.enabled', True)
 
         # Initialize components
         self.pdf_processor = PDFProcessor(
             extract_figures=config.get('processing.extract_figures', True),
             extract_equations=config.get('processing.extract_equations', True),
             extract_citations=config.get('processing.extract_citations', True),
-            max_figures=config.get('processing.max_figures', 2)
+            max_figures=config.get('processing.max_figures', 2),
+            cache=self._create_extraction_cache(),
+            page_workers=config.get('processing.page_workers'),
+            parallel_min_pages=config.get('processing.parallel_min_pages', 50)
         )
 
-        self.ollama = OllamaClient(config)
-        self.reasoning_client = create_reasoning_client(config)
+        self.response_cache = create_response_cache(config) if self.use_cache else None
+        self.ollama = OllamaClient(config, cache=self.response_cache)
+        self.reasoning_client = create_reasoning_client(config, cache=self.response_cache)
+        self.checkpoints = self._create_checkpoint_store()
+        self.ledger = PaperLedger(config.state_dir / 'ledger.db')
         self.formatter = ObsidianFormatter(config.vault_path)
-        self.vault_reader = VaultReader(config.vault_path)
+        self.attachments = AttachmentIndex(config.state_dir / 'attachments.db',
+                                           config.get_vault_folder('attachments'),
+                                           config.vault_path)
+        self.vault_reader = VaultReader(config.vault_path, config.state_dir / 'vault.db')
+        self.note_retriever = NoteRetriever(
+            self.vault_reader,
+            config.get_vault_folder('notes'),
+            method=config.get('notes.retrieval', 'bm25'),
+            top_k=config.get('notes.top_k', 8),
+            token_budget=config.get('notes.token_budget', 6000),
+            ollama=self.ollama,
+            embedding_model=config.get('notes.embedding_model'),
+            embedding_batch_size=config.get('notes.embedding_batch_size', 32)
+        )
 
         # Load research agenda
         self.agenda = self._load_agenda()
@@ -56,79 +89,411 @@ class HedorahPipeline:
             ]
         )
 
-    def process_paper(self, pdf_path: Path, skip_experiments: bool = False) -> Dict[str, Path]:
+    def _create_extraction_cache(self) -> Optional[ExtractionCache]:
+        """Create the PDF extraction cache, unless caching is disabled.
+
+        Returns:
+            ExtractionCache or None
+        """
+        if not self.use_cache:
+            return None
+        max_mb = self.config.get('cache.extraction_max_mb', 500)
+        return ExtractionCache(self.config.cache_dir / 'extraction', max_bytes=max_mb * 1024 * 1024)
+
+    def _create_checkpoint_store(self) -> Optional[CheckpointStore]:
+        """Create the per-paper checkpoint store, unless disabled in config.
+
+        Returns:
+            CheckpointStore or None
+        """
+        if not self.config.get('checkpoints.enabled', True):
+            return None
+        return CheckpointStore(self.config.state_dir / 'work')
+
+    def process_paper(self, pdf_path: Path, skip_experiments: bool = False,
+                      force: bool = False) -> Dict[str, Path]:
         """Process a research paper through the full pipeline.
 
+        Papers already recorded as done in the ledger are skipped. Each
+        stage's output is checkpointed, so a rerun after a failure or
+        interruption resumes from the last completed stage.
+
         Args:
             pdf_path: Path to the PDF file
             skip_experiments: Skip experiment generation (faster)
+            force: Reprocess even if the ledger says the paper is done
 
         Returns:
             Dictionary mapping note types to their file paths
         """
+        pdf_digest = self.ledger.digest(pdf_path)
+
+        if not force:
+            entry = self.ledger.get(pdf_digest)
+            if entry and entry['status'] == 'done':
+                logger.info(f"Skipping {pdf_path.name}: already processed on "
+                            f"{entry['updated'][:10]} (use --force to redo)")
+                return entry['notes']
+
         logger.info(f"Processing paper: {pdf_path.name}")
 
-        # 1. Extract content from PDF
+        checkpoint = None
+        if self.checkpoints:
+            checkpoint = self.checkpoints.for_paper(pdf_path, skip_experiments, pdf_digest)
+
+        return self._run_steps(pdf_path, pdf_digest, skip_experiments, checkpoint)
+
+    def is_processed(self, pdf_path: Path) -> bool:
+        """Check the ledger for a successfully processed PDF.
+
+        Args:
+            pdf_path: Path to the PDF file
+
+        Returns:
+            True if this PDF's content was already processed
+        """
+        return self.ledger.is_done(self.ledger.digest(pdf_path))
+
+    def close(self) -> None:
+        """Stop the model clients' worker threads and close their connections."""
+        self.ollama.close()
+        self.reasoning_client.close()
+
+    def __enter__(self) -> "HedorahPipeline":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @property
+    def model_versions(self) -> Dict[str, str]:
+        """Get the models used by this pipeline, by role."""
+        provider = self.config.get('llm.reasoning.provider', 'anthropic')
+        return {
+            'local': self.config.local_model,
+            'reasoning': f"{provider}/{self.config.reasoning_model}",
+        }
+
+    def resume_paper(self, checkpoint: PaperCheckpoint) -> Dict[str, Path]:
+        """Finish a partially processed paper from its checkpoint.
+
+        Args:
+            checkpoint: Checkpoint left behind by an interrupted run
+
+        Returns:
+            Dictionary mapping note types to their file paths
+        """
+        pdf_path = checkpoint.pdf_path
+        logger.info(f"Resuming paper: {pdf_path.name} "
+                    f"(completed: {', '.join(checkpoint.completed_stages()) or 'none'})")
+
+        if not checkpoint.has('content') and not pdf_path.exists():
+            raise FileNotFoundError(f"PDF no longer exists and was never extracted: {pdf_path}")
+
+        pdf_digest = checkpoint.manifest.get('pdf_digest') or self.ledger.digest(pdf_path)
+        return self._run_steps(pdf_path, pdf_digest, checkpoint.skip_experiments, checkpoint)
+
+    def resume_all(self) -> Dict[str, Dict[str, Path]]:
+        """Finish every partially processed paper in the vault.
+
+        Returns:
+            Dictionary mapping PDF names to their created notes
+        """
+        if not self.checkpoints:
+            return {}
+
+        # Papers waiting on a deferred batch job finish when its results land
+        deferred = DeferredJobStore(self.config.state_dir / 'deferred.json').pending_digests()
+        pending = [c for c in self.checkpoints.pending()
+                   if c.manifest.get('pdf_digest') not in deferred]
+        logger.info(f"Found {len(pending)} partially processed papers")
+
+        results = {}
+        for checkpoint in pending:
+            pdf_name = checkpoint.pdf_path.name
+            try:
+                results[pdf_name] = self.resume_paper(checkpoint)
+            except Exception as e:
+                logger.error(f"Error resuming {pdf_name}: {e}", exc_info=True)
+                results[pdf_name] = {"error": str(e)}
+
+        return results
+
+    def _run_steps(self, pdf_path: Path, pdf_digest: str, skip_experiments: bool,
+                   checkpoint: Optional[PaperCheckpoint]) -> Dict[str, Path]:
+        """Run the per-paper step graph, checkpointing each stage.
+
+        Args:
+            pdf_path: Path to the PDF file
+            pdf_digest: Content hash of the PDF (ledger key)
+            skip_experiments: Skip experiment generation
+            checkpoint: Checkpoint to load from and save to (optional)
+
+        Returns:
+            Dictionary mapping note types to their file paths
+        """
+        # Steps only wait on the results they use, so figure descriptions,
+        # the summary and ranking vault notes overlap instead of running
+        # back to back.
+        opened = []
+
+        def content_step() -> PDFContent:
+            content = self._open_content(pdf_path, checkpoint, pdf_digest)
+            opened.append(content)
+            return content
+
+        scheduler = StepScheduler()
+        scheduler.add_step('content', content_step)
+        scheduler.add_step('figures', lambda content: self._describe_figures_checkpointed(
+            content, checkpoint), depends_on=['content'])
+        scheduler.add_step('summary', lambda content: self._checkpointed(
+            checkpoint, 'summary', lambda: self.summarize(content)), depends_on=['content'])
+        scheduler.add_step('user_notes', self._read_user_notes, depends_on=['content', 'summary'])
+        scheduler.add_step('analysis', lambda content, summary, user_notes: self._checkpointed(
+            checkpoint, 'analysis', lambda: self.analyze(content, summary, user_notes)),
+            depends_on=['content', 'summary', 'user_notes'])
+        scheduler.add_step('experiments', lambda content, analysis: self._checkpointed(
+            checkpoint, 'experiments',
+            lambda: self.generate_experiments(content, analysis, skip_experiments)),
+            depends_on=['content', 'analysis'])
+        scheduler.add_step(
+            'notes',
+            lambda content, figures, summary, analysis, experiments:
+                self._create_notes(content, summary, analysis, experiments),
+            depends_on=['content', 'figures', 'summary', 'analysis', 'experiments']
+        )
+        self.ledger.mark_started(pdf_digest, pdf_path)
+        created_notes = None
+        try:
+            created_notes = scheduler.run()['notes']
+        except Exception as e:
+            self.ledger.mark_failed(pdf_digest, pdf_path, str(e))
+            raise
+        finally:
+            for content in opened:
+                if checkpoint and created_notes is None:
+                    # Keep whatever was extracted for the resumed run
+                    checkpoint.save('content', content)
+                content.close()
+
+        if checkpoint:
+            checkpoint.complete()
+        self.ledger.mark_done(
+            pdf_digest, pdf_path, created_notes,
+            timings={name: t.duration for name, t in scheduler.timings.items()},
+            models=self.model_versions
+        )
+
+        logger.info(f"Successfully processed {pdf_path.name}")
+        logger.info(f"Created {len(created_notes)} notes in vault")
+        logger.info(f"Step timings: {scheduler.format_timings()}")
+        if self.response_cache:
+            logger.info(f"LLM response cache: {self.response_cache.format_stats()}")
+        logger.info(f"Reasoning input tokens: {self.reasoning_client.usage.format()}")
+
+        return created_notes
+
+    def _open_content(self, pdf_path: Path, checkpoint: Optional[PaperCheckpoint] = None,
+                      pdf_digest: Optional[str] = None) -> PDFContent:
+        """Extract a paper's content, or pick up its checkpointed content.
+
+        Checkpointed content holds only the fields read before it was saved;
+        the PDF is opened again for the rest when they are first read.
+
+        Args:
+            pdf_path: Path to the PDF file
+            checkpoint: Paper checkpoint (None to always extract)
+            pdf_digest: Content hash of the PDF, if already known (optional)
+
+        Returns:
+            Extracted PDF content (close it when done)
+        """
+        if checkpoint and checkpoint.has('content'):
+            logger.info("Using checkpointed content")
+            return self.pdf_processor.attach(checkpoint.load('content'), pdf_path,
+                                             self.config.get_vault_folder('attachments'))
+
+        content = self.extract_content(pdf_path, pdf_digest)
+        if checkpoint:
+            checkpoint.save('content', content)
+        return content
+
+    def _checkpointed(self, checkpoint: Optional[PaperCheckpoint], stage: str,
+                      func: Callable[[], Any]) -> Any:
+        """Run a stage, or load its output if it was already checkpointed.
+
+        Args:
+            checkpoint: Paper checkpoint (None to always run)
+            stage: Stage name
+            func: Function producing the stage output
+
+        Returns:
+            Stage output
+        """
+        if checkpoint and checkpoint.has(stage):
+            logger.info(f"Using checkpointed {stage}")
+            return checkpoint.load(stage)
+
+        result = func()
+        if checkpoint:
+            checkpoint.save(stage, result)
+        return result
+
+    def _describe_figures_checkpointed(self, content: PDFContent,
+                                       checkpoint: Optional[PaperCheckpoint]) -> None:
+        """Describe figures, restoring checkpointed descriptions if present."""
+        def describe() -> List[str]:
+            self.describe_figures(content)
+            return [fig.description for fig in content.figures]
+
+        descriptions = self._checkpointed(checkpoint, 'figures', describe)
+        for fig, description in zip(content.figures, descriptions):
+            fig.description = description
+
+    def extract_content(self, pdf_path: Path, pdf_digest: Optional[str] = None) -> PDFContent:
+        """Extract content from a PDF (pipeline step 1).
+
+        Args:
+            pdf_path: Path to the PDF file
+            pdf_digest: Content hash of the PDF, if already known (optional)
+
+        Returns:
+            Extracted PDF content (lazy; the caller closes it)
+        """
         logger.info("Step 1/5: Extracting content from PDF...")
         attachments_dir = self.config.get_vault_folder('attachments')
-        content = self.pdf_processor.process(pdf_path, attachments_dir)
+        content = self.pdf_processor.process(pdf_path, attachments_dir, pdf_digest)
 
-        logger.info(f"Extracted {len(content.figures)} figures, "
-                   f"{len(content.equations)} equations, "
-                   f"{len(content.citations)} citations")
+        # Fields are extracted as later steps read them
+        logger.info(f"Opened {content.metadata['page_count']}-page PDF")
+        return content
 
-        # 1b. Generate descriptions for figures using local LLM
-        if content.figures:
-            logger.info("Step 1b: Generating figure descriptions...")
-            figure_descriptions = self.ollama.generate_figure_descriptions(
-                content.title,
-                content.abstract,
-                content.figures,
-                max_figures=self.config.get('processing.max_figures', 2)
-            )
-            # Update figures with descriptions
-            for fig_desc in figure_descriptions:
-                fig_num = fig_desc.get("figure_number", 0) - 1
-                if 0 <= fig_num < len(content.figures):
-                    desc = fig_desc.get("description", "")
-                    importance = fig_desc.get("importance", "")
-                    content.figures[fig_num].description = f"{desc} {importance}".strip()
-
-        # 2. Generate summary with local model
+    def describe_figures(self, content: PDFContent) -> None:
+        """Generate figure descriptions with the local model.
+
+        Descriptions are written back onto ``content.figures``.
+
+        Args:
+            content: Extracted PDF content
+        """
+        if not content.figures:
+            return
+
+        logger.info("Step 1b: Generating figure descriptions...")
+        figure_descriptions = self.ollama.generate_figure_descriptions(
+            content.title,
+            content.abstract,
+            content.figures,
+            max_figures=self.config.get('processing.max_figures', 2)
+        )
+        # Update figures with descriptions
+        for fig_desc in figure_descriptions:
+            fig_num = fig_desc.get("figure_number", 0) - 1
+            if 0 <= fig_num < len(content.figures):
+                desc = fig_desc.get("description", "")
+                importance = fig_desc.get("importance", "")
+                content.figures[fig_num].description = f"{desc} {importance}".strip()
+
+    def summarize(self, content: PDFContent) -> Dict[str, Any]:
+        """Generate a structured summary with the local model (step 2).
+
+        Args:
+            content: Extracted PDF content
+
+        Returns:
+            Structured summary
+        """
         logger.info("Step 2/5: Generating summary with local model (Qwen)...")
         summary = self.ollama.summarize_paper(content)
         logger.info(f"Generated summary with {len(summary.get('tags', []))} tags")
+        return summary
+
+    def analyze(self, content: PDFContent, summary: Dict[str, Any],
+                user_notes: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Perform deep analysis with the reasoning model (step 3).
 
-        # 2b. Read user notes from vault
-        user_notes = self._read_user_notes()
+        Args:
+            content: Extracted PDF content
+            summary: Summary from the local model
+            user_notes: User notes from the vault
+
+        Returns:
+            Deep analysis with insights and connections
+        """
         if user_notes:
             logger.info(f"Found {len(user_notes)} user notes to incorporate")
 
-        # 3. Deep analysis with Claude
         logger.info("Step 3/5: Performing deep analysis with Claude...")
         analysis = self.reasoning_client.analyze_paper(content, summary, user_notes, self.agenda)
         logger.info(f"Identified {len(analysis.get('key_insights', []))} insights, "
                    f"{len(analysis.get('research_gaps', []))} research gaps")
         if analysis.get('note_connections'):
             logger.info(f"Found {len(analysis.get('note_connections', []))} connections to your notes")
+        return analysis
 
-        # 4. Generate experiment proposals (optional)
-        experiments = []
-        if not skip_experiments:
-            logger.info("Step 4/5: Generating experiment proposals...")
-            experiments = self.reasoning_client.generate_experiments(content, analysis, self.agenda)
-            logger.info(f"Generated {len(experiments)} experiment proposals")
-        else:
+    def generate_experiments(self, content: PDFContent, analysis: Dict[str, Any],
+                             skip_experiments: bool = False) -> List[Dict[str, Any]]:
+        """Generate experiment proposals with the reasoning model (step 4).
+
+        Args:
+            content: Extracted PDF content
+            analysis: Deep analysis results
+            skip_experiments: Skip experiment generation
+
+        Returns:
+            List of experiment proposals (empty when skipped)
+        """
+        if skip_experiments:
             logger.info("Step 4/5: Skipping experiment generation")
+            return []
 
-        # 5. Create Obsidian notes
-        logger.info("Step 5/5: Creating Obsidian notes...")
-        created_notes = self._create_notes(content, summary, analysis, experiments)
+        logger.info("Step 4/5: Generating experiment proposals...")
+        experiments = self.reasoning_client.generate_experiments(content, analysis, self.agenda)
+        logger.info(f"Generated {len(experiments)} experiment proposals")
+        return experiments
 
-        logger.info(f"Successfully processed {pdf_path.name}")
-        logger.info(f"Created {len(created_notes)} notes in vault")
+    def run_local_stage(self, content: PDFContent,
+                        checkpoint: Optional[PaperCheckpoint] = None) -> Dict[str, Any]:
+        """Run the local-model steps: figure descriptions and summary.
 
-        return created_notes
+        Used by the batch engine, where each stage has its own worker pool.
+
+        Args:
+            content: Extracted PDF content
+            checkpoint: Paper checkpoint to load from and save to (optional)
+
+        Returns:
+            Structured summary from the local model
+        """
+        self._describe_figures_checkpointed(content, checkpoint)
+        return self._checkpointed(checkpoint, 'summary', lambda: self.summarize(content))
+
+    def run_reasoning_stage(self, content: PDFContent, summary: Dict[str, Any],
+                            skip_experiments: bool = False,
+                            checkpoint: Optional[PaperCheckpoint] = None
+                            ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Run the reasoning-model steps: deep analysis and experiments.
+
+        Used by the batch engine, where each stage has its own worker pool.
+
+        Args:
+            content: Extracted PDF content
+            summary: Summary from the local model
+            skip_experiments: Skip experiment generation
+            checkpoint: Paper checkpoint to load from and save to (optional)
+
+        Returns:
+            Tuple of (analysis, experiments)
+        """
+        analysis = self._checkpointed(
+            checkpoint, 'analysis',
+            lambda: self.analyze(content, summary, self._read_user_notes(content, summary))
+        )
+        experiments = self._checkpointed(
+            checkpoint, 'experiments',
+            lambda: self.generate_experiments(content, analysis, skip_experiments)
+        )
+        return analysis, experiments
 
     def _create_notes(self, content: PDFContent, summary: Dict[str, Any],
                      analysis: Dict[str, Any], experiments: list) -> Dict[str, Path]:
@@ -155,6 +520,7 @@ class HedorahPipeline:
         paper_note_path = papers_dir / f"{safe_title}.md"
         paper_note = self.formatter.create_paper_note(content, summary)
         paper_note_path.write_text(paper_note, encoding='utf-8')
+        self.attachments.set_refs(paper_note_path, [fig.image_path for fig in content.figures])
         created_notes['paper'] = paper_note_path
         logger.info(f"Created paper note: {paper_note_path.name}")
 
@@ -221,22 +587,27 @@ class HedorahPipeline:
             logger.info(f"Loaded research agenda from {agenda_path}")
         return agenda
 
-    def _read_user_notes(self) -> List[Dict[str, str]]:
-        """Read user notes from the vault's notes folder.
+    def _read_user_notes(self, content: PDFContent,
+                         summary: Dict[str, Any]) -> List[Dict[str, str]]:
+        """Find the user notes most relevant to a paper.
+
+        Notes are ranked against the paper's title, abstract and summary
+        tags, and the top ``notes.top_k`` within ``notes.token_budget``
+        tokens are returned.
+
+        Args:
+            content: Extracted PDF content
+            summary: Summary from the local model
 
         Returns:
-            List of user notes with title and content
+            List of user notes with title and content, most relevant first
         """
-        notes_dir = self.config.get_vault_folder('notes')
-
-        if not notes_dir.exists():
+        if not self.note_retriever.notes_dir.exists():
             return []
 
-        # Read recent notes (last 30 days, up to 20 notes)
-        notes = self.vault_reader.get_recent_notes(notes_dir, days=30)
-
-        # Limit to most recent 20 to avoid context bloat
-        return notes[:20]
+        tags = ' '.join(str(tag) for tag in summary.get('tags', []))
+        query = '\n'.join([content.title, content.abstract, tags])
+        return self.note_retriever.retrieve(query)
 
     def _sanitize_filename(self, text: str) -> str:
         """Sanitize text for use as filename.
@@ -255,25 +626,31 @@ class HedorahPipeline:
         # Limit length
         return text[:100]
 
-    def process_directory(self, directory: Path, skip_experiments: bool = False) -> Dict[str, Dict[str, Path]]:
+    def process_directory(self, directory: Path, skip_experiments: bool = False,
+                          workers: int = 1, force: bool = False) -> Dict[str, Dict[str, Path]]:
         """Process all PDFs in a directory.
 
         Args:
             directory: Directory containing PDFs
             skip_experiments: Skip experiment generation
+            workers: Concurrent papers per LLM stage; above 1 the concurrent
+                batch engine is used (see ``create_batch_processor``)
+            force: Reprocess papers the ledger says are done
 
         Returns:
             Dictionary mapping PDF names to their created notes
         """
-        results = {}
-
         pdf_files = list(directory.glob("*.pdf"))
         logger.info(f"Found {len(pdf_files)} PDF files in {directory}")
 
+        if workers > 1:
+            return self.create_batch_processor(workers).run(pdf_files, skip_experiments, force)
+
+        results = {}
         for pdf_path in pdf_files:
             try:
                 logger.info(f"Processing {pdf_path.name}...")
-                created_notes = self.process_paper(pdf_path, skip_experiments)
+                created_notes = self.process_paper(pdf_path, skip_experiments, force)
                 results[pdf_path.name] = created_notes
             except Exception as e:
                 logger.error(f"Error processing {pdf_path.name}: {e}", exc_info=True)
@@ -281,3 +658,36 @@ class HedorahPipeline:
 
         logger.info(f"Completed processing {len(results)} papers")
         return results
+
+    def create_batch_processor(self, workers: Optional[int] = None) -> BatchProcessor:
+        """Create a concurrent batch processor from the ``batch`` config section.
+
+        Args:
+            workers: Override for both LLM pool sizes (``batch.workers`` if None)
+
+        Returns:
+            Configured BatchProcessor
+        """
+        default_workers = workers or self.config.get('batch.workers', 2)
+        local_workers = self.config.get('batch.local_workers') if workers is None else None
+        reasoning_workers = self.config.get('batch.reasoning_workers') if workers is None else None
+
+        return BatchProcessor(
+            self,
+            extract_workers=self.config.get('batch.extract_workers'),
+            local_workers=local_workers or default_workers,
+            reasoning_workers=reasoning_workers or default_workers,
+            report_interval=self.config.get('batch.report_interval', 30)
+        )
+
+    def create_deferred_batch(self) -> DeferredBatch:
+        """Create a deferred batch runner from the ``deferred`` config section.
+
+        Returns:
+            Configured DeferredBatch
+        """
+        return DeferredBatch(
+            self,
+            create_batch_backend(self.config, self.reasoning_client),
+            poll_interval=self.config.get('deferred.poll_interval', 60)
+        )
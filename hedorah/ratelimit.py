@@ -0,0 +1,190 @@
+"""Token-bucket rate limiting for reasoning API calls."""
+
+import math
+import time
+import asyncio
+import logging
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Estimate the token count of a prompt without calling a tokenizer.
+
+    Uses the common ~4 characters per token approximation for English text.
+
+    Args:
+        text: Prompt text
+
+    Returns:
+        Estimated number of tokens
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text) / 4)
+
+
+class TokenBucket:
+    """A bucket refilled continuously at ``per_minute`` units per minute.
+
+    The level may go negative when a reservation turns out to have been
+    too small; the debt is repaid by refilling before anything else is let
+    through.
+    """
+
+    def __init__(self, per_minute: float):
+        """Initialize a full bucket.
+
+        Args:
+            per_minute: Refill rate and capacity
+        """
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self._level = self.capacity
+        self._updated = time.monotonic()
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` can be taken.
+
+        Requests larger than the whole bucket only wait for a full bucket.
+
+        Args:
+            amount: Units needed
+
+        Returns:
+            Seconds to wait (0 if available now)
+        """
+        self._refill()
+        deficit = min(amount, self.capacity) - self._level
+        return max(0.0, deficit / self.rate)
+
+    def consume(self, amount: float) -> None:
+        """Take units from the bucket.
+
+        Args:
+            amount: Units to take
+        """
+        self._refill()
+        self._level -= amount
+
+    def refund(self, amount: float) -> None:
+        """Return units (negative amounts take more).
+
+        Args:
+            amount: Units to return
+        """
+        self._refill()
+        self._level = min(self.capacity, self._level + amount)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class RateLimiter:
+    """Requests-per-minute and input/output tokens-per-minute limits.
+
+    Each request reserves one request, its estimated input tokens and its
+    full ``max_tokens`` of output up front. Once the response arrives,
+    ``settle()`` corrects the reservation to the actual usage, so quota
+    that was reserved but not used becomes available again. A server
+    ``retry-after`` pauses every caller until it has passed. Limits left
+    unset are not enforced.
+
+    All methods must be called from the same event loop.
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None,
+                 input_tokens_per_minute: Optional[float] = None,
+                 output_tokens_per_minute: Optional[float] = None):
+        """Initialize rate limiter.
+
+        Args:
+            requests_per_minute: Request limit (None for unlimited)
+            input_tokens_per_minute: Input token limit (None for unlimited)
+            output_tokens_per_minute: Output token limit (None for unlimited)
+        """
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.input_tokens = TokenBucket(input_tokens_per_minute) if input_tokens_per_minute else None
+        self.output_tokens = TokenBucket(output_tokens_per_minute) if output_tokens_per_minute else None
+        self._paused_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    def from_config(cls, limits: Optional[Dict[str, Any]]) -> "RateLimiter":
+        """Create a limiter from a ``rate_limits`` config section.
+
+        Args:
+            limits: Dict with requests_per_minute, input_tokens_per_minute
+                and output_tokens_per_minute (any may be omitted)
+
+        Returns:
+            RateLimiter
+        """
+        limits = limits or {}
+        return cls(
+            requests_per_minute=limits.get('requests_per_minute'),
+            input_tokens_per_minute=limits.get('input_tokens_per_minute'),
+            output_tokens_per_minute=limits.get('output_tokens_per_minute'),
+        )
+
+    async def acquire(self, input_tokens: int, output_tokens: int) -> None:
+        """Wait until a request fits within every limit, then reserve it.
+
+        Callers are admitted one at a time in arrival order, so a large
+        request is not starved by a stream of small ones.
+
+        Args:
+            input_tokens: Estimated input tokens
+            output_tokens: Maximum output tokens
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            while True:
+                wait = max(
+                    self._paused_until - time.monotonic(),
+                    self.requests.wait_time(1) if self.requests else 0.0,
+                    self.input_tokens.wait_time(input_tokens) if self.input_tokens else 0.0,
+                    self.output_tokens.wait_time(output_tokens) if self.output_tokens else 0.0,
+                )
+                if wait <= 0:
+                    break
+                logger.debug(f"Rate limited, waiting {wait:.1f}s")
+                await asyncio.sleep(wait)
+
+            if self.requests:
+                self.requests.consume(1)
+            if self.input_tokens:
+                self.input_tokens.consume(input_tokens)
+            if self.output_tokens:
+                self.output_tokens.consume(output_tokens)
+
+    def settle(self, estimated_input: int, reserved_output: int,
+               actual_input: Optional[int], actual_output: Optional[int]) -> None:
+        """Correct a reservation to the tokens the request actually used.
+
+        Args:
+            estimated_input: Input tokens reserved
+            reserved_output: Output tokens reserved
+            actual_input: Input tokens reported by the provider (None if unknown)
+            actual_output: Output tokens reported by the provider (None if unknown)
+        """
+        if self.input_tokens and actual_input is not None:
+            self.input_tokens.refund(estimated_input - actual_input)
+        if self.output_tokens and actual_output is not None:
+            self.output_tokens.refund(reserved_output - actual_output)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back all requests, e.g. after a 429 with ``retry-after``.
+
+        Args:
+            seconds: How long to pause
+        """
+        until = time.monotonic() + seconds
+        if until > self._paused_until:
+            logger.warning(f"Rate limit hit, pausing reasoning requests for {seconds:.1f}s")
+            self._paused_until = until
@@ -0,0 +1,229 @@
+"""Relevance ranking of the user's vault notes for a paper."""
+
+import re
+import math
+import logging
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from .ratelimit import estimate_tokens
+
+if TYPE_CHECKING:
+    from .llm import OllamaClient
+    from .vault import VaultReader
+
+logger = logging.getLogger(__name__)
+
+# Common English words that carry no topical signal
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been
+before being below between both but by can could did do does doing down during each
+few for from further had has have having he her here hers herself him himself his how
+i if in into is it its itself just me more most my myself no nor not now of off on
+once only or other our ours ourselves out over own same she should so some such than
+that the their theirs them themselves then there these they this those through to too
+under until up very was we were what when where which while who whom why will with
+would you your yours yourself yourselves we our paper using use used show shows shown
+propose proposed approach method methods results result based however thus via
+""".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9\-]*[a-z0-9]|[a-z0-9]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase terms, dropping stopwords.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of terms
+    """
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+class BM25Index:
+    """Okapi BM25 ranking over a fixed set of notes.
+
+    Titles are counted ``title_weight`` times so a match in a note's title
+    outranks the same match in its body.
+    """
+
+    def __init__(self, notes: List[Dict[str, str]], k1: float = 1.5, b: float = 0.75,
+                 title_weight: int = 3):
+        """Build the index.
+
+        Args:
+            notes: Notes with 'title' and 'content' keys
+            k1: Term-frequency saturation
+            b: Document-length normalization
+            title_weight: How many times title terms are counted
+        """
+        self.notes = notes
+        self.k1 = k1
+        self.b = b
+
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._lengths: List[int] = []
+        for doc_id, note in enumerate(notes):
+            terms = tokenize(note['title']) * title_weight + tokenize(note['content'])
+            self._lengths.append(len(terms))
+            for term, freq in Counter(terms).items():
+                self._postings.setdefault(term, []).append((doc_id, freq))
+
+        self._avg_length = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+
+    def search(self, query: str) -> List[Tuple[float, Dict[str, str]]]:
+        """Rank notes against a query.
+
+        Args:
+            query: Free-text query
+
+        Returns:
+            List of (score, note) for notes sharing at least one term with
+            the query, best first
+        """
+        n_docs = len(self.notes)
+        scores: Dict[int, float] = {}
+
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, freq in postings:
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / self._avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * freq * (self.k1 + 1) / (freq + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return [(score, self.notes[doc_id]) for doc_id, score in ranked]
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class NoteRetriever:
+    """Finds the user's notes most relevant to a paper.
+
+    Notes are ranked with BM25 (or by embedding similarity from the local
+    Ollama model) against a query built from the paper, and the best are
+    returned until ``top_k`` notes or ``token_budget`` prompt tokens are
+    reached. The index is rebuilt only when notes are added, removed or
+    modified, and note embeddings are kept in the vault index across runs.
+    """
+
+    def __init__(self, vault_reader: "VaultReader", notes_dir: Path, method: str = 'bm25',
+                 top_k: int = 8, token_budget: int = 6000, max_notes: int = 5000,
+                 ollama: Optional["OllamaClient"] = None, embedding_model: Optional[str] = None,
+                 embedding_batch_size: int = 32):
+        """Initialize note retriever.
+
+        Args:
+            vault_reader: Reader for the vault's notes
+            notes_dir: Folder holding the user's notes
+            method: 'bm25' or 'embeddings'
+            top_k: Maximum notes returned
+            token_budget: Maximum estimated prompt tokens for the returned notes
+            max_notes: Maximum notes indexed (most recently modified first)
+            ollama: Ollama client (required for 'embeddings')
+            embedding_model: Ollama embedding model (required for 'embeddings')
+            embedding_batch_size: Notes embedded per Ollama request
+
+        Raises:
+            ValueError: If the method is not supported
+        """
+        if method not in ('bm25', 'embeddings'):
+            raise ValueError(f"Unsupported note retrieval method: {method}")
+        if method == 'embeddings' and (ollama is None or not embedding_model):
+            raise ValueError("Embedding retrieval needs an Ollama client and embedding model")
+
+        self.vault_reader = vault_reader
+        self.notes_dir = notes_dir
+        self.method = method
+        self.top_k = top_k
+        self.token_budget = token_budget
+        self.max_notes = max_notes
+        self.ollama = ollama
+        self.embedding_model = embedding_model
+        self.embedding_batch_size = embedding_batch_size
+
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple[Tuple[str, str], ...]] = None
+        self._index: Optional[BM25Index] = None
+        # Note path -> (content hash, vector), loaded from the vault index
+        self._embeddings: Optional[Dict[str, Tuple[str, List[float]]]] = None
+
+    def retrieve(self, query: str) -> List[Dict[str, str]]:
+        """Get the notes most relevant to a query, within the budget.
+
+        Args:
+            query: Free-text query (e.g. title, abstract and tags)
+
+        Returns:
+            List of notes, most relevant first
+        """
+        with self._lock:
+            ranked = self._rank(query)
+
+        selected = []
+        used_tokens = 0
+        for score, note in ranked:
+            if len(selected) >= self.top_k:
+                break
+            tokens = estimate_tokens(note['title']) + estimate_tokens(note['content'])
+            if used_tokens + tokens > self.token_budget:
+                continue
+            selected.append(note)
+            used_tokens += tokens
+
+        logger.info(f"Selected {len(selected)} of {len(ranked)} matching notes "
+                    f"(~{used_tokens} tokens)")
+        return selected
+
+    def _rank(self, query: str) -> List[Tuple[float, Dict[str, str]]]:
+        """Rank all notes against the query, refreshing the index if notes changed."""
+        notes = self.vault_reader.read_notes(self.notes_dir, limit=self.max_notes)
+        signature = tuple((note['path'], note['modified']) for note in notes)
+        if signature != self._signature:
+            self._index = BM25Index(notes)
+            self._signature = signature
+            logger.debug(f"Indexed {len(notes)} notes")
+
+        if self.method == 'bm25':
+            return self._index.search(query)
+        return self._rank_by_embedding(query, notes)
+
+    def _rank_by_embedding(self, query: str,
+                           notes: List[Dict[str, str]]) -> List[Tuple[float, Dict[str, str]]]:
+        """Rank notes by cosine similarity of Ollama embeddings."""
+        if not notes:
+            return []
+
+        # Embeddings persist in the vault index by note path and content
+        # hash; only notes that are new or changed since they were last
+        # embedded are sent to Ollama, in bounded batches
+        vault_index = self.vault_reader.index
+        if self._embeddings is None:
+            self._embeddings = vault_index.embeddings(self.embedding_model)
+        missing = [note for note in notes
+                   if self._embeddings.get(note['path'], (None,))[0] != note['hash']]
+        if missing:
+            logger.info(f"Embedding {len(missing)} new or changed notes")
+        for start in range(0, len(missing), self.embedding_batch_size):
+            batch = missing[start:start + self.embedding_batch_size]
+            vectors = self.ollama.embed([f"{note['title']}\n{note['content']}" for note in batch],
+                                        model=self.embedding_model)
+            stored = [(note['path'], note['hash'], vector) for note, vector in zip(batch, vectors)]
+            vault_index.put_embeddings(self.embedding_model, stored)
+            for path, digest, vector in stored:
+                self._embeddings[path] = (digest, vector)
+
+        query_vector = self.ollama.embed([query], model=self.embedding_model)[0]
+        ranked = [(_cosine(query_vector, self._embeddings[note['path']][1]), note)
+                  for note in notes]
+        ranked.sort(key=lambda item: item[0], reverse=True)
+        return ranked
@@ -0,0 +1,170 @@
+"""Dependency-aware step scheduler for the per-paper pipeline."""
+
+import time
+import logging
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Dict, Any, Callable, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StepTiming:
+    """Wall-clock timing of a single pipeline step."""
+    name: str
+    started: float
+    finished: float
+
+    @property
+    def duration(self) -> float:
+        """Step duration in seconds."""
+        return self.finished - self.started
+
+
+@dataclass
+class _Step:
+    name: str
+    func: Callable[..., Any]
+    depends_on: Tuple[str, ...]
+
+
+class StepScheduler:
+    """Runs a small DAG of steps, executing independent steps concurrently.
+
+    Each step's function is called with the results of its dependencies as
+    keyword arguments named after those steps:
+
+        scheduler.add_step('content', extract)
+        scheduler.add_step('summary', lambda content: summarize(content),
+                           depends_on=['content'])
+    """
+
+    def __init__(self, max_workers: int = 4):
+        """Initialize step scheduler.
+
+        Args:
+            max_workers: Maximum number of steps running at once
+        """
+        self.max_workers = max_workers
+        self.steps: Dict[str, _Step] = {}
+        self.timings: Dict[str, StepTiming] = {}
+
+    def add_step(self, name: str, func: Callable[..., Any],
+                 depends_on: Iterable[str] = ()) -> None:
+        """Add a step to the graph.
+
+        Args:
+            name: Unique step name (also the keyword its result is passed as)
+            func: Function to run; receives dependency results as kwargs
+            depends_on: Names of steps that must finish first
+        """
+        if name in self.steps:
+            raise ValueError(f"Duplicate step: {name}")
+        self.steps[name] = _Step(name, func, tuple(depends_on))
+
+    def run(self) -> Dict[str, Any]:
+        """Run all steps, respecting dependencies.
+
+        Returns:
+            Dictionary mapping step names to their results
+
+        Raises:
+            ValueError: If the graph has unknown dependencies or a cycle
+            Exception: The first exception raised by any step
+        """
+        self._validate()
+        self.timings = {}
+        results: Dict[str, Any] = {}
+        remaining = dict(self.steps)
+        running: Dict[Future, str] = {}
+        t0 = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix='hedorah-step') as pool:
+            while remaining or running:
+                # Start every step whose dependencies are satisfied
+                for name, step in list(remaining.items()):
+                    if all(dep in results for dep in step.depends_on):
+                        kwargs = {dep: results[dep] for dep in step.depends_on}
+                        running[pool.submit(self._timed, step, kwargs)] = name
+                        del remaining[name]
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception:
+                        for pending in running:
+                            pending.cancel()
+                        raise
+
+        logger.debug(f"Ran {len(self.steps)} steps in {time.monotonic() - t0:.2f}s")
+        return results
+
+    def _timed(self, step: _Step, kwargs: Dict[str, Any]) -> Any:
+        """Run a step and record its timing."""
+        started = time.monotonic()
+        try:
+            return step.func(**kwargs)
+        finally:
+            self.timings[step.name] = StepTiming(step.name, started, time.monotonic())
+
+    def _validate(self) -> None:
+        """Check for unknown dependencies and cycles."""
+        for step in self.steps.values():
+            for dep in step.depends_on:
+                if dep not in self.steps:
+                    raise ValueError(f"Step '{step.name}' depends on unknown step '{dep}'")
+
+        visiting, visited = set(), set()
+
+        def visit(name: str) -> None:
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle involving step '{name}'")
+            visiting.add(name)
+            for dep in self.steps[name].depends_on:
+                visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.steps:
+            visit(name)
+
+    def critical_path(self) -> Tuple[List[str], float]:
+        """Find the longest dependency chain by recorded duration.
+
+        Returns:
+            Tuple of (step names along the path, total duration in seconds)
+        """
+        best: Dict[str, Tuple[float, List[str]]] = {}
+
+        def longest(name: str) -> Tuple[float, List[str]]:
+            if name not in best:
+                timing = self.timings.get(name)
+                own = timing.duration if timing else 0.0
+                chains = [longest(dep) for dep in self.steps[name].depends_on]
+                prev = max(chains, key=lambda c: c[0], default=(0.0, []))
+                best[name] = (prev[0] + own, prev[1] + [name])
+            return best[name]
+
+        if not self.steps:
+            return [], 0.0
+        total, path = max((longest(name) for name in self.steps), key=lambda c: c[0])
+        return path, total
+
+    def format_timings(self) -> str:
+        """Format step timings with the critical path for logging.
+
+        Returns:
+            Human-readable timing summary
+        """
+        parts = [f"{t.name}={t.duration:.2f}s" for t in
+                 sorted(self.timings.values(), key=lambda t: t.started)]
+        step_sum = sum(t.duration for t in self.timings.values())
+        path, path_time = self.critical_path()
+        return (f"{', '.join(parts)} | critical path {' -> '.join(path)} "
+                f"{path_time:.2f}s (sum of steps {step_sum:.2f}s)")
@@ -0,0 +1,226 @@
+"""Streaming helpers for local model responses."""
+
+import json
+import time
+import logging
+from dataclasses import dataclass
+from typing import Optional, Tuple
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+class MalformedOutputError(ValueError):
+    """Raised when a streamed response can no longer become valid JSON."""
+
+    def __init__(self, message: str, partial: str = ""):
+        """Initialize error.
+
+        Args:
+            message: What was wrong with the output
+            partial: Text received before the stream was aborted
+        """
+        super().__init__(message)
+        self.partial = partial
+
+
+@dataclass
+class StreamStats:
+    """Timing of a streamed generation."""
+    started: float
+    first_token: Optional[float] = None
+    finished: Optional[float] = None
+    tokens: int = 0
+    eval_seconds: Optional[float] = None  # Generation time reported by the server
+    stopped_early: bool = False
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        """Seconds from sending the request to receiving the first token."""
+        if self.first_token is None:
+            return None
+        return self.first_token - self.started
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Generation throughput, preferring the server's own timing."""
+        if self.eval_seconds:
+            return self.tokens / self.eval_seconds
+        if self.first_token is None or self.finished is None or self.finished <= self.first_token:
+            return None
+        return self.tokens / (self.finished - self.first_token)
+
+    def format(self) -> str:
+        """Format stats for logging.
+
+        Returns:
+            Human-readable stats string
+        """
+        ttft = self.time_to_first_token
+        rate = self.tokens_per_second
+        parts = [
+            f"first token {ttft:.2f}s" if ttft is not None else "no tokens",
+            f"{self.tokens} tokens",
+        ]
+        if rate is not None:
+            parts.append(f"{rate:.1f} tok/s")
+        if self.stopped_early:
+            parts.append("stopped after complete JSON")
+        return ", ".join(parts)
+
+
+class IncrementalJSONParser:
+    """Validates a JSON object as it streams in, one chunk at a time.
+
+    Tracks string, escape and bracket state so it can tell as soon as the
+    output can no longer be valid JSON (prose instead of an object, a
+    mismatched bracket, stray characters) and when the top-level object is
+    complete. Leading text such as a Markdown code fence is allowed up to
+    ``max_preamble`` characters.
+    """
+
+    _CLOSERS = {'{': '}', '[': ']'}
+
+    def __init__(self, max_preamble: int = 200):
+        """Initialize parser.
+
+        Args:
+            max_preamble: Characters allowed before the opening brace
+        """
+        self.max_preamble = max_preamble
+        self._parts = []
+        self._pos = 0
+        self._start: Optional[int] = None
+        self._end: Optional[int] = None
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def complete(self) -> bool:
+        """Whether the top-level object has been closed."""
+        return self._end is not None
+
+    @property
+    def text(self) -> str:
+        """All text fed so far."""
+        return "".join(self._parts)
+
+    @property
+    def json_text(self) -> Optional[str]:
+        """The complete top-level object, once closed."""
+        if self._end is None:
+            return None
+        return self.text[self._start:self._end]
+
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk of streamed output.
+
+        Args:
+            chunk: Next piece of generated text
+
+        Returns:
+            True once the top-level object is complete
+
+        Raises:
+            MalformedOutputError: If the output cannot become a JSON object
+        """
+        self._parts.append(chunk)
+        if self._end is not None:
+            return True
+
+        for ch in chunk:
+            self._pos += 1
+
+            if self._start is None:
+                if ch == '{':
+                    self._start = self._pos - 1
+                    self._stack.append('}')
+                elif ch == '[':
+                    self._fail("expected a JSON object, got an array")
+                elif self._pos > self.max_preamble:
+                    self._fail(f"no JSON object in the first {self.max_preamble} characters")
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                elif ch == '\n':
+                    self._fail("unterminated string")
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in self._CLOSERS:
+                self._stack.append(self._CLOSERS[ch])
+            elif ch in '}]':
+                if self._stack.pop() != ch:
+                    self._fail(f"unexpected '{ch}'")
+                if not self._stack:
+                    self._end = self._pos
+                    return True
+            elif not (ch.isspace() or ch.isalnum() or ch in ',:.-+'):
+                self._fail(f"unexpected character {ch!r}")
+
+        return False
+
+    def _fail(self, reason: str) -> None:
+        raise MalformedOutputError(f"Malformed JSON output at character {self._pos}: {reason}",
+                                   partial=self.text)
+
+
+def read_ndjson_stream(response: requests.Response, started: float,
+                       parser: Optional[IncrementalJSONParser] = None) -> Tuple[str, StreamStats]:
+    """Read an Ollama NDJSON generation stream.
+
+    Closing the response when the parser completes or rejects the output
+    makes Ollama stop generating, so no time is spent on tokens that would
+    be thrown away.
+
+    Args:
+        response: Streaming response from ``/api/generate``
+        started: ``time.monotonic()`` when the request was sent
+        parser: Incremental JSON parser to validate the output (optional)
+
+    Returns:
+        Tuple of (generated text, stream stats)
+
+    Raises:
+        MalformedOutputError: If the parser rejects the output
+        RuntimeError: If Ollama reports an error mid-stream
+    """
+    stats = StreamStats(started=started)
+    parts = []
+
+    try:
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            if 'error' in chunk:
+                raise RuntimeError(f"Ollama error: {chunk['error']}")
+
+            piece = chunk.get('response', '')
+            if piece:
+                if stats.first_token is None:
+                    stats.first_token = time.monotonic()
+                stats.tokens += 1
+                parts.append(piece)
+                if parser and parser.feed(piece):
+                    stats.stopped_early = not chunk.get('done', False)
+                    break
+
+            if chunk.get('done'):
+                stats.tokens = chunk.get('eval_count', stats.tokens)
+                if chunk.get('eval_duration'):
+                    stats.eval_seconds = chunk['eval_duration'] / 1e9
+                break
+    finally:
+        stats.finished = time.monotonic()
+        response.close()
+
+    return "".join(parts), stats
@@ -0,0 +1,182 @@
+"""HTTP transport with connection pooling, retries and a circuit breaker."""
+
+import time
+import random
+import logging
+import threading
+from typing import Dict, Any, Optional
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a server that has been failing repeatedly."""
+    pass
+
+
+class CircuitBreaker:
+    """Fails fast after repeated failures, then lets a single probe through.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    every call is rejected for ``reset_seconds``. The first call after that
+    is let through as a probe: success closes the circuit, failure opens it
+    for another period.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        """Initialize circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures before the circuit opens
+            reset_seconds: Seconds the circuit stays open before a probe
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are currently being rejected."""
+        with self._lock:
+            return self._opened_at is not None
+
+    def before_call(self) -> None:
+        """Check that a call may proceed.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self._opened_at + self.reset_seconds - time.monotonic()
+            if remaining > 0 or self._probing:
+                raise CircuitOpenError(
+                    f"{self._failures} consecutive failures; "
+                    f"retrying in {max(remaining, 0):.1f}s"
+                )
+            self._probing = True
+
+    def record_success(self) -> None:
+        """Record a successful call, closing the circuit."""
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("Circuit closed, server is responding again")
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the circuit past the threshold."""
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._probing:
+                    logger.warning(f"Circuit opened after {self._failures} consecutive failures")
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+class HTTPClient:
+    """Pooled HTTP client for a single server.
+
+    Keeps connections alive across calls, applies connect and read timeouts
+    to every request, and retries connection errors, timeouts and 5xx
+    responses with exponential backoff and jitter. Failures feed a circuit
+    breaker so a server that is down is not hammered by every worker.
+    """
+
+    def __init__(self, base_url: str, connect_timeout: float = 5.0,
+                 read_timeout: Optional[float] = 300.0, max_retries: int = 3,
+                 backoff_seconds: float = 1.0, max_backoff_seconds: float = 30.0,
+                 pool_size: int = 10, breaker: Optional[CircuitBreaker] = None):
+        """Initialize HTTP client.
+
+        Args:
+            base_url: Server URL that request paths are appended to
+            connect_timeout: Seconds to wait for a connection
+            read_timeout: Seconds to wait between bytes of the response (None for no limit)
+            max_retries: Retries after the first attempt
+            backoff_seconds: Delay before the first retry, doubled for each retry
+            max_backoff_seconds: Upper bound on the retry delay
+            pool_size: Maximum pooled connections (match the number of worker threads)
+            breaker: Circuit breaker (optional)
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.breaker = breaker
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def post(self, path: str, json: Dict[str, Any], stream: bool = False) -> requests.Response:
+        """POST a JSON payload, retrying transient failures.
+
+        Args:
+            path: Request path (e.g. '/api/generate')
+            json: JSON payload
+            stream: Whether to stream the response body
+
+        Returns:
+            Successful response
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            requests.RequestException: If the request fails after all retries
+        """
+        url = f"{self.base_url}{path}"
+
+        for attempt in range(self.max_retries + 1):
+            if self.breaker:
+                try:
+                    self.breaker.before_call()
+                except CircuitOpenError as e:
+                    raise CircuitOpenError(f"{self.base_url} is unavailable: {e}") from None
+
+            try:
+                response = self.session.post(url, json=json, stream=stream, timeout=self.timeout)
+                if response.status_code >= 500:
+                    response.close()
+                    response.raise_for_status()
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                if self.breaker:
+                    self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"POST {url} failed ({e}), retry {attempt + 1}/{self.max_retries} "
+                               f"in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            except BaseException:
+                # Not retried, but a probe must still be settled or the
+                # circuit would stay open for good
+                if self.breaker:
+                    self.breaker.record_failure()
+                raise
+
+            # The server answered, so count it as up even if it rejected the request
+            if self.breaker:
+                self.breaker.record_success()
+            response.raise_for_status()
+            return response
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        self.session.close()
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with jitter."""
+        delay = min(self.max_backoff_seconds, self.backoff_seconds * 2 ** attempt)
+        return delay * random.uniform(0.5, 1.0)
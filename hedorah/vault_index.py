@@ -0,0 +1,447 @@
+"""Persistent, incrementally updated index of vault notes."""
+
+import os
+import re
+import json
+import sqlite3
+import hashlib
+import logging
+import threading
+from array import array
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+import yaml
+
+logger = logging.getLogger(__name__)
+
+# The libyaml loader is much faster when building the index for a large vault
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def parse_note(content: str, filename: str) -> Tuple[str, Dict[str, Any], str]:
+    """Parse a note into title, frontmatter and body.
+
+    The title comes from the frontmatter ``title``, else a leading ``# ``
+    heading, else the filename.
+
+    Args:
+        content: Raw markdown content
+        filename: Filename (used as fallback title)
+
+    Returns:
+        Tuple of (title, frontmatter, body)
+    """
+    lines = content.split('\n')
+    title = filename
+    frontmatter: Dict[str, Any] = {}
+    body_start = 0
+
+    # Check for YAML frontmatter
+    if lines and lines[0].strip() == '---':
+        # Find closing ---
+        for i, line in enumerate(lines[1:], 1):
+            if line.strip() == '---':
+                raw = '\n'.join(lines[1:i])
+                try:
+                    parsed = yaml.load(raw, Loader=_YAML_LOADER)
+                    if isinstance(parsed, dict):
+                        frontmatter = parsed
+                except yaml.YAMLError:
+                    pass
+                title_match = re.search(r'title:\s*["\']?([^"\'\n]+)["\']?', raw)
+                if title_match:
+                    title = title_match.group(1).strip()
+                body_start = i + 1
+                break
+
+    body_lines = lines[body_start:]
+
+    # If first line is a heading, use it as title
+    if body_lines and body_lines[0].startswith('# '):
+        title = body_lines[0][2:].strip()
+        body_lines = body_lines[1:]
+
+    return title, frontmatter, '\n'.join(body_lines).strip()
+
+
+_INLINE_TAG_RE = re.compile(r'(?<![\w#&])#([A-Za-z][\w/-]*)')
+
+
+def note_tags(frontmatter: Dict[str, Any], body: str) -> List[str]:
+    """Collect a note's tags from its frontmatter and inline ``#tags``.
+
+    Args:
+        frontmatter: Parsed frontmatter
+        body: Note body
+
+    Returns:
+        List of tags without the leading '#'
+    """
+    tags = frontmatter.get('tags') or []
+    if isinstance(tags, str):
+        tags = re.split(r'[,\s]+', tags)
+    tags = [str(tag).lstrip('#') for tag in tags if tag]
+    return tags + _INLINE_TAG_RE.findall(body)
+
+
+_QUERY_TOKEN_RE = re.compile(r'(?:(title|tags|body):)?(?:"([^"]*)"|(\S+))')
+
+
+def build_fts_query(query: str) -> str:
+    """Translate a search query into an FTS5 MATCH expression.
+
+    Terms are ANDed. ``"quoted text"`` matches a phrase, a trailing ``*``
+    matches a prefix, and ``title:``, ``tags:`` or ``body:`` restricts a term
+    or phrase to one field. Everything else is quoted, so punctuation in the
+    query cannot be read as FTS5 syntax.
+
+    Args:
+        query: Search query
+
+    Returns:
+        FTS5 query (empty if the query has no searchable terms)
+    """
+    parts = []
+    for field, phrase, term in _QUERY_TOKEN_RE.findall(query):
+        prefix = False
+        if phrase:
+            text = phrase
+        else:
+            prefix = term.endswith('*')
+            text = re.sub(r'[^\w\s]', ' ', term).strip()
+        if not text.strip():
+            continue
+        part = '"' + text.replace('"', ' ') + '"' + ('*' if prefix else '')
+        parts.append(f'{field} : {part}' if field else part)
+    return ' '.join(parts)
+
+
+class VaultIndex:
+    """SQLite index of the markdown notes in vault folders.
+
+    Each note's path, size, mtime, content hash, parsed title, frontmatter
+    and full body are stored. ``refresh()`` stats the folder's files once
+    and re-reads only those whose size or mtime changed; a file that was
+    touched but not edited (same hash) is not re-parsed. Queries are then
+    indexed lookups instead of a read and parse of every file.
+
+    An FTS5 table over each note's title, tags and body, keyed by the
+    notes rowid, is kept in step with the notes table for ranked
+    full-text search. Note embeddings are stored by path and content hash,
+    so each version of a note is embedded once across runs.
+    """
+
+    # BM25 weight of a match in each field
+    TITLE_WEIGHT = 10.0
+    TAGS_WEIGHT = 5.0
+    BODY_WEIGHT = 1.0
+
+    # Search rows share the rowid of their note. Prefix indexes keep short
+    # prefix queries (``w1*``) from merging the doclists of every expansion.
+    FTS_SCHEMA = ("CREATE VIRTUAL TABLE notes_fts USING fts5("
+                  "title, tags, body, tokenize = 'porter unicode61', prefix = '2 3')")
+
+    # Directories skipped when indexing a folder tree (Obsidian and Hedorah state)
+    SKIP_DIRS = ('.hedorah', '.obsidian', '.trash', '.git')
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """Initialize vault index.
+
+        Args:
+            db_path: Path to the index database file (None keeps the index
+                in memory for this process only)
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        if db_path is not None:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path) if db_path else ':memory:', timeout=30,
+                                     check_same_thread=False)
+        if db_path is not None:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS notes ("
+            "path TEXT PRIMARY KEY, folder TEXT NOT NULL, size INTEGER NOT NULL, "
+            "mtime_ns INTEGER NOT NULL, hash TEXT NOT NULL, title TEXT NOT NULL, "
+            "frontmatter TEXT NOT NULL, body TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS notes_folder_mtime ON notes (folder, mtime_ns)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "path TEXT NOT NULL, model TEXT NOT NULL, hash TEXT NOT NULL, "
+            "vector BLOB NOT NULL, PRIMARY KEY (path, model))"
+        )
+        # A search table with an older definition (e.g. keyed by an unindexed
+        # path column, making every delete a full scan) is rebuilt
+        row = self._conn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'notes_fts'").fetchone()
+        if row and row[0] != self.FTS_SCHEMA:
+            self._conn.execute("DROP TABLE notes_fts")
+        if not row or row[0] != self.FTS_SCHEMA:
+            self._conn.execute(self.FTS_SCHEMA)
+        self._conn.commit()
+        self._sync_fts()
+
+    def _sync_fts(self) -> None:
+        """Rebuild the search table if it is out of step with the notes table.
+
+        This only happens for an index created before search existed, or
+        whose search table had an older definition.
+        """
+        notes = self._conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+        indexed = self._conn.execute("SELECT COUNT(*) FROM notes_fts").fetchone()[0]
+        if notes == indexed:
+            return
+
+        logger.info(f"Building search index for {notes} notes")
+        self._conn.execute("DELETE FROM notes_fts")
+        rows = self._conn.execute("SELECT rowid, title, frontmatter, body FROM notes")
+        self._conn.executemany(
+            "INSERT INTO notes_fts (rowid, title, tags, body) VALUES (?, ?, ?, ?)",
+            [(rowid, title, ' '.join(note_tags(json.loads(frontmatter), body)), body)
+             for rowid, title, frontmatter, body in rows.fetchall()]
+        )
+        self._conn.commit()
+
+    def refresh(self, folder: Path, recursive: bool = False) -> int:
+        """Bring a folder's entries up to date with the files on disk.
+
+        Args:
+            folder: Folder of markdown notes
+            recursive: Also index subfolders (except SKIP_DIRS)
+
+        Returns:
+            Number of notes added, changed or removed
+        """
+        root = folder.resolve()
+        on_disk: Dict[str, os.stat_result] = {}
+        pending = [root] if root.is_dir() else []
+        while pending:
+            try:
+                entries = os.scandir(pending.pop())
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    try:
+                        if entry.name.endswith('.md') and entry.is_file():
+                            on_disk[entry.path] = entry.stat()
+                        elif (recursive and entry.is_dir(follow_symlinks=False)
+                              and entry.name not in self.SKIP_DIRS):
+                            pending.append(Path(entry.path))
+                    except OSError:
+                        continue
+
+        where, params = self._folder_filter(root, recursive)
+        with self._lock:
+            known = {
+                path: (size, mtime_ns, digest, rowid)
+                for rowid, path, size, mtime_ns, digest in self._conn.execute(
+                    f"SELECT rowid, path, size, mtime_ns, hash FROM notes WHERE {where}", params)
+            }
+
+        upserts = []
+        touched = []
+        for path, stat in on_disk.items():
+            row = known.get(path)
+            if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+                continue
+            try:
+                data = Path(path).read_bytes()
+            except OSError:
+                # Skip files that can't be read
+                continue
+            digest = hashlib.sha256(data).hexdigest()
+            if row and row[2] == digest:
+                touched.append((stat.st_size, stat.st_mtime_ns, path))
+                continue
+            try:
+                title, frontmatter, body = parse_note(data.decode('utf-8'), Path(path).stem)
+            except UnicodeDecodeError:
+                continue
+            upserts.append((path, os.path.dirname(path), stat.st_size, stat.st_mtime_ns, digest,
+                            title, frontmatter, body))
+
+        removed = [(path,) for path in known if path not in on_disk]
+        # Search rows of changed and removed notes, by rowid
+        stale = [(known[path][3],) for path, *_ in upserts if path in known]
+        stale += [(known[path][3],) for path, in removed]
+
+        if upserts or touched or removed:
+            with self._lock:
+                self._conn.executemany("DELETE FROM notes_fts WHERE rowid = ?", stale)
+                # Upsert rather than replace, so a changed note keeps its rowid
+                self._conn.executemany(
+                    "INSERT INTO notes (path, folder, size, mtime_ns, hash, title, "
+                    "frontmatter, body) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (path) DO UPDATE SET folder = excluded.folder, "
+                    "size = excluded.size, mtime_ns = excluded.mtime_ns, hash = excluded.hash, "
+                    "title = excluded.title, frontmatter = excluded.frontmatter, "
+                    "body = excluded.body",
+                    [(path, parent, size, mtime_ns, digest, title,
+                      json.dumps(frontmatter, default=str), body)
+                     for path, parent, size, mtime_ns, digest, title, frontmatter, body in upserts]
+                )
+                self._conn.executemany(
+                    "UPDATE notes SET size = ?, mtime_ns = ? WHERE path = ?", touched)
+                self._conn.executemany("DELETE FROM notes WHERE path = ?", removed)
+                self._conn.executemany("DELETE FROM embeddings WHERE path = ?", removed)
+                self._conn.executemany(
+                    "INSERT INTO notes_fts (rowid, title, tags, body) "
+                    "SELECT rowid, ?, ?, ? FROM notes WHERE path = ?",
+                    [(title, ' '.join(note_tags(frontmatter, body)), body, path)
+                     for path, _, _, _, _, title, frontmatter, body in upserts]
+                )
+                self._conn.commit()
+            logger.debug(f"Vault index {folder}: {len(upserts)} parsed, "
+                         f"{len(touched)} touched, {len(removed)} removed")
+
+        return len(upserts) + len(removed)
+
+    def notes(self, folder: Path, limit: Optional[int] = None,
+              modified_after: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Get a folder's notes, most recently modified first.
+
+        Call ``refresh()`` first to pick up changes on disk.
+
+        Args:
+            folder: Folder of markdown notes
+            limit: Maximum number of notes (None for all)
+            modified_after: Only notes modified after this time (optional)
+
+        Returns:
+            List of dicts with 'title', 'frontmatter', 'body', 'path',
+            'modified' and 'hash' keys
+        """
+        sql = "SELECT path, mtime_ns, hash, title, frontmatter, body FROM notes WHERE folder = ?"
+        params: List[Any] = [str(folder.resolve())]
+        if modified_after is not None:
+            sql += " AND mtime_ns > ?"
+            params.append(int(modified_after.timestamp() * 1e9))
+        sql += " ORDER BY mtime_ns DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        return [
+            {
+                'title': title,
+                'frontmatter': json.loads(frontmatter),
+                'body': body,
+                'path': path,
+                'modified': datetime.fromtimestamp(mtime_ns / 1e9).isoformat(),
+                'hash': digest,
+            }
+            for path, mtime_ns, digest, title, frontmatter, body in rows
+        ]
+
+    def search(self, query: str, folder: Optional[Path] = None,
+               limit: int = 20) -> List[Dict[str, Any]]:
+        """Full-text search, ranked by BM25 with title and tag matches boosted.
+
+        Call ``refresh()`` first to pick up changes on disk. See
+        ``build_fts_query`` for the query syntax.
+
+        Args:
+            query: Search query
+            folder: Only search notes in this folder and its subfolders (optional)
+            limit: Maximum number of results
+
+        Returns:
+            List of dicts with 'title', 'path', 'modified', 'score' and
+            'snippet' keys, best match first
+
+        Raises:
+            ValueError: If the query cannot be parsed
+        """
+        match = build_fts_query(query)
+        if not match:
+            return []
+
+        # FTS5 sorts the matches by rank itself, so the LIMIT stops the scan
+        # and snippets are built for the returned rows only, not for every
+        # match of a broad prefix or field query
+        rank = f"bm25({self.TITLE_WEIGHT}, {self.TAGS_WEIGHT}, {self.BODY_WEIGHT})"
+        sql = (
+            "SELECT n.path, n.title, n.mtime_ns, -f.rank AS score, "
+            "snippet(notes_fts, 2, '**', '**', '...', 16) "
+            "FROM notes_fts f CROSS JOIN notes n ON n.rowid = f.rowid "
+            "WHERE f.notes_fts MATCH ? AND f.rank MATCH ?"
+        )
+        params: List[Any] = [match, rank]
+        if folder is not None:
+            where, folder_params = self._folder_filter(folder.resolve(), True, 'n.folder')
+            sql += f" AND {where}"
+            params.extend(folder_params)
+        sql += " ORDER BY f.rank LIMIT ?"
+        params.append(limit)
+
+        try:
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid search query {query!r}: {e}") from e
+
+        return [
+            {
+                'title': title,
+                'path': path,
+                'modified': datetime.fromtimestamp(mtime_ns / 1e9).isoformat(),
+                'score': score,
+                'snippet': snippet,
+            }
+            for path, title, mtime_ns, score, snippet in rows
+        ]
+
+    def embeddings(self, model: str) -> Dict[str, Tuple[str, List[float]]]:
+        """Get the stored embedding of every note for a model.
+
+        Args:
+            model: Embedding model name
+
+        Returns:
+            Dictionary mapping note paths to (content hash, vector); a
+            vector is current only while the hash matches the note's
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, hash, vector FROM embeddings WHERE model = ?", (model,)).fetchall()
+        return {path: (digest, array('f', vector).tolist()) for path, digest, vector in rows}
+
+    def put_embeddings(self, model: str, vectors: List[Tuple[str, str, List[float]]]) -> None:
+        """Store note embeddings, replacing older ones for the same notes.
+
+        Args:
+            model: Embedding model name
+            vectors: List of (note path, content hash, vector)
+        """
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (path, model, hash, vector) VALUES (?, ?, ?, ?)",
+                [(path, model, digest, array('f', vector).tobytes())
+                 for path, digest, vector in vectors]
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def _folder_filter(root: Path, recursive: bool,
+                       column: str = 'folder') -> Tuple[str, List[Any]]:
+        """SQL condition selecting notes in a folder (and optionally its subfolders)."""
+        key = str(root)
+        if not recursive:
+            return f"{column} = ?", [key]
+        prefix = os.path.join(key, '')
+        return (f"({column} = ? OR substr({column}, 1, ?) = ?)",
+                [key, len(prefix), prefix])
+
+    def close(self) -> None:
+        """Close the index database."""
+        with self._lock:
+            self._conn.close()
@@ -1,29 +1,356 @@
 """File watcher for automatic PDF processing."""
 
+import json
 import time
+import queue
 import logging
+import itertools
+import threading
 from pathlib import Path
+from datetime import datetime
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, List, Optional, Set, Callable
+import pymupdf
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler, FileCreatedEvent
+from watchdog.events import (
+    FileSystemEventHandler, FileSystemEvent, FileCreatedEvent, FileModifiedEvent, FileMovedEvent
+)
 from .config import Config
 from .pipeline import HedorahPipeline
+from .cache import atomic_write_bytes
 
 logger = logging.getLogger(__name__)
 
 
-class PDFHandler(FileSystemEventHandler):
-    """Handler for PDF file events."""
+@dataclass(order=True)
+class _WorkItem:
+    """A queued PDF; lower priority values are processed first."""
+    priority: int
+    sequence: int
+    pdf_path: Path = field(compare=False)
 
-    def __init__(self, pipeline: HedorahPipeline, skip_experiments: bool = False):
-        """Initialize PDF handler.
+
+@dataclass
+class QueueStatus:
+    """Snapshot of the watcher's work queue."""
+    queued: int
+    in_flight: int
+    completed: int
+    failed: int
+    capacity: int
+    workers: int
+    in_flight_files: List[str] = field(default_factory=list)
+    settling: int = 0  # PDFs still being written
+
+    def format(self) -> str:
+        """Format a one-line status report.
+
+        Returns:
+            Human-readable status string
+        """
+        status = (f"{self.queued}/{self.capacity} queued, {self.in_flight} in flight, "
+                  f"{self.completed} completed, {self.failed} failed")
+        if self.settling:
+            status = f"{self.settling} being written, " + status
+        if self.in_flight_files:
+            status += f" (processing: {', '.join(self.in_flight_files)})"
+        return status
+
+
+class PaperQueue:
+    """Bounded priority queue of PDFs drained by a pool of worker threads.
+
+    A full queue turns producers away instead of blocking them; the write
+    settler holds such PDFs and offers them again, which pushes back on the
+    file observer without piling up unbounded work. Newly dropped PDFs take
+    priority over the backlog found at startup.
+    """
+
+    PRIORITY_NEW = 0
+    PRIORITY_BACKLOG = 1
+
+    def __init__(self, pipeline: HedorahPipeline, skip_experiments: bool = False,
+                 force: bool = False, workers: int = 1, max_size: int = 100):
+        """Initialize paper queue.
 
         Args:
             pipeline: Hedorah pipeline for processing
             skip_experiments: Skip experiment generation
+            force: Reprocess papers that were already processed
+            workers: Number of worker threads
+            max_size: Maximum number of queued PDFs before producers are turned away
         """
         self.pipeline = pipeline
         self.skip_experiments = skip_experiments
-        self.processing = set()  # Track files currently being processed
+        self.force = force
+        self.workers = max(1, workers)
+        self.max_size = max_size
+
+        self._queue: "queue.PriorityQueue[_WorkItem]" = queue.PriorityQueue(maxsize=max_size)
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._pending: Set[Path] = set()  # Queued or in flight
+        self._in_flight: Set[Path] = set()
+        self._completed = 0
+        self._failed = 0
+        self._threads: List[threading.Thread] = []
+        self._stopping = threading.Event()
+
+    def start(self) -> None:
+        """Start the worker threads."""
+        self._stopping.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"hedorah-watch-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """Stop the worker threads after their current paper."""
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def submit(self, pdf_path: Path, priority: int = PRIORITY_NEW) -> bool:
+        """Queue a PDF for processing, without waiting for room in the queue.
+
+        Args:
+            pdf_path: Path to the PDF file
+            priority: PRIORITY_NEW or PRIORITY_BACKLOG
+
+        Returns:
+            True if the PDF is queued or in flight (perhaps already), False
+            if the queue is full and it should be submitted again later
+        """
+        with self._lock:
+            if pdf_path in self._pending:
+                return True
+            self._pending.add(pdf_path)
+
+        item = _WorkItem(priority, next(self._sequence), pdf_path)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self._pending.discard(pdf_path)
+            return False
+        logger.info(f"Queued {pdf_path.name} ({self._queue.qsize()} waiting)")
+        return True
+
+    def status(self) -> QueueStatus:
+        """Get a snapshot of queue and worker state.
+
+        Returns:
+            QueueStatus
+        """
+        with self._lock:
+            return QueueStatus(
+                queued=len(self._pending) - len(self._in_flight),
+                in_flight=len(self._in_flight),
+                completed=self._completed,
+                failed=self._failed,
+                capacity=self.max_size,
+                workers=self.workers,
+                in_flight_files=sorted(p.name for p in self._in_flight),
+            )
+
+    def _worker(self) -> None:
+        """Drain the queue until stopped."""
+        while not self._stopping.is_set():
+            try:
+                item = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                self._process(item)
+            finally:
+                self._queue.task_done()
+
+    def _process(self, item: _WorkItem) -> None:
+        """Process one queued PDF."""
+        file_path = item.pdf_path
+
+        with self._lock:
+            self._in_flight.add(file_path)
+
+        success = False
+        try:
+            print(f"\n📄 Processing: {file_path.name}")
+            created_notes = self.pipeline.process_paper(
+                file_path, self.skip_experiments, self.force
+            )
+            print(f"✅ Successfully processed {file_path.name}")
+            print(f"   Created {len(created_notes)} notes")
+            success = True
+
+        except Exception as e:
+            logger.error(f"Error processing {file_path.name}: {e}", exc_info=True)
+            print(f"❌ Error processing {file_path.name}: {e}")
+
+        finally:
+            with self._lock:
+                self._in_flight.discard(file_path)
+                self._pending.discard(file_path)
+                if success:
+                    self._completed += 1
+                else:
+                    self._failed += 1
+
+
+@dataclass
+class _WriteState:
+    """Observed state of a PDF that may still be being written."""
+    priority: int
+    first_seen: float
+    size: int = -1
+    mtime_ns: int = -1
+    stable_since: float = 0.0
+    ready: bool = False  # Settled and readable, waiting for room in the queue
+    held: bool = False  # Turned away by a full queue at least once
+
+
+class WriteSettler:
+    """Releases PDFs once they have finished being written.
+
+    A PDF is ready when its size and mtime have not changed for
+    ``stable_seconds`` and PyMuPDF can open it. Every new event for a file
+    restarts its stability window, so files copied slowly over a network
+    mount are not parsed half-written, while small files are released as
+    soon as the window has passed.
+    """
+
+    def __init__(self, on_ready: Callable[[Path, int], bool], stable_seconds: float = 2.0,
+                 poll_interval: float = 0.5, timeout: float = 600.0):
+        """Initialize write settler.
+
+        Args:
+            on_ready: Called with (path, priority) once a PDF is ready;
+                returns False to have it offered again on a later poll
+            stable_seconds: How long size and mtime must stay unchanged
+            poll_interval: Seconds between checks
+            timeout: Give up on files that never become readable after this long
+        """
+        self.on_ready = on_ready
+        self.stable_seconds = stable_seconds
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._tracked: Dict[Path, _WriteState] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def start(self) -> None:
+        """Start the polling thread."""
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="hedorah-settler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the polling thread."""
+        self._stopping.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def track(self, pdf_path: Path, priority: int = 0) -> None:
+        """Start (or restart) waiting for a PDF to finish being written.
+
+        Args:
+            pdf_path: Path to the PDF file
+            priority: Queue priority passed to ``on_ready``
+        """
+        now = time.monotonic()
+        with self._lock:
+            state = self._tracked.get(pdf_path)
+            if state is None:
+                self._tracked[pdf_path] = _WriteState(priority, first_seen=now, stable_since=now)
+            else:
+                state.stable_since = now
+                state.ready = False
+
+    @property
+    def pending(self) -> int:
+        """Number of PDFs still waiting to settle."""
+        with self._lock:
+            return len(self._tracked)
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.poll_interval):
+            with self._lock:
+                tracked = list(self._tracked.items())
+
+            for pdf_path, state in tracked:
+                if self._check(pdf_path, state):
+                    with self._lock:
+                        self._tracked.pop(pdf_path, None)
+
+    def _check(self, pdf_path: Path, state: _WriteState) -> bool:
+        """Check one tracked PDF, releasing it if ready.
+
+        Returns:
+            True if the PDF should no longer be tracked
+        """
+        now = time.monotonic()
+        try:
+            stat = pdf_path.stat()
+        except FileNotFoundError:
+            # Renamed away or deleted before it settled
+            return True
+
+        if stat.st_size != state.size or stat.st_mtime_ns != state.mtime_ns:
+            state.size, state.mtime_ns = stat.st_size, stat.st_mtime_ns
+            state.stable_since = now
+            state.ready = False
+            return False
+
+        if now - state.stable_since < self.stable_seconds:
+            return False
+
+        if state.ready or self._can_open(pdf_path):
+            if not state.ready:
+                logger.info(f"{pdf_path.name} is ready ({state.size} bytes, "
+                            f"settled after {now - state.first_seen:.1f}s)")
+                state.ready = True
+            if self.on_ready(pdf_path, state.priority):
+                return True
+            if not state.held:
+                logger.warning(f"Work queue full, holding {pdf_path.name} until there is room")
+                state.held = True
+            return False
+
+        if now - state.first_seen > self.timeout:
+            logger.warning(f"Giving up on {pdf_path.name}: not a readable PDF after "
+                           f"{self.timeout:.0f}s")
+            return True
+
+        # Stable but unreadable: wait for more writes
+        return False
+
+    @staticmethod
+    def _can_open(pdf_path: Path) -> bool:
+        try:
+            with pymupdf.open(pdf_path) as doc:
+                return doc.page_count > 0
+        except Exception:
+            return False
+
+
+class PDFHandler(FileSystemEventHandler):
+    """Handler for PDF file events.
+
+    Only tracks PDFs until they are fully written; processing happens on
+    the queue's worker threads so the observer thread is never blocked by
+    the pipeline.
+    """
+
+    def __init__(self, settler: WriteSettler):
+        """Initialize PDF handler.
+
+        Args:
+            settler: Tracks new PDFs until they are ready to queue
+        """
+        self.settler = settler
 
     def on_created(self, event: FileCreatedEvent):
         """Handle file creation events.
@@ -31,61 +358,76 @@ class PDFHandler(FileSystemEventHandler):
         Args:
             event: File system event
         """
-        if event.is_directory:
-            return
+        self._track(event, event.src_path)
 
-        file_path = Path(event.src_path)
+    def on_modified(self, event: FileModifiedEvent):
+        """Handle file modification events (a PDF still being written).
 
-        # Only process PDF files
-        if file_path.suffix.lower() != '.pdf':
-            return
+        Args:
+            event: File system event
+        """
+        self._track(event, event.src_path)
 
-        # Skip if already processing
-        if file_path in self.processing:
-            return
+    def on_moved(self, event: FileMovedEvent):
+        """Handle rename events.
 
-        # Wait a moment to ensure file is fully written
-        time.sleep(1)
+        Browsers and sync clients write to a temporary name and then
+        rename the finished file to ``.pdf``.
 
-        try:
-            self.processing.add(file_path)
-            logger.info(f"New PDF detected: {file_path.name}")
-            print(f"\n📄 Processing new PDF: {file_path.name}")
+        Args:
+            event: File system event
+        """
+        self._track(event, event.dest_path)
 
-            # Process the paper
-            created_notes = self.pipeline.process_paper(file_path, self.skip_experiments)
+    def _track(self, event: FileSystemEvent, path: str) -> None:
+        if event.is_directory:
+            return
 
-            print(f"✅ Successfully processed {file_path.name}")
-            print(f"   Created {len(created_notes)} notes")
+        file_path = Path(path)
 
-        except Exception as e:
-            logger.error(f"Error processing {file_path.name}: {e}", exc_info=True)
-            print(f"❌ Error processing {file_path.name}: {e}")
+        # Only process PDF files
+        if file_path.suffix.lower() != '.pdf':
+            return
 
-        finally:
-            self.processing.remove(file_path)
+        self.settler.track(file_path, PaperQueue.PRIORITY_NEW)
 
 
 class VaultWatcher:
     """Watches vault inbox for new PDFs."""
 
-    def __init__(self, config: Config, skip_experiments: bool = False):
+    def __init__(self, config: Config, skip_experiments: bool = False,
+                 use_cache: bool = True, force: bool = False):
         """Initialize vault watcher.
 
         Args:
             config: Hedorah configuration
             skip_experiments: Skip experiment generation
+            use_cache: Reuse cached results from previous runs
+            force: Reprocess papers that were already processed
         """
         self.config = config
         self.skip_experiments = skip_experiments
+        self.force = force
         self.inbox_path = config.get_vault_folder('inbox')
+        self.status_path = self.status_file(config)
+        self.status_interval = config.get('watch.interval', 5)
 
         # Ensure inbox exists
         self.inbox_path.mkdir(parents=True, exist_ok=True)
 
-        # Create pipeline and handler
-        self.pipeline = HedorahPipeline(config)
-        self.event_handler = PDFHandler(self.pipeline, skip_experiments)
+        # Create pipeline, work queue and handler
+        self.pipeline = HedorahPipeline(config, use_cache=use_cache)
+        self.paper_queue = PaperQueue(
+            self.pipeline, skip_experiments, force,
+            workers=config.get('watch.workers', 1),
+            max_size=config.get('watch.max_queue', 100)
+        )
+        self.settler = WriteSettler(
+            self.paper_queue.submit,
+            stable_seconds=config.get('watch.settle_seconds', 2),
+            timeout=config.get('watch.settle_timeout', 600)
+        )
+        self.event_handler = PDFHandler(self.settler)
 
         # Create observer
         self.observer = Observer()
@@ -95,19 +437,39 @@ class VaultWatcher:
             recursive=False
         )
 
+    @staticmethod
+    def status_file(config: Config) -> Path:
+        """Get the path of the watcher's status file.
+
+        Args:
+            config: Hedorah configuration
+
+        Returns:
+            Path to the status JSON file
+        """
+        return config.state_dir / 'watch_status.json'
+
     def start(self):
         """Start watching the inbox folder."""
         logger.info(f"Starting watcher on {self.inbox_path}")
 
-        # Process any existing PDFs first
-        self._process_existing_pdfs()
-
-        # Start watching
+        # Start workers and watching, then queue any existing PDFs
+        self.paper_queue.start()
+        self.settler.start()
         self.observer.start()
+        self._queue_existing_pdfs()
+        print(f"\n👁️  Now watching for new PDFs...\n")
 
+        last_status = None
         try:
             while True:
-                time.sleep(1)
+                status = self.paper_queue.status()
+                status.settling = self.settler.pending
+                if status != last_status:
+                    logger.info(f"Watcher status: {status.format()}")
+                    last_status = status
+                self._write_status(status)
+                time.sleep(self.status_interval)
         except KeyboardInterrupt:
             self.stop()
 
@@ -116,26 +478,48 @@ class VaultWatcher:
         logger.info("Stopping watcher")
         self.observer.stop()
         self.observer.join()
+        self.settler.stop()
+        self.paper_queue.stop()
+        self.pipeline.close()
+        try:
+            self.status_path.unlink()
+        except FileNotFoundError:
+            pass
 
-    def _process_existing_pdfs(self):
-        """Process any PDFs already in the inbox."""
+    def _queue_existing_pdfs(self):
+        """Queue any unprocessed PDFs already in the inbox."""
         existing_pdfs = list(self.inbox_path.glob("*.pdf"))
+        if not self.force:
+            existing_pdfs = [p for p in existing_pdfs if not self.pipeline.is_processed(p)]
 
         if existing_pdfs:
-            logger.info(f"Found {len(existing_pdfs)} existing PDFs in inbox")
-            print(f"\n📦 Found {len(existing_pdfs)} existing PDFs in inbox")
+            logger.info(f"Found {len(existing_pdfs)} unprocessed PDFs in inbox")
+            print(f"\n📦 Found {len(existing_pdfs)} unprocessed PDFs in inbox")
 
             for pdf_path in existing_pdfs:
-                try:
-                    print(f"\n📄 Processing: {pdf_path.name}")
-                    created_notes = self.pipeline.process_paper(
-                        pdf_path, self.skip_experiments
-                    )
-                    print(f"✅ Successfully processed {pdf_path.name}")
-                    print(f"   Created {len(created_notes)} notes")
-
-                except Exception as e:
-                    logger.error(f"Error processing {pdf_path.name}: {e}", exc_info=True)
-                    print(f"❌ Error processing {pdf_path.name}: {e}")
-
-            print(f"\n👁️  Now watching for new PDFs...\n")
+                self.settler.track(pdf_path, PaperQueue.PRIORITY_BACKLOG)
+
+    def _write_status(self, status: QueueStatus) -> None:
+        """Write the queue status for `hedorah status`."""
+        payload: Dict[str, Any] = asdict(status)
+        payload['inbox'] = str(self.inbox_path)
+        payload['updated'] = datetime.now().isoformat()
+        try:
+            atomic_write_bytes(self.status_path, json.dumps(payload, indent=2).encode('utf-8'))
+        except OSError as e:
+            logger.debug(f"Could not write watcher status: {e}")
+
+
+def read_watch_status(config: Config) -> Optional[Dict[str, Any]]:
+    """Read the status last written by a running watcher.
+
+    Args:
+        config: Hedorah configuration
+
+    Returns:
+        Status dict, or None if no watcher is running
+    """
+    status_path = VaultWatcher.status_file(config)
+    if not status_path.exists():
+        return None
+    return json.loads(status_path.read_text(encoding='utf-8'))
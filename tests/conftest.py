@@ -0,0 +1,65 @@
+"""Shared fixtures for the Hedorah test suite."""
+
+from pathlib import Path
+from typing import Any, Callable, Dict
+import pytest
+import yaml
+
+from hedorah.config import Config
+
+
+def _merge(base: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Recursively merge ``overrides`` into ``base``."""
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _merge(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+
+@pytest.fixture
+def vault(tmp_path: Path) -> Path:
+    """An empty vault directory."""
+    path = tmp_path / 'vault'
+    path.mkdir()
+    return path
+
+
+@pytest.fixture
+def make_config(tmp_path: Path, vault: Path) -> Callable[..., Config]:
+    """Build a Config from a minimal config.yaml plus overrides."""
+    def make(overrides: Dict[str, Any] = None) -> Config:
+        data = _merge({
+            'vault': {'path': str(vault)},
+            'llm': {
+                'local': {'model': 'qwen2.5:latest', 'api_url': 'http://127.0.0.1:9'},
+                'reasoning': {'provider': 'anthropic', 'model': 'claude-sonnet-4-5-20250929',
+                              'api_key': 'test-key'},
+            },
+        }, overrides or {})
+        config_path = tmp_path / 'config.yaml'
+        config_path.write_text(yaml.safe_dump(data))
+        return Config(str(config_path))
+    return make
+
+
+@pytest.fixture
+def sample_pdf(tmp_path: Path) -> Path:
+    """A small three-page paper with sections, an equation and citations."""
+    import pymupdf
+
+    pages = [
+        "A Study of Sparse Features\n\nAbstract\nWe study sparse features in language models.\n"
+        "1 Introduction\nFeatures are directions [1].",
+        "2 Methods\nWe train sparse autoencoders (Smith et al., 2023).\n$$x = Wf + b$$",
+        "3 Results\nFeatures are interpretable [2].\nReferences\n[1] A. Author. 2022.",
+    ]
+    doc = pymupdf.open()
+    for text in pages:
+        page = doc.new_page()
+        page.insert_text((72, 72), text)
+    path = tmp_path / 'paper.pdf'
+    doc.save(path)
+    doc.close()
+    return path
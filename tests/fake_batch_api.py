@@ -0,0 +1,194 @@
+"""Local fake of the Anthropic Message Batches and OpenAI Batch APIs.
+
+Serves just enough of both APIs for the official SDKs, pointed at it via
+``deferred.base_url``, to submit a batch, poll it and download its results.
+Each request's response text comes from a ``respond(custom_id)`` callback;
+individual requests can be made to fail and whole OpenAI batches to expire.
+"""
+
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+
+class FakeBatchAPI:
+    """In-process HTTP server faking the provider batch APIs."""
+
+    def __init__(self, respond: Callable[[str], str], polls_until_done: int = 1):
+        """Start the server.
+
+        Args:
+            respond: Response text for a request, by custom id
+            polls_until_done: Status checks a job stays in progress for
+        """
+        self.respond = respond
+        self.polls_until_done = polls_until_done
+        self.failures: Dict[str, str] = {}  # custom_id -> 'errored' / 'expired'
+        self.expire_batches = False  # OpenAI: batches end 'expired' with no output
+        self.jobs: Dict[str, Dict] = {}  # job id -> {'custom_ids': [...], 'polls': n}
+        self._files: Dict[str, List[str]] = {}  # OpenAI input file id -> custom ids
+        self._lock = threading.Lock()
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop the server."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    @property
+    def submitted(self) -> List[List[str]]:
+        """Custom ids of each submitted job, in submission order."""
+        return [job['custom_ids'] for job in self.jobs.values()]
+
+    def _new_job(self, custom_ids: List[str]) -> str:
+        with self._lock:
+            job_id = f"batch_{len(self.jobs) + 1}"
+            self.jobs[job_id] = {'custom_ids': custom_ids, 'polls': 0}
+        return job_id
+
+    def _poll(self, job_id: str) -> bool:
+        """Count a status check; True once the job has finished."""
+        with self._lock:
+            job = self.jobs[job_id]
+            job['polls'] += 1
+            return job['polls'] >= self.polls_until_done
+
+    # Anthropic Message Batches
+
+    def _anthropic_batch(self, job_id: str, ended: bool) -> Dict:
+        return {
+            'id': job_id, 'type': 'message_batch',
+            'processing_status': 'ended' if ended else 'in_progress',
+            'request_counts': {'processing': 0, 'succeeded': 0, 'errored': 0,
+                               'canceled': 0, 'expired': 0},
+            'created_at': '2026-01-01T00:00:00Z', 'expires_at': '2026-01-02T00:00:00Z',
+            'ended_at': '2026-01-01T01:00:00Z' if ended else None,
+            'cancel_initiated_at': None, 'archived_at': None,
+            'results_url': f"{self.url}/v1/messages/batches/{job_id}/results" if ended else None,
+        }
+
+    def _anthropic_result(self, custom_id: str) -> Dict:
+        failure = self.failures.get(custom_id)
+        if failure == 'errored':
+            result = {'type': 'errored',
+                      'error': {'type': 'error',
+                                'error': {'type': 'api_error', 'message': 'Internal error'}}}
+        elif failure:
+            result = {'type': failure}
+        else:
+            result = {'type': 'succeeded', 'message': {
+                'id': f"msg_{custom_id}", 'type': 'message', 'role': 'assistant',
+                'model': 'claude-sonnet-4-5-20250929', 'stop_reason': 'end_turn',
+                'stop_sequence': None,
+                'content': [{'type': 'text', 'text': self.respond(custom_id)}],
+                'usage': {'input_tokens': 10, 'output_tokens': 10},
+            }}
+        return {'custom_id': custom_id, 'result': result}
+
+    # OpenAI Batch API
+
+    def _openai_batch(self, job_id: str, finished: bool) -> Dict:
+        status = 'in_progress'
+        if finished:
+            status = 'expired' if self.expire_batches else 'completed'
+        return {
+            'id': job_id, 'object': 'batch', 'endpoint': '/v1/chat/completions',
+            'input_file_id': f"file-in-{job_id}", 'completion_window': '24h',
+            'status': status, 'created_at': 0,
+            'output_file_id': f"file-out-{job_id}" if status == 'completed' else None,
+        }
+
+    def _openai_result(self, custom_id: str) -> Dict:
+        if custom_id in self.failures:
+            return {'id': f"req_{custom_id}", 'custom_id': custom_id,
+                    'response': {'status_code': 500, 'request_id': 'req', 'body': {}},
+                    'error': {'code': 'server_error', 'message': 'Internal error'}}
+        return {'id': f"req_{custom_id}", 'custom_id': custom_id, 'error': None,
+                'response': {'status_code': 200, 'request_id': 'req', 'body': {
+                    'id': 'chatcmpl', 'object': 'chat.completion', 'created': 0,
+                    'model': 'gpt-4o',
+                    'choices': [{'index': 0, 'finish_reason': 'stop',
+                                 'message': {'role': 'assistant',
+                                             'content': self.respond(custom_id)}}],
+                }}}
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, payload, content_type: str = 'application/json') -> None:
+                body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+            def do_POST(self):
+                body = self._body()
+                if self.path == '/v1/messages/batches':
+                    requests = json.loads(body)['requests']
+                    job_id = api._new_job([request['custom_id'] for request in requests])
+                    self._send(api._anthropic_batch(job_id, ended=False))
+                elif self.path == '/v1/files':
+                    # The JSONL input file is one part of a multipart body
+                    custom_ids = [json.loads(line)['custom_id']
+                                  for line in body.decode().splitlines()
+                                  if line.startswith('{"custom_id"')]
+                    file_id = f"file-{len(api._files) + 1}"
+                    api._files[file_id] = custom_ids
+                    self._send({'id': file_id, 'object': 'file', 'bytes': len(body),
+                                'created_at': 0, 'filename': 'hedorah-batch.jsonl',
+                                'purpose': 'batch', 'status': 'processed'})
+                elif self.path == '/v1/batches':
+                    file_id = json.loads(body)['input_file_id']
+                    job_id = api._new_job(api._files[file_id])
+                    self._send(api._openai_batch(job_id, finished=False))
+                else:
+                    self.send_error(404)
+
+            def do_GET(self):
+                match = re.fullmatch(r'/v1/messages/batches/(\w+)(/results)?', self.path)
+                if match:
+                    job_id, results = match.groups()
+                    if results:
+                        lines = [json.dumps(api._anthropic_result(custom_id))
+                                 for custom_id in api.jobs[job_id]['custom_ids']]
+                        self._send('\n'.join(lines).encode(), 'application/x-jsonl')
+                    else:
+                        self._send(api._anthropic_batch(job_id, ended=api._poll(job_id)))
+                    return
+
+                match = re.fullmatch(r'/v1/batches/(\w+)', self.path)
+                if match:
+                    job_id = match.group(1)
+                    self._send(api._openai_batch(job_id, finished=api._poll(job_id)))
+                    return
+
+                match = re.fullmatch(r'/v1/files/file-out-(\w+)/content', self.path)
+                if match:
+                    lines = [json.dumps(api._openai_result(custom_id))
+                             for custom_id in api.jobs[match.group(1)]['custom_ids']]
+                    self._send('\n'.join(lines).encode(), 'application/jsonl')
+                    return
+
+                self.send_error(404)
+
+        return Handler
+
+
+def custom_id_stage(custom_id: str) -> Optional[str]:
+    """Get the stage ('analysis' or 'experiments') a custom id is for."""
+    return custom_id.rsplit('-', 1)[1] if '-' in custom_id else None
@@ -0,0 +1,19 @@
+"""Rate-limited reasoning client lifecycle."""
+
+import pytest
+
+from hedorah.llm import create_reasoning_client
+
+RATE_LIMITS = {'requests_per_minute': 50, 'input_tokens_per_minute': 30000}
+
+
+@pytest.mark.parametrize('provider', ['anthropic', 'openai'])
+def test_close_closes_the_sdk_client_and_the_loop(make_config, provider):
+    client = create_reasoning_client(make_config({
+        'llm': {'reasoning': {'provider': provider, 'rate_limits': RATE_LIMITS}}}))
+    assert client.input_budget == client.async_client.input_budget
+
+    client.close()
+    assert client.async_client.client.is_closed()
+    assert not client._thread.is_alive()
+    client.close()
@@ -0,0 +1,80 @@
+"""Attachment reference counting and garbage collection."""
+
+import os
+import time
+from pathlib import Path
+import pytest
+from click.testing import CliRunner
+
+import hedorah.config
+from hedorah.attachments import AttachmentIndex, store_attachment
+from hedorah.checkpoint import CheckpointStore
+from hedorah.cli import main
+from hedorah.pdf_processor import Figure, PDFProcessor
+
+
+def store_old(directory: Path, data: bytes) -> Path:
+    """Store an attachment last modified well outside the gc grace period."""
+    path = store_attachment(directory, data, 'png')
+    old = time.time() - 7 * 86400
+    os.utime(path, (old, old))
+    return path
+
+
+def run_gc(config_path: Path, monkeypatch, *args: str) -> str:
+    """Run ``hedorah gc`` and return its output."""
+    monkeypatch.setattr(hedorah.config, '_config_instance', None)
+    result = CliRunner().invoke(main, ['gc', '-c', str(config_path), *args])
+    assert result.exit_code == 0, result.output
+    return result.output
+
+
+def test_gc_keeps_referenced_and_pending_figures(make_config, tmp_path, sample_pdf, monkeypatch):
+    config = make_config()
+    attachments_dir = config.get_vault_folder('attachments')
+    referenced = store_old(attachments_dir, b'referenced')
+    pending = store_old(attachments_dir, b'pending')
+    orphan = store_old(attachments_dir, b'orphan')
+    user_file = attachments_dir / 'my-diagram.png'
+    user_file.write_bytes(b'mine')
+
+    note = config.vault_path / 'paper.md'
+    note.write_text(f"![[{referenced.name}]]", encoding='utf-8')
+    index = AttachmentIndex(config.state_dir / 'attachments.db', attachments_dir, config.vault_path)
+    index.set_refs(note, [referenced])
+    index.close()
+
+    # A paper interrupted after extraction: its figures have no note yet
+    checkpoint = CheckpointStore(config.state_dir / 'work').for_paper(sample_pdf, False, 'digest')
+    with PDFProcessor(extract_figures=False).process(sample_pdf) as content:
+        content = content.materialize()
+    content.figures = [Figure(1, '', pending, 1)]
+    checkpoint.save('content', content)
+
+    config_path = tmp_path / 'config.yaml'
+    output = run_gc(config_path, monkeypatch, '--dry-run')
+    assert orphan.name in output
+    assert pending.name not in output and referenced.name not in output
+    assert orphan.exists()
+
+    run_gc(config_path, monkeypatch)
+    assert not orphan.exists()
+    assert referenced.exists() and pending.exists() and user_file.exists()
+
+    # Once the paper is finished and its note deleted, its figures are orphans
+    checkpoint.complete()
+    run_gc(config_path, monkeypatch)
+    assert not pending.exists()
+
+
+def test_gc_grace_period_protects_new_figures(tmp_path):
+    attachments_dir = tmp_path / 'attachments'
+    index = AttachmentIndex(tmp_path / 'attachments.db', attachments_dir, tmp_path)
+    fresh = store_attachment(attachments_dir, b'fresh', 'png')
+    old = store_old(attachments_dir, b'old')
+
+    assert index.gc(grace_seconds=3600) == [old]
+    assert fresh.exists()
+    assert index.gc(grace_seconds=0, live=[fresh.name]) == []
+    assert index.gc(grace_seconds=0) == [fresh]
+    index.close()
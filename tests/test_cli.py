@@ -0,0 +1,28 @@
+"""Command-line entry points."""
+
+import pytest
+from click.testing import CliRunner
+
+import hedorah.config
+from hedorah.cli import main
+from hedorah.pipeline import HedorahPipeline
+
+
+def fail(*args, **kwargs):
+    raise RuntimeError('provider down')
+
+
+@pytest.mark.parametrize('command', ['process', 'batch', 'resume'])
+def test_commands_close_their_pipeline(make_config, tmp_path, sample_pdf, monkeypatch, command):
+    make_config({'logging': {'file': str(tmp_path / 'hedorah.log')}})
+    monkeypatch.setattr(hedorah.config, '_config_instance', None)
+    closed = []
+    close = HedorahPipeline.close
+    monkeypatch.setattr(HedorahPipeline, 'close', lambda self: closed.append(self) or close(self))
+    # Every paper fails, so the commands exit with an error
+    monkeypatch.setattr(HedorahPipeline, '_run_steps', fail)
+
+    args = {'process': [str(sample_pdf)], 'batch': [str(tmp_path)], 'resume': []}[command]
+    result = CliRunner().invoke(main, [command, *args, '-c', str(tmp_path / 'config.yaml')])
+
+    assert len(closed) == 1, result.output
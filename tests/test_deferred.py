@@ -0,0 +1,228 @@
+"""Deferred batch mode against a local fake of the provider batch APIs."""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+import pymupdf
+import pytest
+
+from hedorah.deferred import DeferredBatch, DeferredJobStore, create_batch_backend
+from hedorah.pdf_processor import Figure, PDFProcessor
+from hedorah.pipeline import HedorahPipeline
+from tests.fake_batch_api import FakeBatchAPI, custom_id_stage
+from tests.test_attachments import run_gc, store_old
+
+TITLES = ['Sparse Features in Transformers', 'Induction Heads Revisited', 'Steering Vectors at Scale']
+
+SUMMARY = {'tags': ['interpretability'], 'core_claims': ['A claim.'], 'limitations': []}
+
+
+def respond(custom_id: str) -> str:
+    """Canned model output; experiment titles carry the request's custom id."""
+    if custom_id_stage(custom_id) == 'analysis':
+        return json.dumps({'key_insights': [], 'connections': [], 'research_gaps': [],
+                           'questions': [f"Question for {custom_id}"]})
+    return json.dumps({'experiments': [{'title': f"Experiment {custom_id[:12]}",
+                                        'hypothesis': 'It works.'}]})
+
+
+@pytest.fixture
+def api():
+    fake = FakeBatchAPI(respond)
+    yield fake
+    fake.close()
+
+
+@pytest.fixture
+def papers(tmp_path: Path) -> List[Path]:
+    """Three distinct papers."""
+    inbox = tmp_path / 'inbox'
+    inbox.mkdir()
+    paths = []
+    for i, title in enumerate(TITLES):
+        doc = pymupdf.open()
+        page = doc.new_page()
+        page.insert_text((72, 72), f"{title}\n\nAbstract\nPaper number {i}.\n1 Introduction\nText.")
+        path = inbox / f"paper_{i}.pdf"
+        doc.save(path)
+        doc.close()
+        paths.append(path)
+    return paths
+
+
+def make_pipeline(make_config, tmp_path: Path, api: FakeBatchAPI, provider: str,
+                  papers: List[Path]) -> HedorahPipeline:
+    """Pipeline whose papers already have their local stages checkpointed."""
+    base_url = api.url if provider == 'anthropic' else f"{api.url}/v1"
+    config = make_config({
+        'llm': {'reasoning': {'provider': provider,
+                              'model': 'claude-sonnet-4-5-20250929' if provider == 'anthropic' else 'gpt-4o'}},
+        'deferred': {'base_url': base_url},
+        'logging': {'file': str(tmp_path / 'hedorah.log')},
+    })
+    pipeline = HedorahPipeline(config)
+
+    # The local model is not under test: seed content, figures and summary
+    processor = PDFProcessor(extract_figures=False)
+    for pdf in papers:
+        checkpoint = pipeline.checkpoints.for_paper(pdf, False, pipeline.ledger.digest(pdf))
+        with processor.process(pdf) as content:
+            checkpoint.save('content', content.materialize())
+        checkpoint.save('figures', [])
+        checkpoint.save('summary', SUMMARY)
+    return pipeline
+
+
+def custom_id(pipeline: HedorahPipeline, pdf: Path, stage: str) -> str:
+    return f"{pipeline.ledger.digest(pdf)[:32]}-{stage}"
+
+
+@pytest.mark.parametrize('provider', ['anthropic', 'openai'])
+def test_submit_poll_collect_and_follow_up(make_config, tmp_path, api, papers, provider):
+    pipeline = make_pipeline(make_config, tmp_path, api, provider, papers)
+    runner = DeferredBatch(pipeline, create_batch_backend(pipeline.config, pipeline.reasoning_client),
+                           poll_interval=0)
+
+    results = runner.run(papers)
+
+    # Analyses go out as one job, then experiments as a follow-up job
+    assert api.submitted == [[custom_id(pipeline, pdf, 'analysis') for pdf in papers],
+                             [custom_id(pipeline, pdf, 'experiments') for pdf in papers]]
+
+    # Every response landed on the paper its custom id belongs to
+    for pdf, title in zip(papers, TITLES):
+        notes = results[pdf.name]
+        prefix = custom_id(pipeline, pdf, 'experiments')[:12]
+        assert notes['experiment_1'].name == f"Experiment-{prefix}.md"
+        assert title in notes['experiment_1'].read_text(encoding='utf-8')
+        assert title in notes['paper'].read_text(encoding='utf-8')
+        assert pipeline.ledger.is_done(pipeline.ledger.digest(pdf))
+
+    assert runner.store.load() == []
+    assert pipeline.checkpoints.pending() == []
+
+
+@pytest.mark.parametrize('provider, failure', [('anthropic', 'errored'), ('anthropic', 'expired'),
+                                               ('openai', 'errored')])
+def test_failed_requests_fail_only_their_papers(make_config, tmp_path, api, papers,
+                                                provider, failure):
+    pipeline = make_pipeline(make_config, tmp_path, api, provider, papers)
+    api.failures[custom_id(pipeline, papers[0], 'analysis')] = failure
+    api.failures[custom_id(pipeline, papers[1], 'experiments')] = failure
+    runner = DeferredBatch(pipeline, create_batch_backend(pipeline.config, pipeline.reasoning_client),
+                           poll_interval=0)
+
+    results = runner.run(papers)
+
+    # The paper whose analysis failed gets no follow-up request
+    assert custom_id(pipeline, papers[0], 'experiments') not in api.submitted[1]
+    for pdf in papers[:2]:
+        assert 'did not succeed' in results[pdf.name]['error']
+        assert not pipeline.ledger.is_done(pipeline.ledger.digest(pdf))
+    assert 'experiment_1' in results[papers[2].name]
+    assert runner.store.load() == []
+
+
+def test_expired_openai_batch_fails_all_its_papers(make_config, tmp_path, api, papers):
+    pipeline = make_pipeline(make_config, tmp_path, api, 'openai', papers)
+    api.expire_batches = True
+    runner = DeferredBatch(pipeline, create_batch_backend(pipeline.config, pipeline.reasoning_client),
+                           poll_interval=0)
+
+    results = runner.run(papers)
+
+    assert len(api.submitted) == 1
+    assert all('did not succeed' in results[pdf.name]['error'] for pdf in papers)
+    assert runner.store.load() == []
+
+
+@pytest.mark.parametrize('provider', ['anthropic', 'openai'])
+def test_resume_all_skips_papers_waiting_on_a_job(make_config, tmp_path, api, papers, provider):
+    pipeline = make_pipeline(make_config, tmp_path, api, provider, papers)
+    api.polls_until_done = 10 ** 6
+    runner = DeferredBatch(pipeline, create_batch_backend(pipeline.config, pipeline.reasoning_client),
+                           poll_interval=0)
+
+    runner.run(papers, wait=False)
+
+    store = DeferredJobStore(pipeline.config.state_dir / 'deferred.json')
+    assert store.pending_digests() == {pipeline.ledger.digest(pdf) for pdf in papers}
+    assert len(pipeline.checkpoints.pending()) == len(papers)
+    assert pipeline.resume_all() == {}
+    assert len(api.submitted) == 1
+
+
+def test_gc_keeps_figures_of_papers_waiting_on_a_job(make_config, tmp_path, api, papers,
+                                                     monkeypatch):
+    pipeline = make_pipeline(make_config, tmp_path, api, 'anthropic', papers)
+    api.polls_until_done = 10 ** 6
+    attachments_dir = pipeline.config.get_vault_folder('attachments')
+    figure = store_old(attachments_dir, b'figure of a pending paper')
+    orphan = store_old(attachments_dir, b'orphan')
+
+    checkpoint = pipeline.checkpoints.for_paper(papers[0], False, pipeline.ledger.digest(papers[0]))
+    content = checkpoint.load('content')
+    content.figures = [Figure(1, 'Figure 1: Features.', figure, 1)]
+    checkpoint.save('content', content)
+
+    runner = DeferredBatch(pipeline, create_batch_backend(pipeline.config, pipeline.reasoning_client),
+                           poll_interval=0)
+    runner.run(papers, wait=False)
+    assert runner.store.pending_digests()
+
+    run_gc(tmp_path / 'config.yaml', monkeypatch)
+    assert figure.exists()
+    assert not orphan.exists()
+
+
+def test_job_interrupted_mid_submission_stays_recorded(make_config, tmp_path, api, papers):
+    pipeline = make_pipeline(make_config, tmp_path, api, 'anthropic', papers)
+    backend = create_batch_backend(pipeline.config, pipeline.reasoning_client)
+    submit = backend.submit
+
+    def submit_then_crash(requests):
+        submit(requests)
+        raise KeyboardInterrupt
+
+    backend.submit = submit_then_crash
+    runner = DeferredBatch(pipeline, backend, poll_interval=0)
+    with pytest.raises(KeyboardInterrupt):
+        runner.run(papers)
+
+    # The provider has the job; its papers are not resubmitted
+    job, = runner.store.load()
+    assert job['id'] is None and job['status'] == 'submitting'
+    assert [entry['custom_id'] for entry in job['requests']] == api.submitted[0]
+    assert pipeline.resume_all() == {}
+    backend.submit = submit
+    runner.run(papers)
+    assert len(api.submitted) == 1
+
+
+def test_failed_submission_leaves_no_record(make_config, tmp_path, api, papers):
+    pipeline = make_pipeline(make_config, tmp_path, api, 'anthropic', papers)
+    backend = create_batch_backend(pipeline.config, pipeline.reasoning_client)
+
+    def reject(requests):
+        raise RuntimeError('invalid request')
+
+    backend.submit = reject
+    runner = DeferredBatch(pipeline, backend, poll_interval=0)
+    with pytest.raises(RuntimeError):
+        runner.run(papers)
+    assert runner.store.load() == []
+
+
+def test_concurrent_store_updates_are_not_lost(tmp_path):
+    path = tmp_path / 'deferred.json'
+
+    def add_jobs(worker):
+        store = DeferredJobStore(path)
+        for i in range(20):
+            with store.update() as jobs:
+                jobs.append({'id': f"{worker}-{i}", 'requests': []})
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(add_jobs, range(4)))
+    assert len(DeferredJobStore(path).load()) == 80
@@ -0,0 +1,50 @@
+"""The sync and async Gemini clients must send the same prompt."""
+
+import asyncio
+from types import SimpleNamespace
+import pytest
+
+from hedorah.llm import GeminiClient, gemini_prompt
+from hedorah.async_llm import AsyncGeminiClient
+
+
+@pytest.fixture
+def config(make_config):
+    return make_config({'llm': {'reasoning': {'provider': 'gemini', 'model': 'gemini-1.5-pro'}}})
+
+
+def test_gemini_prompt_keeps_system_context_and_prompt_in_order():
+    assert gemini_prompt('paper', 'system', 'notes') == 'system\n\nnotes\n\npaper'
+    assert gemini_prompt('paper', None, 'notes') == 'notes\n\npaper'
+    assert gemini_prompt('paper', 'system', None) == 'system\n\npaper'
+
+
+@pytest.mark.parametrize('system, context', [
+    ('You are a researcher.', 'Your notes: sparse autoencoders'),
+    ('You are a researcher.', None),
+    (None, 'Your notes: sparse autoencoders'),
+    (None, None),
+])
+def test_sync_and_async_clients_send_the_same_prompt(config, system, context):
+    sent = {}
+    response = SimpleNamespace(text='ok', usage_metadata=None)
+
+    def generate_content(prompt, **kwargs):
+        sent['sync'] = prompt
+        return response
+
+    async def generate_content_async(prompt, **kwargs):
+        sent['async'] = prompt
+        return response
+
+    sync_client = GeminiClient(config)
+    sync_client.model = SimpleNamespace(generate_content=generate_content)
+    async_client = AsyncGeminiClient(config)
+    async_client.client = SimpleNamespace(generate_content_async=generate_content_async)
+
+    sync_client._generate('Analyze this paper.', system=system, context=context)
+    asyncio.run(async_client._generate('Analyze this paper.', system=system, context=context))
+
+    assert sent['sync'] == sent['async'] == gemini_prompt('Analyze this paper.', system, context)
+    if context:
+        assert context in sent['async']
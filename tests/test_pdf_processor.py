@@ -0,0 +1,75 @@
+"""Lazy extraction and the extraction cache."""
+
+import pickle
+import pytest
+
+import hedorah.cache
+from hedorah.cache import ExtractionCache, file_digest
+from hedorah.pdf_processor import PDFProcessor
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ExtractionCache(tmp_path / 'cache')
+
+
+def test_lazy_content_matches_materialized_content(sample_pdf):
+    processor = PDFProcessor(extract_figures=False)
+    with processor.process(sample_pdf) as lazy:
+        assert lazy.title == 'A Study of Sparse Features'
+        eager = processor.process(sample_pdf).materialize()
+        assert lazy == eager
+        assert list(lazy.sections) == ['Abstract', 'Introduction', 'Methods', 'Results', 'References']
+        assert lazy.section_pages['Methods'] == (2, 2)
+        assert lazy.section_pages['Results'] == (3, 3)
+
+
+def test_reading_after_close_raises(sample_pdf):
+    content = PDFProcessor(extract_figures=False).process(sample_pdf)
+    content.close()
+    with pytest.raises(ValueError, match='closed'):
+        content.full_text
+
+
+def test_partially_read_content_is_cached_on_close(sample_pdf, cache):
+    processor = PDFProcessor(extract_figures=False, cache=cache)
+
+    with processor.process(sample_pdf) as content:
+        title = content.title  # Never reads citations or section_pages
+    assert len(list(cache.cache_dir.glob('*.pkl'))) == 1
+
+    key = cache.key(sample_pdf, processor.cache_options())
+    cached = cache.get(key)
+    assert cached.__dict__['title'] == title
+    assert 'citations' not in cached.__dict__
+
+    # A hit extracts the missing fields on demand and caches them on close
+    with processor.process(sample_pdf) as content:
+        assert content.title == title
+        assert len(content.citations) > 0
+    assert 'citations' in cache.get(key).__dict__
+
+
+def test_known_digest_is_not_hashed_again(sample_pdf, cache, monkeypatch):
+    processor = PDFProcessor(extract_figures=False, cache=cache)
+    digest = file_digest(sample_pdf)
+    with processor.process(sample_pdf, digest=digest) as content:
+        content.title
+
+    hashed = []
+    monkeypatch.setattr(hedorah.cache, 'file_digest', lambda path: hashed.append(path))
+    with processor.process(sample_pdf, digest=digest) as content:
+        assert content.title == 'A Study of Sparse Features'
+    assert hashed == []
+
+
+def test_pickling_keeps_extracted_fields_and_attach_extracts_the_rest(sample_pdf):
+    processor = PDFProcessor(extract_figures=False)
+    with processor.process(sample_pdf) as content:
+        content.title
+        restored = pickle.loads(pickle.dumps(content))
+    assert '_source' not in restored.__dict__
+    assert 'sections' not in restored.__dict__
+
+    with processor.attach(restored, sample_pdf) as restored:
+        assert restored.full_text and restored.sections and restored.metadata['page_count'] == 3
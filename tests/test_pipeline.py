@@ -0,0 +1,60 @@
+"""Per-paper step graph: lazy content and checkpoints."""
+
+import pytest
+
+from hedorah.pipeline import HedorahPipeline
+
+SUMMARY = {'tags': ['interpretability'], 'core_claims': ['A claim.'], 'limitations': []}
+
+ANALYSIS = {'key_insights': [], 'connections': [], 'research_gaps': [], 'questions': []}
+
+
+@pytest.fixture
+def pipeline(make_config, tmp_path):
+    """Pipeline whose model steps read only the title."""
+    pipeline = HedorahPipeline(make_config({'logging': {'file': str(tmp_path / 'hedorah.log')}}))
+    pipeline.opened = []
+
+    def summarize(content):
+        pipeline.opened.append(content)
+        assert content.title
+        return SUMMARY
+
+    pipeline.summarize = summarize
+    pipeline.analyze = lambda content, summary, user_notes: ANALYSIS
+    pipeline.generate_experiments = lambda content, analysis, skip: []
+    yield pipeline
+    pipeline.close()
+
+
+def test_unread_fields_are_never_extracted(pipeline, sample_pdf):
+    notes = pipeline.process_paper(sample_pdf)
+
+    assert notes['paper'].exists()
+    content = pipeline.opened[0]
+    assert 'title' in content.__dict__
+    assert 'sections' not in content.__dict__ and 'citations' not in content.__dict__
+
+
+def test_interrupted_paper_resumes_from_partial_content(pipeline, sample_pdf):
+    def fail(content, summary, user_notes):
+        raise RuntimeError('provider down')
+
+    pipeline.analyze = fail
+    with pytest.raises(RuntimeError):
+        pipeline.process_paper(sample_pdf)
+
+    # Only what was read got extracted and checkpointed
+    checkpoint, = pipeline.checkpoints.pending()
+    saved = checkpoint.load('content')
+    assert saved.title == 'A Study of Sparse Features'
+    assert 'sections' not in saved.__dict__
+
+    # The resumed run extracts the rest from the PDF when it is read
+    sections = []
+    pipeline.analyze = lambda content, summary, user_notes: sections.append(
+        list(content.sections)) or ANALYSIS
+    pipeline.resume_paper(checkpoint)
+
+    assert sections == [['Abstract', 'Introduction', 'Methods', 'Results', 'References']]
+    assert pipeline.checkpoints.pending() == []
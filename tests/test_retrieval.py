@@ -0,0 +1,74 @@
+"""Note retrieval by embedding similarity."""
+
+from pathlib import Path
+from typing import List
+import pytest
+
+from hedorah.retrieval import NoteRetriever
+from hedorah.vault import VaultReader
+
+TOPICS = ['sparse autoencoders', 'induction heads', 'steering vectors', 'circuit discovery']
+
+
+class FakeOllama:
+    """Embeds text as letter counts and records each request."""
+
+    def __init__(self):
+        self.requests: List[List[str]] = []
+
+    def embed(self, texts: List[str], model: str) -> List[List[float]]:
+        self.requests.append(texts)
+        return [[float(text.lower().count(letter)) for letter in 'abcdefghijklmnopqrstuvwxyz']
+                for text in texts]
+
+
+@pytest.fixture
+def notes_dir(vault: Path) -> Path:
+    folder = vault / 'notes'
+    folder.mkdir()
+    for i in range(10):
+        topic = TOPICS[i % len(TOPICS)]
+        (folder / f"note{i}.md").write_text(f"# {topic} {i}\nNotes on {topic}.", encoding='utf-8')
+    return folder
+
+
+def make_retriever(vault: Path, notes_dir: Path, ollama: FakeOllama) -> NoteRetriever:
+    reader = VaultReader(vault, vault / '.hedorah' / 'vault.db')
+    return NoteRetriever(reader, notes_dir, method='embeddings', top_k=3, ollama=ollama,
+                         embedding_model='nomic-embed-text', embedding_batch_size=4)
+
+
+def test_embeddings_are_batched_and_persisted(vault, notes_dir):
+    ollama = FakeOllama()
+    retriever = make_retriever(vault, notes_dir, ollama)
+
+    selected = retriever.retrieve('induction heads')
+    assert selected[0]['title'].startswith('induction heads')
+    # Ten notes in batches of at most four, then the query
+    assert [len(texts) for texts in ollama.requests] == [4, 4, 2, 1]
+
+    # A new process reuses the stored vectors
+    ollama = FakeOllama()
+    retriever = make_retriever(vault, notes_dir, ollama)
+    assert retriever.retrieve('induction heads') == selected
+    assert ollama.requests == [['induction heads']]
+
+    # Only the edited note is embedded again
+    (notes_dir / 'note0.md').write_text('# induction heads revisited\nMore on induction heads.',
+                                        encoding='utf-8')
+    ollama.requests.clear()
+    retriever.retrieve('induction heads')
+    assert len(ollama.requests) == 2
+    assert ollama.requests[0][0].startswith('induction heads revisited')
+
+
+def test_removed_notes_drop_their_stored_embeddings(vault, notes_dir):
+    retriever = make_retriever(vault, notes_dir, FakeOllama())
+    retriever.retrieve('steering')
+
+    (notes_dir / 'note2.md').unlink()
+    retriever.retrieve('steering')
+
+    stored = retriever.vault_reader.index.embeddings('nomic-embed-text')
+    assert len(stored) == 9
+    assert str(notes_dir.resolve() / 'note2.md') not in stored
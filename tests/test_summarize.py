@@ -0,0 +1,97 @@
+"""Local-model summary settings and client lifecycle."""
+
+import pymupdf
+import pytest
+import requests
+
+from hedorah.cache import MemoryResponseCache
+
+from hedorah.llm import OllamaClient, SUMMARY_OUTPUT_TOKENS
+from hedorah.pdf_processor import PDFProcessor
+
+
+@pytest.fixture
+def long_content(tmp_path):
+    """A paper several times longer than a 300-token budget."""
+    doc = pymupdf.open()
+    for heading in ['1 Introduction', '2 Methods', '3 Results']:
+        page = doc.new_page()
+        lines = [heading] + [f"Sentence {i} about sparse features." for i in range(40)]
+        page.insert_text((72, 72), '\n'.join(lines), fontsize=8)
+    path = tmp_path / 'long.pdf'
+    doc.save(path)
+    doc.close()
+    return PDFProcessor(extract_figures=False).process(path).materialize()
+
+
+def stub_generate(client, calls):
+    def generate(prompt, system=None, expect_json=False):
+        calls.append(prompt)
+        return '{"core_claims": [], "tags": ["test"]}'
+    client.generate = generate
+
+
+def test_default_summary_is_one_call_even_when_truncated(make_config, long_content):
+    client = OllamaClient(make_config({'llm': {'local': {'input_budget': 300}}}))
+    calls = []
+    stub_generate(client, calls)
+
+    assert client.summarize_paper(long_content)['tags'] == ['test']
+    assert len(calls) == 1
+    client.close()
+
+
+def test_auto_mode_map_reduces_papers_that_do_not_fit(make_config, long_content):
+    client = OllamaClient(make_config({'llm': {'local': {'input_budget': 300,
+                                                         'summary_mode': 'auto'}}}))
+    calls = []
+    stub_generate(client, calls)
+
+    client.summarize_paper(long_content)
+    assert len(calls) > 1
+    client.close()
+
+
+@pytest.mark.parametrize('local, budget', [
+    ({}, 2000),
+    ({'num_ctx': 8192}, 8192 - SUMMARY_OUTPUT_TOKENS),
+    ({'num_ctx': 8192, 'input_budget': 3000}, 3000),
+])
+def test_input_budget_follows_context_window(make_config, local, budget):
+    client = OllamaClient(make_config({'llm': {'local': local}}))
+    assert client.input_budget == budget
+    client.close()
+
+
+def test_close_shuts_down_chunk_workers(make_config):
+    client = OllamaClient(make_config())
+    client.close()
+    with pytest.raises(RuntimeError):
+        client._map_pool.submit(print)
+
+
+def test_cached_responses_are_keyed_by_the_whole_request(make_config):
+    cache = MemoryResponseCache()
+    posted = []
+
+    def post(path, json, stream=False):
+        posted.append(json)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"response": "{}"}'
+        return response
+
+    def client(local):
+        client = OllamaClient(make_config({'llm': {'local': {'stream': False, **local}}}), cache)
+        client.http.post = post
+        return client
+
+    small = client({'num_ctx': 4096})
+    small.generate('Summarize.')
+    small.generate('Summarize.')
+    assert len(posted) == 1
+
+    # Another context window or output mode is a different request
+    client({'num_ctx': 8192}).generate('Summarize.')
+    small.generate('Summarize.', expect_json=True)
+    assert len(posted) == 3
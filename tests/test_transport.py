@@ -0,0 +1,105 @@
+"""Circuit breaker state machine and HTTP client retries."""
+
+import time
+import pytest
+import requests
+
+from hedorah.transport import CircuitBreaker, CircuitOpenError, HTTPClient
+
+
+class FakeSession:
+    """Raises the queued errors, then answers with the given status."""
+
+    def __init__(self, errors, status_code: int = 200):
+        self.errors = list(errors)
+        self.status_code = status_code
+        self.calls = 0
+
+    def post(self, url, json, stream, timeout):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        response = requests.Response()
+        response.status_code = self.status_code
+        return response
+
+    def close(self):
+        pass
+
+
+def open_breaker(threshold: int = 2) -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=threshold, reset_seconds=0.05)
+    for _ in range(threshold):
+        breaker.before_call()
+        breaker.record_failure()
+    return breaker
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=60)
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.record_success()
+    for _ in range(2):
+        breaker.record_failure()
+    assert not breaker.is_open
+
+    breaker.record_failure()
+    assert breaker.is_open
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_breaker_lets_one_probe_through_after_reset():
+    breaker = open_breaker()
+    time.sleep(0.06)
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert not breaker.is_open
+    breaker.before_call()
+
+
+def test_failed_probe_reopens_the_circuit():
+    breaker = open_breaker()
+    time.sleep(0.06)
+
+    breaker.before_call()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    breaker.before_call()
+
+
+@pytest.mark.parametrize('error', [requests.exceptions.ChunkedEncodingError('cut off'),
+                                   requests.exceptions.InvalidURL('bad url'),
+                                   ValueError('not a request error')])
+def test_probe_failing_outside_retried_errors_is_recorded(error):
+    breaker = open_breaker()
+    client = HTTPClient('http://localhost:9', max_retries=0, breaker=breaker)
+    client.session = FakeSession([error])
+    time.sleep(0.06)
+
+    with pytest.raises(type(error)):
+        client.post('/api/generate', {})
+
+    # The probe was settled: the circuit opens again and later lets a new probe through
+    assert breaker.is_open
+    time.sleep(0.06)
+    assert client.post('/api/generate', {}).status_code == 200
+    assert not breaker.is_open
+
+
+def test_retries_transient_errors_then_succeeds():
+    breaker = CircuitBreaker(failure_threshold=5)
+    client = HTTPClient('http://localhost:9', max_retries=2, backoff_seconds=0, breaker=breaker)
+    client.session = FakeSession([requests.ConnectionError('refused'), requests.Timeout('slow')])
+
+    assert client.post('/api/generate', {}).status_code == 200
+    assert client.session.calls == 3
+    assert not breaker.is_open
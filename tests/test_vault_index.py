@@ -0,0 +1,84 @@
+"""Incremental refresh and full-text search of the vault index."""
+
+import sqlite3
+from pathlib import Path
+import pytest
+
+from hedorah.vault_index import VaultIndex
+
+
+@pytest.fixture
+def notes(vault: Path) -> Path:
+    folder = vault / 'Notes'
+    folder.mkdir()
+    for i in range(5):
+        (folder / f"note{i}.md").write_text(f"---\ntags: [topic{i}]\n---\n# Note {i}\n"
+                                            f"sparse features word{i}", encoding='utf-8')
+    return folder
+
+
+@pytest.fixture
+def index(tmp_path: Path):
+    index = VaultIndex(tmp_path / 'vault.db')
+    yield index
+    index.close()
+
+
+def paths(results):
+    return [Path(result['path']).name for result in results]
+
+
+def test_search_follows_edits_and_removals(index, notes):
+    assert index.refresh(notes) == 5
+    assert paths(index.search('word3')) == ['note3.md']
+
+    (notes / 'note3.md').write_text('# Note 3\nrewritten', encoding='utf-8')
+    (notes / 'note4.md').unlink()
+    assert index.refresh(notes) == 2
+
+    assert index.search('word3') == []
+    assert paths(index.search('rewritten')) == ['note3.md']
+    assert index.search('word4') == []
+    assert sorted(paths(index.search('sparse'))) == ['note0.md', 'note1.md', 'note2.md']
+
+    # Every search row belongs to a note, by rowid
+    conn = sqlite3.connect(str(index.db_path))
+    assert conn.execute("SELECT rowid FROM notes_fts EXCEPT SELECT rowid FROM notes").fetchall() == []
+
+
+def test_prefix_field_and_folder_queries(index, notes, vault):
+    other = vault / 'Other'
+    other.mkdir()
+    (other / 'elsewhere.md').write_text('# Elsewhere\nsparse word9', encoding='utf-8')
+    index.refresh(vault, recursive=True)
+
+    assert len(index.search('word*')) == 6
+    assert len(index.search('word*', limit=2)) == 2
+    assert paths(index.search('tags:topic2')) == ['note2.md']
+    assert paths(index.search('title:elsewhere')) == ['elsewhere.md']
+    assert len(index.search('sparse', folder=notes)) == 5
+
+    # Title matches outrank body matches
+    (notes / 'sparse.md').write_text('# Sparse\nunrelated', encoding='utf-8')
+    index.refresh(notes)
+    results = index.search('sparse')
+    assert paths(results)[0] == 'sparse.md'
+    assert [r['score'] for r in results] == sorted((r['score'] for r in results), reverse=True)
+
+
+def test_search_table_with_old_definition_is_rebuilt(tmp_path, notes):
+    db_path = tmp_path / 'vault.db'
+    index = VaultIndex(db_path)
+    index.refresh(notes)
+    index.close()
+
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("DROP TABLE notes_fts")
+    conn.execute("CREATE VIRTUAL TABLE notes_fts USING fts5("
+                 "path UNINDEXED, folder UNINDEXED, title, tags, body)")
+    conn.commit()
+    conn.close()
+
+    index = VaultIndex(db_path)
+    assert paths(index.search('word1')) == ['note1.md']
+    index.close()
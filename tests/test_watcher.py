@@ -0,0 +1,40 @@
+"""Inbox write settling and the bounded work queue."""
+
+import shutil
+import time
+
+from hedorah.watcher import PaperQueue, WriteSettler
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def test_full_queue_holds_pdfs_without_blocking_the_settler(tmp_path, sample_pdf):
+    # No workers are started, so nothing drains the queue
+    paper_queue = PaperQueue(pipeline=None, max_size=1)
+    settler = WriteSettler(paper_queue.submit, stable_seconds=0, poll_interval=0.01)
+    first, second = tmp_path / 'first.pdf', tmp_path / 'second.pdf'
+    shutil.copy(sample_pdf, first)
+    shutil.copy(sample_pdf, second)
+
+    settler.start()
+    settler.track(first)
+    wait_for(lambda: paper_queue.status().queued == 1)
+    settler.track(second)
+    time.sleep(0.1)
+
+    # The second PDF stays tracked until there is room
+    assert settler.pending == 1
+    started = time.monotonic()
+    settler.stop()
+    assert time.monotonic() - started < 1
+
+    paper_queue._queue.get_nowait()
+    settler.start()
+    wait_for(lambda: settler.pending == 0)
+    settler.stop()
+    assert paper_queue._queue.get_nowait().pdf_path == second